@@ -1,10 +1,55 @@
+import sys
 import datetime
 import subprocess
+import json
+import threading
+import collections
 
 import PyBoolNet.Utility.Misc
 
-CMD_GRINGO = PyBoolNet.Utility.Misc.find_command("gringo")
-CMD_CLASP = PyBoolNet.Utility.Misc.find_command("clasp")
+try:
+    import clingo
+except ImportError:
+    clingo = None
+
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_GRINGO": "gringo", "CMD_CLASP": "clasp"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _cmd(Name):
+    """
+    the command of the module attribute *Name*, see *COMMANDS*
+    """
+
+    return getattr(sys.modules[__name__], Name)
+
+# solve in-process with the clingo module if it is installed, otherwise pipe into gringo and clasp
+USE_CLINGO = clingo is not None
+
+# maximal number of grounded programs and of results that are kept by the clingo backend
+CACHE_SIZE = 64
+
+# networks up to this size are solved by python_handle if clingo is not installed
+PYTHON_MAX_SIZE = 40
+
+_CLINGO_CONTROLS = collections.OrderedDict()
+_CLINGO_RESULTS = collections.OrderedDict()
+_CLINGO_LOCK = threading.Lock()
+
+# switched on by the external atom bounds(a,b), see clingo_handle
+BOUNDS_PROGRAM = """
+#program bounds(a,b).
+#external bounds(a,b).
+:- bounds(a,b), {hit(V,S)} a-1.
+:- bounds(a,b), b+1 {hit(V,S)}.
+"""
 
 
 def circuits(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
@@ -406,8 +451,6 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
     Returns a list of trap spaces using the Potassco_ ASP solver :ref:`[Gebser2011]<Gebser2011>`.
     """
     
-    DEBUG = 0
-    
     assert (Type in ['max', 'min', 'all', 'percolated', 'circuits'])
     assert (Representation in ['str', 'dict'])
     
@@ -415,6 +458,43 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
     if Bounds:
         Bounds = tuple([len(Primes) if x == "n" else x for x in Bounds])
     
+    params_clasp = _clasp_parameters(Type)
+    
+    if USE_CLINGO:
+        if FnameASP != None:
+            primes2asp(Primes, FnameASP, Bounds, Project, Type)
+        
+        result = clingo_handle(Primes, Type, Bounds, Project, MaxOutput)
+    
+    elif len(Primes) <= PYTHON_MAX_SIZE:
+        if FnameASP != None:
+            primes2asp(Primes, FnameASP, Bounds, Project, Type)
+        
+        result = python_handle(Primes, Type, Bounds, Project, MaxOutput)
+    
+    else:
+        result = _gringo_clasp_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, params_clasp)
+    
+    if len(result) == MaxOutput:
+        print("There are possibly more than %i trap spaces." % MaxOutput)
+        print("Increase MaxOutput to find out.")
+    
+    if Representation == "str":
+        subspace2str = PyBoolNet.StateTransitionGraphs.subspace2str
+        
+        if Type == 'circuits':
+            result = [(subspace2str(Primes, x), subspace2str(Primes, y)) for x, y in result]
+        else:
+            result = [subspace2str(Primes, x) for x in result]
+    
+    return result
+
+
+def _clasp_parameters(Type):
+    """
+    The clasp parameters for enumerating trap spaces of the given *Type*.
+    """
+    
     # unique solutions w.r.t. show
     params_clasp = []
     
@@ -427,16 +507,405 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
         params_clasp += ['--enum-mode=domRec', '--heuristic=Domain', '--dom-mod=3,16']
     # --enum-mode=domRec --heuristic=Domain --dom-mod=3,16
     
-    Percolate = Type == "percolated"
+    return params_clasp
+
+
+def clingo_handle(Primes, Type, Bounds, Project, MaxOutput):
+    """
+    Returns a list of trap spaces in dict representation that are computed in-process by the clingo Python module.
+    The arguments are those of :ref:`potassco_handle`, except that *Bounds* must not contain the shortcut "n".
+
+    The program of :ref:`primes2asp` is grounded once for every *Primes*, *Type* and *Project*.
+    *Bounds* are switched on and off by the external atom *bounds(a,b)*, so calls that only differ in *Bounds*
+    reuse the grounded program.
+    Results are cached for *Primes*, *Type*, *Bounds* and *Project*,
+    see :ref:`clear_clingo_cache` for releasing the grounded programs and results.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Type* (str): either *"max"*, *"min"*, *"all"*, *"percolated"* or *"circuits"*
+        * *Bounds* (tuple): cardinality constraint for the number of fixed variables or *None*
+        * *Project* (list): names to project to or *None* for no projection
+        * *MaxOutput* (int): maximal number of trap spaces to return
+
+    **returns**:
+        * *Subspaces* (list): the trap spaces, or tuples of circuit and percolated nodes if *Type* is *"circuits"*
+
+    **example**::
+
+        >>> clingo_handle(primes, "min", None, None, 1000)
+        [{'v1': 0, 'v2': 1}, {'v1': 1, 'v2': 0}]
+    """
+    
+    if clingo is None:
+        print("clingo_handle requires the clingo module, see https://potassco.org/clingo")
+        raise Exception
+    
+    # like primes2asp, an empty projection shows all variables
+    Project = sorted(x for x in Project if x in Primes) if Project else None
+    
+    key_primes = json.dumps(Primes, sort_keys=True)
+    key_control = (key_primes, Type, tuple(Project) if Project else None)
+    key_result = key_control + (Bounds,)
+    
+    with _CLINGO_LOCK:
+        if key_result in _CLINGO_RESULTS:
+            _CLINGO_RESULTS.move_to_end(key_result)
+            result, complete = _CLINGO_RESULTS[key_result]
+            
+            if complete or len(result) >= MaxOutput:
+                return _copy_trapspaces(result[:MaxOutput])
+        
+        if key_control in _CLINGO_CONTROLS:
+            _CLINGO_CONTROLS.move_to_end(key_control)
+            control, grounded = _CLINGO_CONTROLS[key_control]
+        
+        else:
+            control = clingo.Control(_clasp_parameters(Type), logger=lambda code, message: None)
+            control.add("base", [], primes2asp(Primes, None, None, Project, Type))
+            control.add("bounds", ["a", "b"], BOUNDS_PROGRAM)
+            control.ground([("base", [])])
+            grounded = set()
+            
+            _CLINGO_CONTROLS[key_control] = (control, grounded)
+            if len(_CLINGO_CONTROLS) > CACHE_SIZE:
+                _CLINGO_CONTROLS.popitem(last=False)
+        
+        if Bounds and Bounds not in grounded:
+            control.ground([("bounds", [clingo.Number(Bounds[0]), clingo.Number(Bounds[1])])])
+            grounded.add(Bounds)
+        
+        for bounds in grounded:
+            atom = clingo.Function("bounds", [clingo.Number(bounds[0]), clingo.Number(bounds[1])])
+            control.assign_external(atom, bounds == Bounds)
+        
+        models = []
+        control.configuration.solve.models = MaxOutput
+        control.solve(on_model=lambda model: models.append(model.symbols(shown=True)))
+        
+        result = []
+        for symbols in models:
+            tspace = dict((x.arguments[0].string, x.arguments[1].number) for x in symbols if x.name == "hit")
+            
+            if Type == 'circuits':
+                perc = set(x.arguments[0].string for x in symbols if x.name == "percolated")
+                circ = dict((x, v) for x, v in tspace.items() if x not in perc)
+                perc = dict((x, v) for x, v in tspace.items() if x in perc)
+                
+                result.append((circ, perc))
+            
+            else:
+                result.append(tspace)
+        
+        result = result[:MaxOutput]
+        _CLINGO_RESULTS[key_result] = (result, len(result) < MaxOutput)
+        if len(_CLINGO_RESULTS) > CACHE_SIZE:
+            _CLINGO_RESULTS.popitem(last=False)
+        
+        return _copy_trapspaces(result)
+
+
+def clear_clingo_cache():
+    """
+    Releases the grounded programs and results that are cached by :ref:`clingo_handle`.
+
+    **example**::
+
+        >>> clear_clingo_cache()
+    """
+    
+    with _CLINGO_LOCK:
+        _CLINGO_CONTROLS.clear()
+        _CLINGO_RESULTS.clear()
+
+
+def _copy_trapspaces(Result):
+    """
+    Copies the cached trap spaces, callers may modify the returned dicts.
+    """
+    
+    return [(dict(x[0]), dict(x[1])) if type(x) == tuple else dict(x) for x in Result]
+
+
+def python_handle(Primes, Type, Bounds, Project, MaxOutput):
+    """
+    Returns a list of trap spaces in dict representation that are enumerated in Python, without an ASP solver.
+    The arguments and results are those of :ref:`clingo_handle`.
+    Intended for small networks, see *PYTHON_MAX_SIZE*.
+
+    The subspaces are enumerated by branching on the variables, each one either fixed to 0, fixed to 1 or free.
+    After every branch the prime implicants are propagated:
+    a fixed variable needs a prime implicant of its value whose literals are fixed in the subspace,
+    it is forced if a single one is left.
+    Percolated trap spaces, and minimal trap spaces if the upper bound is not restrictive, are found among
+    subspaces that fix every variable that has a prime implicant whose literals are fixed.
+    Minimal trap spaces are branched on fixed values before free ones and maximal trap spaces on free values first,
+    so that a trap space is enumerated after all trap spaces that it subsumes in this order.
+    A maximal trap space therefore prunes all branches that fix it.
+    With a projection the projected variables are branched on first and a projection is kept if some trap space extends it,
+    minimal and maximal then refer to the projections, as for the solver's *--project* option.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Type* (str): either *"max"*, *"min"*, *"all"*, *"percolated"* or *"circuits"*
+        * *Bounds* (tuple): cardinality constraint for the number of fixed variables or *None*
+        * *Project* (list): names to project to or *None* for no projection
+        * *MaxOutput* (int): maximal number of trap spaces to return
+
+    **returns**:
+        * *Subspaces* (list): the trap spaces, or tuples of circuit and percolated nodes if *Type* is *"circuits"*
+
+    **example**::
+
+        >>> python_handle(primes, "min", None, None, 1000)
+        [{'v1': 0, 'v2': 1}, {'v1': 1, 'v2': 0}]
+    """
+    
+    names = sorted(Primes)
+    bits = dict((x, 1 << i) for i, x in enumerate(names))
+    
+    # prime implicants of each variable and value as care and value masks
+    masks = [[[(sum(bits[y] for y in p), sum(bits[y] for y in p if p[y])) for p in Primes[x][v]] for v in [0, 1]] for x in names]
+    
+    lower, upper = Bounds if Bounds else (0, len(names))
+    percolated = Type in ['percolated', 'circuits'] or (Type == 'min' and upper >= len(names))
+    
+    if Type == 'min':
+        choices = [0, 1, None]
+    else:
+        choices = [None, 0, 1]
+    
+    project = sum(bits[x] for x in Project if x in Primes) if Project else None
+    
+    found = []
+    result = []
+    projections = set()
+    
+    # targets of each variable in the interaction graph
+    targets = [sum(1 << j for j, m in enumerate(masks) if any(care & (1 << i) for v in [0, 1] for care, _ in m[v])) for i in range(len(names))]
+    order = _python_order(targets)
+    
+    propagated = _python_propagate(masks, targets, 0, 0, 0, (1 << len(names)) - 1, percolated)
+    if not propagated:
+        spaces = []
+    elif project is not None:
+        order = [x for x in order if x & project] + [x for x in order if not x & project]
+        spaces = _python_projections(masks, targets, order, project, *propagated, choices, lower, upper, percolated, found if Type == 'max' else [])
+    else:
+        spaces = _python_branch(masks, targets, order, *propagated, choices, lower, upper, percolated, found if Type == 'max' else [])
+    
+    for fixed, values in spaces:
+        if Type == 'min':
+            if any(fixed & x == fixed and fixed != x and y & fixed == values for x, y in found):
+                continue
+            found.append((fixed, values))
+        
+        elif Type == 'max':
+            if any(fixed & x == x and fixed != x and values & x == y for x, y in found):
+                continue
+            found.append((fixed, values))
+        
+        if project is not None:
+            fixed &= project
+            values &= project
+            if (fixed, values) in projections:
+                continue
+            projections.add((fixed, values))
+        
+        tspace = dict((x, int(bool(values & bits[x]))) for x in names if fixed & bits[x])
+        
+        if Type == 'circuits':
+            # like primes2asp, a projection shows no percolated nodes
+            perc = _percolated_nodes(names, masks, fixed, values) if project is None else set()
+            circ = dict((x, v) for x, v in tspace.items() if x not in perc)
+            perc = dict((x, v) for x, v in tspace.items() if x in perc)
+            tspace = (circ, perc)
+        
+        result.append(tspace)
+        if len(result) >= MaxOutput:
+            break
+    
+    return result
+
+
+def _python_branch(Masks, Targets, Order, Decided, Fixed, Values, Choices, Lower, Upper, Percolated, Maximal):
+    """
+    Yields the trap spaces, as masks of fixed variables and their values, that extend the partial assignment.
+    *Decided* are the variables that are either fixed or free, *Order* are the bits in the order of branching.
+    """
+    
+    fixed = bin(Fixed).count("1")
+    if fixed > Upper or fixed + len(Masks) - bin(Decided).count("1") < Lower:
+        return
+    
+    if any(care & Fixed == care and (Values ^ value) & care == 0 for care, value in Maximal):
+        return
+    
+    if Decided == (1 << len(Masks)) - 1:
+        yield Fixed, Values
+        return
+    
+    bit = next(x for x in Order if not Decided & x)
+    dirty = bit | Targets[bit.bit_length() - 1]
+    
+    for value in Choices:
+        decided, fixed, values = Decided | bit, Fixed, Values
+        if value != None:
+            fixed |= bit
+            if value:
+                values |= bit
+        
+        propagated = _python_propagate(Masks, Targets, decided, fixed, values, dirty, Percolated)
+        if propagated:
+            for x in _python_branch(Masks, Targets, Order, *propagated, Choices, Lower, Upper, Percolated, Maximal):
+                yield x
+
+
+def _python_projections(Masks, Targets, Order, Project, Decided, Fixed, Values, Choices, Lower, Upper, Percolated, Maximal):
+    """
+    Yields the projections onto the variables *Project* of the trap spaces that extend the partial assignment, see :ref:`_python_branch`.
+    The projected variables must come first in *Order*, once they are decided a single trap space that extends them is searched.
+    """
+    
+    fixed = bin(Fixed).count("1")
+    if fixed > Upper or fixed + len(Masks) - bin(Decided).count("1") < Lower:
+        return
+    
+    if any(care & Fixed == care and (Values ^ value) & care == 0 for care, value in Maximal):
+        return
+    
+    if Decided & Project == Project:
+        for x in _python_branch(Masks, Targets, Order, Decided, Fixed, Values, Choices, Lower, Upper, Percolated, []):
+            yield Fixed & Project, Values & Project
+            return
+        return
+    
+    bit = next(x for x in Order if not Decided & x)
+    dirty = bit | Targets[bit.bit_length() - 1]
+    
+    for value in Choices:
+        decided, fixed, values = Decided | bit, Fixed, Values
+        if value != None:
+            fixed |= bit
+            if value:
+                values |= bit
+        
+        propagated = _python_propagate(Masks, Targets, decided, fixed, values, dirty, Percolated)
+        if propagated:
+            for x in _python_projections(Masks, Targets, Order, Project, *propagated, Choices, Lower, Upper, Percolated, Maximal):
+                yield x
+
+
+def _python_order(Targets):
+    """
+    The variable bits in the order of branching, by decreasing product of the numbers of regulators and targets.
+    Highly connected variables first decide many prime implicants, so that propagation fixes or frees the others.
+    """
+    
+    regulators = [bin(sum(1 << j for j, x in enumerate(Targets) if x & (1 << i))).count("1") for i in range(len(Targets))]
+    order = sorted(range(len(Targets)), key=lambda i: -regulators[i] * bin(Targets[i]).count("1"))
+    
+    return [1 << i for i in order]
+
+
+def _python_propagate(Masks, Targets, Decided, Fixed, Values, Dirty, Percolated):
+    """
+    Extends the partial assignment by the values that are forced by the prime implicants.
+    Only the variables in *Dirty* and the targets of changed variables are checked.
+    Returns the masks *Decided*, *Fixed* and *Values* or *None* if the assignment is inconsistent.
+    """
+    
+    while Dirty:
+        bit = Dirty & -Dirty
+        Dirty ^= bit
+        masks = Masks[bit.bit_length() - 1]
+        free = Decided & ~Fixed
+        changed = 0
+        
+        if Fixed & bit:
+            # a fixed variable needs a prime implicant without free or opposite literals
+            supports = [(care, value) for care, value in masks[bool(Values & bit)] if not care & free and not (Values ^ value) & care & Fixed]
+            if not supports:
+                return None
+            
+            if len(supports) == 1:
+                care, value = supports[0]
+                changed = care & ~Fixed
+                Decided |= care
+                Fixed |= care
+                Values |= value
+        
+        elif not Decided & bit:
+            # a variable without prime implicants that can be fixed is free
+            if not any(not care & free and not (Values ^ value) & care & Fixed for v in [0, 1] for care, value in masks[v]):
+                Decided |= bit
+                changed = bit
+        
+        if Percolated and not changed & bit:
+            # a prime implicant whose literals are fixed fixes its variable
+            for v in [0, 1]:
+                if any(not care & ~Fixed and not (Values ^ value) & care for care, value in masks[v]):
+                    if not Decided & bit:
+                        Decided |= bit
+                        Fixed |= bit
+                        if v:
+                            Values |= bit
+                        changed |= bit
+                    elif not Fixed & bit or bool(Values & bit) != v:
+                        return None
+        
+        while changed:
+            x = changed & -changed
+            changed ^= x
+            Dirty |= x | Targets[x.bit_length() - 1]
+    
+    return Decided, Fixed, Values
+
+
+def _percolated_nodes(Names, Masks, Fixed, Values):
+    """
+    The fixed nodes of a trap space that are not upstream of themselves in the prime implicants that are active in it.
+    """
+    
+    upstream = {}
+    for i, masks in enumerate(Masks):
+        if Fixed & (1 << i):
+            upstream[i] = 0
+            for care, value in masks[bool(Values & (1 << i))]:
+                if not care & ~Fixed and not (Values ^ value) & care:
+                    upstream[i] |= care
+    
+    percolated = set()
+    for i in upstream:
+        seen = 0
+        stack = [upstream[i]]
+        while stack:
+            new = stack.pop() & ~seen
+            seen |= new
+            stack.extend(upstream[j] for j in upstream if new & (1 << j))
+        
+        if not seen & (1 << i):
+            percolated.add(Names[i])
+    
+    return percolated
+
+
+def _gringo_clasp_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, params_clasp):
+    """
+    Pipes the *asp* program into gringo and clasp and parses the answers of the clasp output.
+    """
+    
+    DEBUG = 0
+    
     aspfile = primes2asp(Primes, FnameASP, Bounds, Project, Type)
     
     try:
         # pipe ASP file
         if FnameASP == None:
-            cmd_gringo = [CMD_GRINGO]
+            cmd_gringo = [_cmd("CMD_GRINGO")]
             proc_gringo = subprocess.Popen(cmd_gringo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                                            stderr=subprocess.PIPE)
-            cmd_clasp = [CMD_CLASP, '--models=%i' % MaxOutput] + params_clasp
+            cmd_clasp = [_cmd("CMD_CLASP"), '--models=%i' % MaxOutput] + params_clasp
             proc_clasp = subprocess.Popen(cmd_clasp, stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
                                           stderr=subprocess.PIPE)
             
@@ -449,10 +918,10 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
         
         # read ASP file
         else:
-            cmd_gringo = [CMD_GRINGO, FnameASP]
+            cmd_gringo = [_cmd("CMD_GRINGO"), FnameASP]
             proc_gringo = subprocess.Popen(cmd_gringo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                                            stderr=subprocess.PIPE)
-            cmd_clasp = [CMD_CLASP, '--models=%i' % MaxOutput] + params_clasp
+            cmd_clasp = [_cmd("CMD_CLASP"), '--models=%i' % MaxOutput] + params_clasp
             proc_clasp = subprocess.Popen(cmd_clasp, stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
                                           stderr=subprocess.PIPE)
             
@@ -523,18 +992,6 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
                 d = [(l[0][1:-1], int(l[1])) for l in d]
                 result.append(dict(d))
     
-    if len(result) == MaxOutput:
-        print("There are possibly more than %i trap spaces." % MaxOutput)
-        print("Increase MaxOutput to find out.")
-    
-    if Representation == "str":
-        subspace2str = PyBoolNet.StateTransitionGraphs.subspace2str
-        
-        if Type == 'circuits':
-            result = [(subspace2str(Primes, x), subspace2str(Primes, y)) for x, y in result]
-        else:
-            result = [subspace2str(Primes, x) for x in result]
-    
     return result
 
 
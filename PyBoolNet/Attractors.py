@@ -200,7 +200,7 @@ def open_json(Fname):
     return attrs
 
 
-def find_attractor_state_by_randomwalk_and_ctl(Primes, Update, InitialState={}, Length=0, Attempts=10, Silent=True):
+def find_attractor_state_by_randomwalk_and_ctl(Primes, Update, InitialState={}, Length=0, Attempts=10, Silent=True, Session=None):
     """
     Attempts to find a state inside an attractor by the "long random walk" method,
     see :ref:`Klarner2015(b) <klarner2015approx>` Sec. 3.2 for a formal definition.
@@ -225,6 +225,7 @@ def find_attractor_state_by_randomwalk_and_ctl(Primes, Update, InitialState={},
         * *Length* (int): length of random walk
         * *Attempts* (int): number of attempts before exception is raised
         * *Silent* (bool): print infos to screen
+        * *Session* (NuSMVSession/SessionPool): NuSMV session for the queries of all attempts, see :ref:`check_primes`
 
     **returns**:
         * *State* (dict): a state that belongs to some attractor
@@ -281,7 +282,7 @@ def find_attractor_state_by_randomwalk_and_ctl(Primes, Update, InitialState={},
         # PyBoolNet.ModelChecking.primes2smv(Primes, Update, init, spec, FnameSMV="randomwalk.smv")
         # return
 
-        if PyBoolNet.ModelChecking.check_primes(Primes, Update, init, spec):
+        if PyBoolNet.ModelChecking.check_primes(Primes, Update, init, spec, Session=Session):
             if not Silent: print("  is attractor state")
 
             return current_state
@@ -829,15 +830,16 @@ def create_attractor_report(Primes, FnameTXT=None):
 
 def compute_attractors_tarjan(STG):
     """
-    Uses `networkx.strongly_connected_components <https://networkx.github.io/documentation/latest/reference/generated/networkx.algorithms.components.strongly_connected.strongly_connected_components.html>`_
-    , i.e., Tarjan's algorithm with Nuutila's modifications, to compute the SCCs of *STG* and
-    `networkx.has_path <https://networkx.github.io/documentation/latest/reference/generated/networkx.algorithms.shortest_paths.generic.has_path.html>`_
-    to decide whether a SCC is reachable from another.
+    Computes the attractors of *STG*, i.e., its terminal SCCs, by an iterative version of Tarjan's algorithm
+    that flags, in the same pass, the SCCs from which another SCC is reachable.
+    If every state has exactly one successor, e.g., for the synchronous update, the attractors are the cycles
+    of a functional graph and are found by following the successors of each state once.
     Returns the attractors as lists of states.
+    For a :ref:`CompactSTG` the SCCs are computed on its arrays, see :ref:`primes2compactstg`.
 
 
     **arguments**:
-        * *STG*: state transition graph
+        * *STG*: state transition graph (networkx.DiGraph or CompactSTG)
 
     **returns**:
         * *SteadyStates* (list of str): the steady states
@@ -858,19 +860,125 @@ def compute_attractors_tarjan(STG):
         [set(['111','110']), set(['001','011'])]
     """
 
-    condensation_graph = PyBoolNet.Utility.DiGraphs.digraph2condensationgraph(STG)
+    if isinstance(STG, PyBoolNet.StateTransitionGraphs.CompactSTG):
+        if STG.indptr is not None:
+            return STG.attractors()
+
+        nodes = [PyBoolNet.StateTransitionGraphs.int2str(STG.names, x) for x in STG.states.tolist()]
+        sccs = _functional_graph_cycles(STG.indices.tolist())
+
+    else:
+        nodes = list(STG.nodes())
+        index = dict((x, i) for i, x in enumerate(nodes))
+        successors = [[index[y] for y in STG.successors(x)] for x in nodes]
+
+        if all(len(x)==1 for x in successors):
+            sccs = _functional_graph_cycles([x[0] for x in successors])
+        else:
+            sccs = _terminal_sccs(successors)
+
     steadystates = []
     cyclic = []
-    for scc in condensation_graph.nodes():
-        if not list(condensation_graph.successors(scc)):
-            if len(scc)==1:
-                steadystates.append(scc[0])
-            else:
-                cyclic.append(set(scc))
+    for scc in sorted(tuple(sorted(nodes[i] for i in scc)) for scc in sccs):
+        if len(scc)==1:
+            steadystates.append(scc[0])
+        else:
+            cyclic.append(set(scc))
 
     return steadystates, cyclic
 
 
+def _terminal_sccs(Successors):
+    """
+    iterative Tarjan algorithm on the graph given by the lists of successor indices *Successors*.
+    Returns the terminal SCCs, i.e., the non-trivial SCCs (more than one node or a self-loop)
+    from which no other non-trivial SCC is reachable.
+    """
+
+    n = len(Successors)
+    index = [-1]*n
+    lowlink = [0]*n
+    onstack = [False]*n
+    component = [-1]*n
+    leads = []  # for each finished SCC, whether it is or reaches a non-trivial SCC
+    stack = []
+    terminal = []
+    counter = 0
+
+    for root in range(n):
+        if index[root]>=0: continue
+
+        index[root] = lowlink[root] = counter
+        counter+= 1
+        stack.append(root)
+        onstack[root] = True
+        work = [(root, iter(Successors[root]))]
+
+        while work:
+            v, successors = work[-1]
+            for w in successors:
+                if index[w]<0:
+                    index[w] = lowlink[w] = counter
+                    counter+= 1
+                    stack.append(w)
+                    onstack[w] = True
+                    work.append((w, iter(Successors[w])))
+                    break
+                if onstack[w]:
+                    lowlink[v] = min(lowlink[v], index[w])
+
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    lowlink[u] = min(lowlink[u], lowlink[v])
+
+                if lowlink[v]==index[v]:
+                    c = len(leads)
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        onstack[w] = False
+                        component[w] = c
+                        scc.append(w)
+                        if w==v: break
+
+                    # the successor SCCs are finished since Tarjan finishes SCCs in reverse topological order
+                    reaches = any(leads[component[y]] for x in scc for y in Successors[x] if component[y]!=c)
+                    nontrivial = len(scc)>1 or v in Successors[v]
+                    if nontrivial and not reaches:
+                        terminal.append(scc)
+                    leads.append(nontrivial or reaches)
+
+    return terminal
+
+
+def _functional_graph_cycles(Successor):
+    """
+    the cycles of the graph in which node *i* has the single successor *Successor[i]*,
+    every node is visited once.
+    """
+
+    visited = bytearray(len(Successor))  # 0: not visited, 1: on current path, 2: done
+    cycles = []
+    for x in range(len(Successor)):
+        if visited[x]: continue
+
+        path = []
+        while not visited[x]:
+            visited[x] = 1
+            path.append(x)
+            x = Successor[x]
+
+        if visited[x]==1:
+            cycles.append(path[path.index(x):])
+
+        for y in path:
+            visited[y] = 2
+
+    return cycles
+
+
 def completeness_naive(Primes, Update, TrapSpaces):
     """
     The naive approach to deciding whether *Trapspaces* is complete,
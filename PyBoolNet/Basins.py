@@ -8,6 +8,7 @@ import random
 import operator
 import functools
 import networkx
+import numpy
 
 BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 sys.path.append(BASE)
@@ -20,9 +21,18 @@ import PyBoolNet.Attractors
 import PyBoolNet.StateTransitionGraphs
 import PyBoolNet.InteractionGraphs
 import PyBoolNet.PrimeImplicants
+import PyBoolNet.QuineMcCluskey
 import PyBoolNet.Utility
 
-CMD_DOT = PyBoolNet.Utility.Misc.find_command("dot")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_DOT": "dot"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 perc2str = PyBoolNet.Utility.Misc.perc2str
 
@@ -35,6 +45,11 @@ PIE_COLORS = ["#ffb3ae", "#aecce1", "#c8eac6", "#dfcae2", "#ffd8a8", "#ffffce",
 PIE_COLORS = ["#a6cee3", "#1f78b4", "#b2df8a", "#33a02c", "#fb9a99", "#e31a1c", "#fdbf6f", "#ff7f00", "#cab2d6", "#6a3d9a" "#ffff99"] # colorbrewer
 PIE_COLORS = 10*[BASIN_COLORS[1]]
 
+# explicit_basins labels all 2^n states, compute_basins uses NuSMV for larger networks
+EXPLICIT_MAX_SIZE = 25
+
+CTL_PATTERNS = {"weak_basin": "CTLSPEC EF({x})", "strong_basin": "CTLSPEC AG(EF({x}))", "cyclefree_basin": "CTLSPEC AF({x})"}
+
 
 def weak_basin(Primes, Update, Subspace, Minimize=False):
     """
@@ -59,7 +74,7 @@ def weak_basin(Primes, Update, Subspace, Minimize=False):
         "perc":        12.89338}
     """
 
-    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern="CTLSPEC EF({x})")
+    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern=CTL_PATTERNS["weak_basin"])
 
 
 def strong_basin(Primes, Update, Subspace, Minimize=False):
@@ -85,7 +100,7 @@ def strong_basin(Primes, Update, Subspace, Minimize=False):
         "perc":        12.89338}
     """
 
-    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern="CTLSPEC AG(EF({x}))")
+    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern=CTL_PATTERNS["strong_basin"])
 
 
 def cyclefree_basin(Primes, Update, Subspace, Minimize=False):
@@ -111,7 +126,7 @@ def cyclefree_basin(Primes, Update, Subspace, Minimize=False):
         "perc":        12.89338}
     """
 
-    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern="CTLSPEC AF({x})")
+    return _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern=CTL_PATTERNS["cyclefree_basin"])
 
 
 def _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern):
@@ -143,8 +158,16 @@ def _basin_handle(Primes, Update, Subspace, Minimize, CTLpattern):
     spec = CTLpattern.format(x=prop)
     ans, acc = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(Primes, Update, init, spec)
 
-    size = acc["INITACCEPTING_SIZE"]
-    formula = acc["INITACCEPTING"]
+    return _acceptingstates2basin(Primes, acc, Minimize)
+
+
+def _acceptingstates2basin(Primes, AcceptingStates, Minimize):
+    """
+    The basin dictionary of :ref:`_basin_handle` for the accepting states of a basin query.
+    """
+
+    size = AcceptingStates["INITACCEPTING_SIZE"]
+    formula = AcceptingStates["INITACCEPTING"]
 
     if Minimize and formula not in ["TRUE","FALSE"]:
         formula = PyBoolNet.BooleanLogic.minimize_espresso(formula)
@@ -182,7 +205,206 @@ def _default_basin(Primes):
             "perc":    100.}
 
 
-def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplot=None, FnamePiechart=None, Minimize=False, Silent=False):
+def explicit_basins(Primes, Update, Subspaces, Weak=True, Strong=True, CycleFree=True, Minimize=False):
+    """
+    Computes the weak, strong and cycle-free basins of all *Subspaces* at once by an explicit enumeration of the states,
+    an alternative to the NuSMV queries of :ref:`weak_basin`, :ref:`strong_basin` and :ref:`cyclefree_basin`
+    for networks of up to *EXPLICIT_MAX_SIZE* variables.
+    The states are integers, see :ref:`state2int`, and the basins of up to 64 subspaces are the bits of one label per state.
+    Weak basins are computed by backward reachability from the subspaces, strong basins are the complements
+    of the states that reach the complement of the weak basins, and cycle-free basins are the least fixpoints
+    of states whose successors are all in the basin.
+    For synchronous updates the three basins coincide and are computed by pointer doubling on the successor function.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Update* (str): either *"asynchronous"* or *"synchronous"*
+        * *Subspaces* (list): subspaces (str/dict) that are trap spaces, usually minimal trap spaces of attractors
+        * *Weak* (bool): compute weak basins
+        * *Strong* (bool): compute strong basins
+        * *CycleFree* (bool): compute cycle-free basins
+        * *Minimize* (bool): minimize the Boolean expressions
+
+    **returns**:
+        * *Basins* (list): for each subspace a dict with the keys "weak_basin", "strong_basin" and "cyclefree_basin"
+          of the computed basins, see :ref:`weak_basin`
+
+    **example**::
+
+        >>> basins = explicit_basins(primes, "asynchronous", ["000", "1-1"])
+        >>> basins[0]["weak_basin"]
+        {"size":    6,
+        "formula":    "!v1 | !v3",
+        "perc":        75.0}
+    """
+
+    assert(Update in ["asynchronous", "synchronous"])
+
+    names = sorted(Primes)
+    n = len(names)
+    size_total = 2**n
+
+    if n > EXPLICIT_MAX_SIZE:
+        print("warning: explicit basins of %i variables need a lot of memory and may take a very long time."%n)
+
+    flips = _explicit_flips(Primes)
+
+    states = numpy.arange(size_total, dtype=numpy.int64)
+    basins = [{} for x in Subspaces]
+    for start in range(0, len(Subspaces), 64):
+        chunk = Subspaces[start:start+64]
+        full = numpy.uint64(2**len(chunk)-1)
+
+        targets = numpy.zeros(size_total, dtype=numpy.uint64)
+        for j, subspace in enumerate(chunk):
+            if type(subspace)==str:
+                subspace = PyBoolNet.StateTransitionGraphs.subspace2dict(Primes, subspace)
+            care = sum(1<<(n-1-names.index(x)) for x in subspace)
+            value = sum(1<<(n-1-names.index(x)) for x in subspace if subspace[x])
+            targets[(states & care) == value] |= numpy.uint64(1<<j)
+
+        labels = {}
+        if Update == "synchronous":
+            # a state has a single path, the basins coincide
+            basin = _explicit_synchronous(flips, targets, n)
+            labels = {"weak_basin": basin, "strong_basin": basin, "cyclefree_basin": basin}
+
+        else:
+            if Weak or Strong:
+                weak = _explicit_backward(flips, targets.copy(), n)
+                labels["weak_basin"] = weak
+            if Strong:
+                labels["strong_basin"] = ~_explicit_backward(flips, ~weak & full, n) & full
+            if CycleFree:
+                labels["cyclefree_basin"] = _explicit_cyclefree(flips, targets, n, full)
+
+        for key, flag in [("weak_basin", Weak), ("strong_basin", Strong), ("cyclefree_basin", CycleFree)]:
+            if not flag:
+                continue
+            for j in range(len(chunk)):
+                members = (labels[key] & numpy.uint64(1<<j)) != 0
+                basins[start+j][key] = _states2basin(names, members, Minimize)
+
+    return basins
+
+
+def _explicit_flips(Primes):
+    """
+    For each integer state the mask of the variables whose image differs from their value.
+    """
+
+    n = len(Primes)
+    states = numpy.arange(2**n, dtype=numpy.int64)
+    flips = numpy.zeros(2**n, dtype=numpy.int64)
+
+    for bit, primes in PyBoolNet.StateTransitionGraphs.primes2masks(Primes):
+        image = numpy.zeros(2**n, dtype=bool)
+        for care, value in primes:
+            image |= (states & care) == value
+        flips[image != ((states & bit) != 0)] |= bit
+
+    return flips
+
+
+def _explicit_backward(Flips, Labels, N):
+    """
+    Extends the bits of *Labels* to the asynchronous predecessors until nothing changes.
+    A state *x* is a predecessor of *x^bit* if *bit* flips in *x*.
+    """
+
+    changed = numpy.zeros(len(Labels), dtype=bool)
+    frontier = numpy.flatnonzero(Labels)
+    while frontier.size:
+        for i in range(N):
+            bit = 1<<i
+            ok = (Flips[frontier ^ bit] & bit) != 0
+            pred = frontier[ok] ^ bit
+            new = Labels[pred] | Labels[frontier[ok]]
+            diff = new != Labels[pred]
+            Labels[pred[diff]] = new[diff]
+            changed[pred[diff]] = True
+
+        frontier = numpy.flatnonzero(changed)
+        changed[frontier] = False
+
+    return Labels
+
+
+def _explicit_cyclefree(Flips, Targets, N, Full):
+    """
+    The least fixpoint of the bits of *Targets* and of the states whose asynchronous successors all have a bit.
+    Steady states only have themselves as successor and are only in the basins of their own bits.
+    """
+
+    labels = Targets.copy()
+    marked = numpy.zeros(len(Targets), dtype=bool)
+    frontier = numpy.flatnonzero(labels)
+    while frontier.size:
+        for i in range(N):
+            bit = 1<<i
+            ok = (Flips[frontier ^ bit] & bit) != 0
+            marked[frontier[ok] ^ bit] = True
+        candidates = numpy.flatnonzero(marked)
+        marked[candidates] = False
+
+        new = numpy.full(candidates.size, Full, dtype=numpy.uint64)
+        flips = Flips[candidates]
+        for i in range(N):
+            bit = 1<<i
+            has = (flips & bit) != 0
+            new[has] &= labels[candidates[has] ^ bit]
+        new |= Targets[candidates]
+
+        diff = new != labels[candidates]
+        labels[candidates[diff]] = new[diff]
+        frontier = candidates[diff]
+
+    return labels
+
+
+def _explicit_synchronous(Flips, Targets, N):
+    """
+    The bits of *Targets* that are reached on the synchronous path of each state, by pointer doubling.
+    """
+
+    successors = numpy.arange(2**N, dtype=numpy.int64) ^ Flips
+    labels = Targets.copy()
+    for i in range(N+1):
+        # after round i the labels are those of the first 2^i states of each path.
+        # targets are trap spaces, so no change means that no path enters a target later.
+        new = labels | labels[successors]
+        if (new == labels).all():
+            break
+        labels = new
+        successors = successors[successors]
+
+    return labels
+
+
+def _states2basin(Names, States, Minimize):
+    """
+    The basin dictionary of :ref:`_basin_handle` for the bool array *States* that is indexed by the integer states.
+    """
+
+    size = int(numpy.count_nonzero(States))
+
+    if size == 0:
+        formula = "FALSE"
+    elif size == len(States):
+        formula = "TRUE"
+    else:
+        primes = PyBoolNet.QuineMcCluskey.truthtable2primes(Names, States)[1]
+        formula = " | ".join("(%s)"%"&".join(x if p[x] else "!"+x for x in sorted(p)) for p in primes)
+
+        if Minimize:
+            formula = PyBoolNet.BooleanLogic.minimize_espresso(formula)
+
+    return {"size":    size,
+            "formula": formula,
+            "perc":    100.* size / len(States)}
+
+
+def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplot=None, FnamePiechart=None, Minimize=False, Silent=False, Backend="nusmv"):
     """
     todo: add unit tests
 
@@ -198,6 +420,8 @@ def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplo
         * *FnamePiechart* (str): file name of pie chart
         * *Minimize* (bool): minimize the Boolean expressions
         * *Silent* (bool): print infos to screen
+        * *Backend* (str): either *"nusmv"* for model checking or *"explicit"* for :ref:`explicit_basins`, which enumerates the states.
+          The NuSMV queries are used for the *"mixed"* update and for networks of more than *EXPLICIT_MAX_SIZE* variables
 
     **returns**::
         * *None*
@@ -207,16 +431,25 @@ def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplo
         >>> primes = Repository.get_primes("raf")
         >>> attrs = Attractors.compute_json(primes, update)
         >>> compute_basins(attrs)
+        >>> compute_basins(attrs, Backend="explicit")
     """
 
+    assert(Backend in ["nusmv", "explicit"])
+
     Primes = AttrJson["primes"]
     Update = AttrJson["update"]
 
     if not Silent: print("compute_basins(..)")
+    if Backend == "explicit" and (Update not in ["asynchronous", "synchronous"] or len(Primes) > EXPLICIT_MAX_SIZE):
+        if not Silent: print(" explicit basins require the asynchronous or synchronous update and at most {m} variables, using NuSMV".format(m=EXPLICIT_MAX_SIZE))
+        Backend = "nusmv"
+
     if not any([Weak, Strong, CycleFree]):
         if not Silent: print(" nothing to do. you should enable at least one of the parameters Weak, Strong, CycleFree.")
         return
 
+    # all basin queries have the initial states TRUE and are checked by a single NuSMV call
+    queries = []
     n = len(AttrJson["attractors"])
     for i,x in enumerate(AttrJson["attractors"]):
         if not Silent: print(" working on attractor {i}/{n}: {l}".format(i=i+1,n=n,l=x["state"]["str"]))
@@ -227,7 +460,7 @@ def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplo
             if n == 1:
                 x["weak_basin"] = _default_basin(Primes)
             else:
-                x["weak_basin"] = weak_basin(Primes, Update, Subspace=x["mintrapspace"]["dict"], Minimize=Minimize)
+                queries.append((i, "weak_basin"))
 
         if Strong:
         # strong basin
@@ -236,12 +469,29 @@ def compute_basins(AttrJson, Weak=True, Strong=True, CycleFree=True, FnameBarplo
                 x["strong_basin"] = _default_basin(Primes)
 
             else:
-                x["strong_basin"] = strong_basin(Primes, Update, Subspace=x["mintrapspace"]["dict"], Minimize=Minimize)
+                queries.append((i, "strong_basin"))
 
         if CycleFree:
             # cycle-free basin
             if not Silent: print("  cyclefree_basin(..)")
-            x["cyclefree_basin"] = cyclefree_basin(Primes, Update, Subspace=x["mintrapspace"]["dict"], Minimize=Minimize)
+            queries.append((i, "cyclefree_basin"))
+
+    attractors = AttrJson["attractors"]
+    if queries and Backend == "explicit":
+        # all basins of all attractors in one pass over the states
+        if not Silent: print(" computing {q} basins explicitly".format(q=len(queries)))
+        basins = explicit_basins(Primes, Update, [x["mintrapspace"]["dict"] for x in attractors], Weak and n>1, Strong and n>1, CycleFree, Minimize)
+
+        for i, key in queries:
+            attractors[i][key] = basins[i][key]
+
+    elif queries:
+        if not Silent: print(" checking {q} basin queries".format(q=len(queries)))
+        specs = [CTL_PATTERNS[key].format(x=PyBoolNet.TemporalLogic.subspace2proposition(Primes, attractors[i]["mintrapspace"]["dict"])) for i, key in queries]
+        results = PyBoolNet.ModelChecking.check_primes_batch(Primes, Update, "INIT TRUE", specs, AcceptingStates=True)
+
+        for (i, key), (ans, acc) in zip(queries, results):
+            attractors[i][key] = _acceptingstates2basin(Primes, acc, Minimize)
 
     if FnameBarplot:
         create_barplot(AttrJson, FnameBarplot, Title=None, Silent=Silent)
@@ -2,13 +2,29 @@
 
 import subprocess
 import os
+import sys
 import PyBoolNet
 import re
 
 from PyBoolNet.Utility.Misc import os_is_windows
 
-EQNTOTT_CMD = PyBoolNet.Utility.Misc.find_command("eqntott")
-ESPRESSO_CMD = PyBoolNet.Utility.Misc.find_command("espresso")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"EQNTOTT_CMD": "eqntott", "ESPRESSO_CMD": "espresso"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _cmd(Name):
+    """
+    the command of the module attribute *Name*, see *COMMANDS*
+    """
+
+    return getattr(sys.modules[__name__], Name)
 
 
 
@@ -131,8 +147,8 @@ def minimize_espresso(Expression, Outputfile=None, Merge=False, Equiv=False, Exa
         Expression = Expression + ";"
         AddColon = True
     
-    eqntott_cmd = [EQNTOTT_CMD, '-f', '-l']
-    espresso_cmd = [ESPRESSO_CMD, '-o', 'eqntott']
+    eqntott_cmd = [_cmd("EQNTOTT_CMD"), '-f', '-l']
+    espresso_cmd = [_cmd("ESPRESSO_CMD"), '-o', 'eqntott']
     eqntott_in = None
     espresso_out = ''
     PLA_Name = 'Standard Input'
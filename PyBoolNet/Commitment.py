@@ -6,6 +6,8 @@ import itertools
 import random
 import operator
 import functools
+import collections
+import concurrent.futures
 import networkx
 
 BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__))))
@@ -20,7 +22,15 @@ import PyBoolNet.InteractionGraphs
 import PyBoolNet.PrimeImplicants
 
 
-CMD_DOT = PyBoolNet.Utility.Misc.find_command("dot")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_DOT": "dot"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 perc2str = PyBoolNet.Utility.Misc.perc2str
 
@@ -29,7 +39,7 @@ COMMITMENT_COLORS = ["#a6cee3", "#1f78b4", "#b2df8a", "#33a02c", "#fb9a99", "#e3
 COMMITMENT_COLORS = ["#8dd3c7", "#ffffb3", "#bebada", "#fb8072", "#80b1d3", "#fdb462", "#b3de69", "#fccde5", "#d9d9d9", "#bc80bd", "#ccebc5"] # colorbrewer
 
 
-def compute_diagram(AttrJson, FnameImage=None, FnameJson=None, EdgeData=False, Silent=False):
+def compute_diagram(AttrJson, FnameImage=None, FnameJson=None, EdgeData=False, Silent=False, Workers=1):
     # :ref:`commitment_compute_diagram`
     """
      Computes the commitment diagram for the AttrJson and STG defined in *AttrJson*, a json object computed by :ref:`AttrJson_compute_json`
@@ -44,6 +54,7 @@ def compute_diagram(AttrJson, FnameImage=None, FnameJson=None, EdgeData=False, S
         * *FnameJson* (str): save diagram as json
         * *EdgeData* (bool): toggles computation of additional edge data
         * *Silent* (bool): print infos to screen
+        * *Workers* (int): number of model checking queries that run concurrently
 
     **returns**::
         * *Diagram* (netowrkx.DiGraph): the commitment diagram
@@ -106,7 +117,7 @@ def compute_diagram(AttrJson, FnameImage=None, FnameJson=None, EdgeData=False, S
 
             attrs_projected = project_attractors(Subspaces, component)
 
-            diagram, count = _compute_diagram_component(subprimes, Update, attrs_projected, EdgeData, Silent)
+            diagram, count = _compute_diagram_component(subprimes, Update, attrs_projected, EdgeData, Silent, Workers)
             counter_mc+=count
 
             diagrams.append(diagram)
@@ -195,15 +206,54 @@ def open_diagram(Fname):
     return diagram
 
 
-def _compute_diagram_component(Primes, Update, Subspaces, EdgeData, Silent):
+def _compute_diagram_component(Primes, Update, Subspaces, EdgeData, Silent, Workers=1):
     """
     Also computes the commitment diagram but without removing out-DAGs or considering connected components separately.
     Not meant for general use. Use compute_diagram(..) instead.
+    The queries of an input combination and the edge queries of the nodes are executed by *Workers* threads,
+    the results are used in the same order as by a single worker.
     """
 
     assert(Update in PyBoolNet.StateTransitionGraphs.UPDATE_STRATEGIES)
     assert(Primes)
 
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=Workers) if Workers>1 else None
+    try:
+        return _compute_diagram_component_queries(Primes, Update, Subspaces, EdgeData, Silent, executor, Workers)
+    finally:
+        if executor:
+            executor.shutdown(wait=True)
+
+
+def _ordered_results(Executor, Function, Jobs, Workers):
+    """
+    Yields *Function(job)* for the *Jobs* in their order. With an *Executor* up to *Workers* jobs are run ahead of the consumer,
+    the jobs that have not started when the consumer stops are cancelled.
+    """
+
+    if Executor is None:
+        for job in Jobs:
+            yield Function(job)
+        return
+
+    jobs = iter(Jobs)
+    futures = collections.deque(Executor.submit(Function, job) for job in itertools.islice(jobs, Workers))
+    try:
+        while futures:
+            result = futures.popleft().result()
+            for job in itertools.islice(jobs, 1):
+                futures.append(Executor.submit(Function, job))
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _compute_diagram_component_queries(Primes, Update, Subspaces, EdgeData, Silent, Executor, Workers):
+    """
+    The part of _compute_diagram_component(..) that creates and executes the queries.
+    """
+
     # create nodes
     counter_mc = 0
     node_id = 0
@@ -229,39 +279,46 @@ def _compute_diagram_component(Primes, Update, Subspaces, EdgeData, Silent):
         vectors = len(attr)*[[0,1]]
         vectors = list(itertools.product(*vectors))
         random.shuffle(vectors)
+        vectors = [x for x in vectors if sum(x)>0]
 
         combination_formula = PyBoolNet.TemporalLogic.subspace2proposition(Primes, combination)
 
         if not Silent:
             print("  input combination %i, worst case #nodes: %i"%(i,2**len(attr)-1))
 
-        for vector in vectors:
-            if sum(vector)==0: continue
-            if states_covered==states_per_case:
-                if not Silent:
-                    print("  avoided executions of NuSMV due to state counting")
-                break
-
+        def node_query(vector, attr=attr, specs=specs, combination_formula=combination_formula):
             if len(vector)==1:
                 data = {"attractors":   attr,
                         "size":             states_per_case,
                         "formula":          combination_formula}
 
-            else:
+                return data, 0
 
-                init = "INIT %s"%combination_formula
+            init = "INIT %s"%combination_formula
 
-                reach = ["EF(%s)"%x for flag, x in zip(vector, specs) if flag]
-                reach_all  = " & ".join(reach)
-                reach_some = " | ".join(reach)
-                spec = "CTLSPEC %s & AG(%s)"%(reach_all,reach_some)
+            reach = ["EF(%s)"%x for flag, x in zip(vector, specs) if flag]
+            reach_all  = " & ".join(reach)
+            reach_some = " | ".join(reach)
+            spec = "CTLSPEC %s & AG(%s)"%(reach_all,reach_some)
 
-                answer, accepting = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(Primes, Update, init, spec)
-                counter_mc+=1
+            answer, accepting = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(Primes, Update, init, spec)
+
+            data = {"attractors":   [x for flag,x in zip(vector, attr) if flag],
+                    "size":             accepting["INITACCEPTING_SIZE"],
+                    "formula":          accepting["INITACCEPTING"]}
+
+            return data, 1
+
+        # the state counting is checked before a result is requested, a single worker does not execute the remaining queries
+        results = _ordered_results(Executor, node_query, vectors, Workers)
+        for vector in vectors:
+            if states_covered==states_per_case:
+                if not Silent:
+                    print("  avoided executions of NuSMV due to state counting")
+                break
 
-                data = {"attractors":   [x for flag,x in zip(vector, attr) if flag],
-                        "size":             accepting["INITACCEPTING_SIZE"],
-                        "formula":          accepting["INITACCEPTING"]}
+            data, count = next(results)
+            counter_mc+=count
 
             if data["size"]>0:
                 diagram.add_node(node_id)
@@ -269,6 +326,7 @@ def _compute_diagram_component(Primes, Update, Subspaces, EdgeData, Silent):
                     diagram.nodes[node_id][key] = value
                 node_id+=1
                 states_covered+= data["size"]
+        results.close()
 
     if not Silent:
         perc = "= %.2f%%"%(100.*diagram.order()/worst_case_nodes) if worst_case_nodes else ""
@@ -290,37 +348,50 @@ def _compute_diagram_component(Primes, Update, Subspaces, EdgeData, Silent):
         worst_case_edges = sum(len(x) for x in potential_targets.values())
         print("  worst case #edges: %i"%worst_case_edges)
 
-    # create edges
-    for source, source_data in diagram.nodes(data=True):
-        for target, target_data in potential_targets[source]:
+    # create edges, the queries of a source share the initial states and are checked by a single NuSMV call
+    def edge_query(job):
+        source, source_data = job
+        count = 0
 
-            init = "INIT %s"%source_data["formula"]
-            spec = "CTLSPEC EX(%s)"%target_data["formula"]
-            answer, accepting = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(Primes, Update, init, spec)
-            counter_mc+=1
+        init = "INIT %s"%source_data["formula"]
+        specs = ["CTLSPEC EX(%s)"%target_data["formula"] for target, target_data in potential_targets[source]]
+        results = PyBoolNet.ModelChecking.check_primes_batch(Primes, Update, init, specs, AcceptingStates=True)
+        count+=1
 
+        edges = []
+        for (target, target_data), (answer, accepting) in zip(potential_targets[source], results):
             data = {}
             data["EX_size"] = accepting["INITACCEPTING_SIZE"]
             data["EX_formula"] = accepting["INITACCEPTING"]
 
             if data["EX_size"]>0:
+                edges.append((target, target_data, data))
 
-                if EdgeData:
-                    if len(potential_targets[source])==1:
-                        data["EF_size"] = source_data["size"]
-                        data["EF_formula"] = source_data["formula"]
+        if EdgeData and edges:
+            if len(potential_targets[source])==1:
+                for target, target_data, data in edges:
+                    data["EF_size"] = source_data["size"]
+                    data["EF_formula"] = source_data["formula"]
 
-                    else:
-                        spec = "CTLSPEC E[%s U %s]"%(source_data["formula"],target_data["formula"])
-                        answer, accepting = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(Primes, Update, init, spec)
-                        counter_mc+=1
+            else:
+                specs = ["CTLSPEC E[%s U %s]"%(source_data["formula"],target_data["formula"]) for target, target_data, data in edges]
+                results = PyBoolNet.ModelChecking.check_primes_batch(Primes, Update, init, specs, AcceptingStates=True)
+                count+=1
 
-                        data["EF_size"] = accepting["INITACCEPTING_SIZE"]
-                        data["EF_formula"] = accepting["INITACCEPTING"]
+                for (target, target_data, data), (answer, accepting) in zip(edges, results):
+                    data["EF_size"] = accepting["INITACCEPTING_SIZE"]
+                    data["EF_formula"] = accepting["INITACCEPTING"]
 
-                diagram.add_edge(source, target)
-                for key, value in data.items():
-                    diagram.edges[source, target][key] = value
+        return source, edges, count
+
+    sources = [(x, data) for x, data in diagram.nodes(data=True) if potential_targets[x]]
+    for source, edges, count in _ordered_results(Executor, edge_query, sources, Workers):
+        counter_mc+=count
+
+        for target, target_data, data in edges:
+            diagram.add_edge(source, target)
+            for key, value in data.items():
+                diagram.edges[source, target][key] = value
 
     if not Silent:
         perc = "= %.2f%%"%(100.*diagram.size()/worst_case_edges) if worst_case_edges else ""
@@ -3,15 +3,35 @@
 
 import subprocess
 import os
+import sys
 import ast
 import datetime
+import re
+import numpy
 
 import PyBoolNet.PrimeImplicants
 import PyBoolNet.InteractionGraphs
 import PyBoolNet.QuineMcCluskey
 import PyBoolNet.Utility.Misc
 
-CMD_BNET2PRIMES = PyBoolNet.Utility.Misc.find_command("bnet2prime")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_BNET2PRIMES": "bnet2prime"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _cmd(Name):
+    """
+    the command of the module attribute *Name*, see *COMMANDS*
+    """
+
+    return getattr(sys.modules[__name__], Name)
+BNET_TOKEN = re.compile(r"[!&|()]|[^\s!&|()]+")
 
 
 def _bnet2primes_error(proc, out, err, cmd):
@@ -26,20 +46,156 @@ def _bnet2primes_error(proc, out, err, cmd):
         raise Exception
 
 
-def bnet2primes( BNET, FnamePRIMES=None ):
+def _bnet_parse(Tokens):
+    """
+    parses the tokens of a bnet expression, precedence: ! > & > |
+    returns a tree of ("const", 0/1), ("var", name), ("not", tree), ("and", [trees]), ("or", [trees])
+    """
+
+    pos = [0]
+
+    def peek():
+        return Tokens[pos[0]] if pos[0]<len(Tokens) else None
+
+    def take():
+        token = peek()
+        if token==None:
+            raise Exception('unexpected end of expression: "%s"'%''.join(Tokens))
+        pos[0]+= 1
+        return token
+
+    def parse_or():
+        args = [parse_and()]
+        while peek()=="|":
+            take()
+            args.append(parse_and())
+        return args[0] if len(args)==1 else ("or", args)
+
+    def parse_and():
+        args = [parse_not()]
+        while peek()=="&":
+            take()
+            args.append(parse_not())
+        return args[0] if len(args)==1 else ("and", args)
+
+    def parse_not():
+        if peek()=="!":
+            take()
+            return ("not", parse_not())
+        token = take()
+        if token=="(":
+            tree = parse_or()
+            if take()!=")":
+                raise Exception('missing closing parenthesis: "%s"'%''.join(Tokens))
+            return tree
+        if token in ["0","1"]:
+            return ("const", int(token))
+        if token in ["!","&","|",")"]:
+            raise Exception('unexpected token "%s": "%s"'%(token,''.join(Tokens)))
+        return ("var", token)
+
+    tree = parse_or()
+    if peek()!=None:
+        raise Exception('unexpected token "%s": "%s"'%(peek(),''.join(Tokens)))
+
+    return tree
+
+
+def _bnet_variables(Tree, Variables):
+    """
+    adds the variables of a bnet expression tree to the set *Variables*
+    """
+
+    if Tree[0]=="var":
+        Variables.add(Tree[1])
+    elif Tree[0]=="not":
+        _bnet_variables(Tree[1], Variables)
+    elif Tree[0] in ["and","or"]:
+        for x in Tree[1]:
+            _bnet_variables(x, Variables)
+
+    return Variables
+
+
+def _bnet_evaluate(Tree, Columns, Size):
+    """
+    evaluates a bnet expression tree for all rows of a truth table, *Columns* maps names to bool arrays
+    """
+
+    if Tree[0]=="const":
+        return numpy.full(Size, bool(Tree[1]))
+    if Tree[0]=="var":
+        return Columns[Tree[1]]
+    if Tree[0]=="not":
+        return ~_bnet_evaluate(Tree[1], Columns, Size)
+
+    values = [_bnet_evaluate(x, Columns, Size) for x in Tree[1]]
+    if Tree[0]=="and":
+        return numpy.logical_and.reduce(values)
+    return numpy.logical_or.reduce(values)
+
+
+def _bnet2primes_python(BNET):
+    """
+    computes the prime implicants of the contents of a bnet file in-process, see bnet2primes
+    """
+
+    functions = []
+    names = set()
+    for line in BNET.split("\n"):
+        line = line.split("#")[0].strip()
+        if not line:
+            continue
+        if not "," in line:
+            print('invalid line in bnet: "%s"'%line)
+            raise Exception
+        name, expression = [x.strip() for x in line.split(",", 1)]
+        if name.lower()=="targets" and expression.lower()=="factors":
+            continue
+        if name in names:
+            print('variable "%s" is defined twice'%name)
+            raise Exception
+        names.add(name)
+        functions.append((name, _bnet_parse(BNET_TOKEN.findall(expression))))
+
+    primes = {}
+    missing = set()
+    for name, tree in functions:
+        inputs = sorted(_bnet_variables(tree, set()))
+        missing.update(x for x in inputs if not x in names)
+        size = 2**len(inputs)
+        rows = numpy.arange(size)
+        columns = dict((x, (rows>>(len(inputs)-1-k)) & 1 == 1) for k,x in enumerate(inputs))
+        values = _bnet_evaluate(tree, columns, size)
+        primes[name] = PyBoolNet.QuineMcCluskey.truthtable2primes(inputs, values)
+
+    for name in sorted(missing):
+        primes[name] = [[{name:0}],[{name:1}]]
+
+    return primes
+
+
+def bnet2primes( BNET, FnamePRIMES=None, Engine="python" ):
     """
     Generates and returns the prime implicants of a Boolean network in :ref:`installation_boolnet` format.
     The primes are saved as a *json* file if *FnamePRIMES* is given.
     The argument *BNET* may be either the name of a *bnet* file or a string containing the file contents.
     Use the function :ref:`FileExchange.read_primes <read_primes>` to open a previously saved *json* file.
 
+    The default engine computes the primes in-process from the truth table of each function,
+    see :ref:`QuineMcCluskey.truthtable2primes <truthtable2primes>`.
+    Variables that appear in a function but have none are added as inputs.
+    The primes are those of :ref:`BNetToPrime <installation_bnettoprime>` but the order of the primes of a value may differ,
+    use :ref:`PrimeImplicants.are_equal <are_equal>` to compare primes.
+
     .. note::
 
-        Requires the program :ref:`BNetToPrime <installation_bnettoprime>`.
+        The engine *"bnet2prime"* requires the program :ref:`BNetToPrime <installation_bnettoprime>`.
 
     **arguments**:
        * *BNET*: name of *bnet* file or string contents of file
        * *FnamePRIMES*: *None* or name of *json* file to save primes
+       * *Engine* (str): either *"python"* or *"bnet2prime"*
 
     **returns**:
        * *Primes*: prime implicants
@@ -50,6 +206,28 @@ def bnet2primes( BNET, FnamePRIMES=None ):
           >>> primes = bnet2primes("mapk.bnet")
           >>> primes = bnet2primes("Erk, !Mek \\n Raf, Ras & Mek")
           >>> primes = bnet2primes("Erk, !Mek \\n Raf, Ras & Mek", "mapk.primes")
+          >>> primes = bnet2primes("mapk.bnet", Engine="bnet2prime")
+    """
+
+    if Engine=="python":
+        if os.path.isfile(BNET):
+            with open(BNET) as f:
+                BNET = f.read()
+        primes = _bnet2primes_python(BNET)
+        if FnamePRIMES!=None:
+            write_primes(primes, FnamePRIMES)
+        return primes
+
+    if Engine!="bnet2prime":
+        print('Engine must be "python" or "bnet2prime", got %s'%str(Engine))
+        raise Exception
+
+    return _bnet2primes_binary(BNET, FnamePRIMES)
+
+
+def _bnet2primes_binary(BNET, FnamePRIMES):
+    """
+    calls BNetToPrime, see bnet2primes
     """
 
     # input and output via filename
@@ -59,7 +237,7 @@ def bnet2primes( BNET, FnamePRIMES=None ):
 
         if FnamePRIMES!=None:
 
-            cmd = [CMD_BNET2PRIMES, FnameBNET, FnamePRIMES]
+            cmd = [_cmd("CMD_BNET2PRIMES"), FnameBNET, FnamePRIMES]
             proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             out, err = proc.communicate()
             out = out.decode()
@@ -75,7 +253,7 @@ def bnet2primes( BNET, FnamePRIMES=None ):
     elif os.path.isfile(BNET) and FnamePRIMES==None:
         FnameBNET = BNET
 
-        cmd = [CMD_BNET2PRIMES, FnameBNET]
+        cmd = [_cmd("CMD_BNET2PRIMES"), FnameBNET]
         proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         out, err = proc.communicate()
         out = out.decode()
@@ -94,7 +272,7 @@ def bnet2primes( BNET, FnamePRIMES=None ):
         print("Need to specify either a bnet file name or a json file name.")
         raise Exception
 
-        cmd = [CMD_BNET2PRIMES, ">", FnamePRIMES]
+        cmd = [_cmd("CMD_BNET2PRIMES"), ">", FnamePRIMES]
         proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         out, err = proc.communicate( input=BNET.encode() )
         out = out.decode()
@@ -109,7 +287,7 @@ def bnet2primes( BNET, FnamePRIMES=None ):
     # input via stdin / output to stdout
     elif not os.path.isfile(BNET) and FnamePRIMES==None:
 
-        cmd = [CMD_BNET2PRIMES]
+        cmd = [_cmd("CMD_BNET2PRIMES")]
         proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         out, err = proc.communicate( input=BNET.encode() )
         proc.stdin.close()
@@ -4,14 +4,30 @@ import itertools
 import subprocess
 import math
 import os
+import sys
 import networkx
 
 import PyBoolNet.StateTransitionGraphs
 import PyBoolNet.Utility.Misc
 import PyBoolNet.Utility.DiGraphs
 
-CMD_DOT = PyBoolNet.Utility.Misc.find_command("dot")
-CMD_CONVERT = PyBoolNet.Utility.Misc.find_command("convert")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_DOT": "dot", "CMD_CONVERT": "convert"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _cmd(Name):
+    """
+    the command of the module attribute *Name*, see *COMMANDS*
+    """
+
+    return getattr(sys.modules[__name__], Name)
 
 
 def dot2image(FnameDOT, FnameIMAGE):
@@ -633,7 +649,7 @@ def activities2animation(IGraph, Activities, FnameGIF, FnameTMP="tmp*.jpg", Dela
                      Silent = True)
 
     filetype = FnameTMP.split(".")[-1]
-    cmd = [CMD_CONVERT, "-delay", str(Delay), "-loop", str(Loop), FnameTMP, FnameGIF]
+    cmd = [_cmd("CMD_CONVERT"), "-delay", str(Delay), "-loop", str(Loop), FnameTMP, FnameGIF]
     proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     output, error = proc.communicate()
 
@@ -5,18 +5,40 @@ import tempfile
 import subprocess
 import ast
 import datetime
+import json
+import time
+import atexit
+import threading
+import contextlib
 
 import PyBoolNet
 
 
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 BASE = os.path.normpath(BASE)
-CMD_NUSMV = PyBoolNet.Utility.Misc.find_command("nusmv")
+
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_NUSMV": "nusmv"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    if name == "NUSMVKEYWORDS":
+        return PyBoolNet.Utility.Misc.get_nusmv_keywords()
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _cmd(Name):
+    """
+    the command of the module attribute *Name*, see *COMMANDS*
+    """
+
+    return getattr(sys.modules[__name__], Name)
 
 fname_nusmvkeywords = os.path.join( BASE, "Dependencies", "nusmvkeywords.json" )
-with open(fname_nusmvkeywords) as f:
-    NUSMVKEYWORDS = f.read()
-    NUSMVKEYWORDS = ast.literal_eval(NUSMVKEYWORDS)
 
 
 
@@ -29,7 +51,7 @@ def print_warning_accstates_bug(Primes,CTLSpec):
         print("WARNING: accepting states bug might affect result, see http://github.com/hklarner/PyBoolNet/issues/14")
 
 
-def check_primes(Primes, Update, InitialStates, Specification, DynamicReorder=True, DisableReachableStates=True, ConeOfInfluence=True, Silent=True):
+def check_primes(Primes, Update, InitialStates, Specification, DynamicReorder=True, DisableReachableStates=True, ConeOfInfluence=True, Silent=True, Session=None):
     """
     Calls :ref:`installation_nusmv` to check whether the *Specification* is true or false in the transition system defined by *Primes*,
     the *InitialStates* and *Update*.
@@ -46,6 +68,7 @@ def check_primes(Primes, Update, InitialStates, Specification, DynamicReorder=Tr
         * *DisableReachableStates* (bool): disables the computation of reachable states using *-df*
         * *ConeOfInfluence* (bool): enables cone of influence reduction using *-coi*
         * *Silent* (bool): print infos to screen
+        * *Session* (NuSMVSession/SessionPool): check the query in a running NuSMV session, the NuSMV options above are then ignored
 
     **returns**:
         * *Answer* (bool): result of query
@@ -60,7 +83,10 @@ def check_primes(Primes, Update, InitialStates, Specification, DynamicReorder=Tr
 
     """
 
-    cmd = [CMD_NUSMV]
+    if Session is not None:
+        return _session_handle(Session, Primes, Update, False, lambda x: x.check(InitialStates, Specification))
+
+    cmd = [_cmd("CMD_NUSMV")]
     cmd+= ['-dcx']
 
     if DynamicReorder:
@@ -127,7 +153,7 @@ def check_primes_with_counterexample(Primes, Update, InitialStates, Specificatio
          ({'v1':0,'v2':0},{'v1':1,'v2':0},{'v1':1,'v2':1})
     """
 
-    cmd = [CMD_NUSMV]
+    cmd = [_cmd("CMD_NUSMV")]
 
     if DynamicReorder:
         cmd+= ['-dynamic']
@@ -159,7 +185,7 @@ def check_primes_with_counterexample(Primes, Update, InitialStates, Specificatio
     return nusmv_handle(cmd, proc, out, err, DisableCounterExamples=False, AcceptingStates=False)
 
 
-def check_primes_with_acceptingstates(Primes, Update, InitialStates, CTLSpec, DynamicReorder=True, ConeOfInfluence=True, Silent=True):
+def check_primes_with_acceptingstates(Primes, Update, InitialStates, CTLSpec, DynamicReorder=True, ConeOfInfluence=True, Silent=True, Session=None):
     """
     Calls :ref:`installation_nusmv` to check whether the *CTLSpec* is true or false in the transition system defined by *Primes*,
     the *InitialStates* and *Update*.
@@ -190,6 +216,7 @@ def check_primes_with_acceptingstates(Primes, Update, InitialStates, CTLSpec, Dy
         * *DynamicReorder* (bool): enables dynamic reordering of variables (*-dynamic*)
         * *ConeOfInfluence* (bool): enables cone of influence reduction using *-coi*
         * *Silent* (bool): print infos to screen
+        * *Session* (NuSMVSession/SessionPool): check the query in a running NuSMV session, the NuSMV options above are then ignored
 
     **returns**:
         * *Answer, AcceptingStates* (bool, dict): result of query with accepting states
@@ -206,9 +233,12 @@ def check_primes_with_acceptingstates(Primes, Update, InitialStates, CTLSpec, Dy
 
     assert(CTLSpec[:7] == "CTLSPEC")
 
+    if Session is not None:
+        return _session_handle(Session, Primes, Update, True, lambda x: x.check_with_acceptingstates(InitialStates, CTLSpec))
+
     print_warning_accstates_bug(Primes, CTLSpec)
 
-    cmd = [CMD_NUSMV]
+    cmd = [_cmd("CMD_NUSMV")]
     cmd+= ['-dcx']
     cmd+= ['-a','print']
 
@@ -245,6 +275,107 @@ def check_primes_with_acceptingstates(Primes, Update, InitialStates, CTLSpec, Dy
     return nusmv_handle(cmd, proc, out, err, DisableCounterExamples=True, AcceptingStates=True)
 
 
+def check_primes_batch(Primes, Update, InitialStates, Specifications, AcceptingStates=False, DynamicReorder=True, DisableReachableStates=True, ConeOfInfluence=True, Silent=True, Session=None):
+    """
+    Calls :ref:`installation_nusmv` once to check all *Specifications* in the transition system defined by *Primes*,
+    the *InitialStates* and *Update*.
+    The specifications are written into a single *smv* file, so that the model is built only once instead of once per query,
+    see :ref:`check_primes` and :ref:`check_primes_with_acceptingstates` for the single query versions.
+    The remaining arguments are :ref:`installation_nusmv` options, see the manual at http://nusmv.fbk.eu for details.
+
+    .. note::
+        If *AcceptingStates* is enabled all specifications must be CTL formulas and *DisableReachableStates* is enforced,
+        see :ref:`check_primes_with_acceptingstates` for details regarding the *AcceptingStates* dictionaries.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Update* (str): the update strategy, either *"synchronous"*, *"asynchronous"* or *"mixed"*
+        * *InitialStates* (str): a :ref:`installation_nusmv` expression for the initial states, including the keyword *INIT*
+        * *Specifications* (list): :ref:`installation_nusmv` formulas, each including the keyword *LTLSPEC* or *CTLSPEC*
+        * *AcceptingStates* (bool): return the accepting states of each specification
+        * *DynamicReorder* (bool): enables dynamic reordering of variables using *-dynamic*
+        * *DisableReachableStates* (bool): disables the computation of reachable states using *-df*
+        * *ConeOfInfluence* (bool): enables cone of influence reduction using *-coi*
+        * *Silent* (bool): print infos to screen
+        * *Session* (NuSMVSession/SessionPool): check the queries one by one in a running NuSMV session, the NuSMV options above are then ignored
+
+    **returns**:
+        * *Answers* (list): the result of each query, or a tuple *(Answer, AcceptingStates)* for each query if *AcceptingStates* is enabled
+
+    **example**::
+
+        >>> init = "INIT TRUE"
+        >>> update = "asynchronous"
+        >>> specs = ["CTLSPEC AF(EG(v1&!v2))", "CTLSPEC EF(v1)"]
+        >>> check_primes_batch(primes, update, init, specs)
+        [False, True]
+        >>> answers = check_primes_batch(primes, update, init, specs, AcceptingStates=True)
+        >>> answers[1][1]["INITACCEPTING_SIZE"]
+        6
+    """
+
+    if not Specifications:
+        return []
+
+    if Session is not None:
+        if AcceptingStates:
+            check = lambda x: [x.check_with_acceptingstates(InitialStates, y) for y in Specifications]
+        else:
+            check = lambda x: [x.check(InitialStates, y) for y in Specifications]
+        return _session_handle(Session, Primes, Update, AcceptingStates, check)
+
+    if AcceptingStates:
+        assert(all(x[:7] == "CTLSPEC" for x in Specifications))
+        for x in Specifications:
+            print_warning_accstates_bug(Primes, x)
+
+    # NuSMV checks the CTL specifications before the LTL specifications
+    order = [i for i, x in enumerate(Specifications) if x[:7] == "CTLSPEC"]
+    order+= [i for i, x in enumerate(Specifications) if x[:7] != "CTLSPEC"]
+
+    cmd = [_cmd("CMD_NUSMV")]
+    cmd+= ['-dcx']
+
+    if AcceptingStates:
+        cmd+= ['-a','print']
+    if DynamicReorder:
+        cmd+= ['-dynamic']
+    if DisableReachableStates or AcceptingStates:
+        cmd+= ['-df']
+    if ConeOfInfluence:
+        cmd+= ['-coi']
+
+    tmpfile = tempfile.NamedTemporaryFile(delete=False, prefix="pyboolnet_")
+    tmpfname = tmpfile.name
+    if not Silent:
+        print("created %s"%tmpfname)
+    tmpfile.close()
+    smvfile = primes2smv(Primes, Update, InitialStates, [Specifications[i] for i in order], FnameSMV=tmpfname, Silent=True)
+
+    cmd+= [tmpfname]
+    try:
+        if not Silent: print("cmd: %s"%' '.join(cmd))
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception:
+        print("could not start process for nusmv")
+        print("cmd: %s"%' '.join(cmd))
+        raise Exception
+
+    out, err = proc.communicate()
+    out = out.decode()
+
+    if os.path.isfile(tmpfname):
+        os.remove(tmpfname)
+
+    results = nusmv_handle_batch(cmd, proc, out, err, len(Specifications), AcceptingStates)
+
+    answers = len(Specifications)*[None]
+    for i, result in zip(order, results):
+        answers[i] = result
+
+    return answers
+
+
 def check_smv(FnameSMV, DynamicReorder=True, DisableReachableStates=True, ConeOfInfluence=True):
     """
     Calls :ref:`installation_nusmv` with the query defined in the *smv* file *FnameSMV*.
@@ -271,7 +402,7 @@ def check_smv(FnameSMV, DynamicReorder=True, DisableReachableStates=True, ConeOf
         False
     """
 
-    cmd = [CMD_NUSMV]
+    cmd = [_cmd("CMD_NUSMV")]
     cmd+= ['-dcx']
 
     if DynamicReorder:
@@ -318,7 +449,7 @@ def check_smv_with_counterexample(FnameSMV, DynamicReorder=True, DisableReachabl
         ({'Erk':0,'Mek':0},{'Erk':1,'Mek':0},{'Erk':1,'Mek':1})
     """
 
-    cmd = [CMD_NUSMV]
+    cmd = [_cmd("CMD_NUSMV")]
 
     if DynamicReorder:
         cmd+= ['-dynamic']
@@ -361,7 +492,7 @@ def check_smv_with_acceptingstates(FnameSMV, DynamicReorder=True, ConeOfInfluenc
         'Erk | !Mek'
     """
 
-    cmd = [CMD_NUSMV]
+    cmd = [_cmd("CMD_NUSMV")]
     cmd+= ['-dcx']
 
     if DynamicReorder:
@@ -415,7 +546,7 @@ def primes2smv(Primes, Update, InitialStates, Specification, FnameSMV=None, Sile
         * *Primes*: prime implicants
         * *Update* (str): the update strategy, either *"synchronous"*, *"asynchronous"* or *"mixed"*
         * *InitialStates* (str): a :ref:`installation_nusmv` expression for the initial states, including the keyword *INIT*
-        * *Specification* (str): a :ref:`installation_nusmv` formula, including the keyword *LTLSPEC* or *CTLSPEC*
+        * *Specification* (str/list): a :ref:`installation_nusmv` formula, including the keyword *LTLSPEC* or *CTLSPEC*, or a list of formulas
         * *FnameSMV* (str): name for *smv* file or *None*
         * *Silent* (bool): print infos to screen
 
@@ -435,7 +566,9 @@ def primes2smv(Primes, Update, InitialStates, Specification, FnameSMV=None, Sile
     assert(type(FnameSMV)==type(None) or type(FnameSMV)==str)
     assert(Update in PyBoolNet.StateTransitionGraphs.UPDATE_STRATEGIES)
     assert(InitialStates[:5] == "INIT ")
-    assert(Specification[:8] in ["CTLSPEC ", "LTLSPEC "])
+    if type(Specification)==str:
+        Specification = [Specification]
+    assert(all(x[:8] in ["CTLSPEC ", "LTLSPEC "] for x in Specification))
 
     if not Primes:
         print('You are trying to create an SMV file for the empty Boolean network.')
@@ -472,7 +605,7 @@ def primes2smv(Primes, Update, InitialStates, Specification, FnameSMV=None, Sile
         print('Please change the name of the following variable: %s'%str(critical))
         raise Exception
 
-    keywords = [x for x in Primes if x in NUSMVKEYWORDS]
+    keywords = [x for x in Primes if x in PyBoolNet.Utility.Misc.get_nusmv_keywords()]
     if keywords:
         print('NuSMV keywords are not allowed as variable names.')
         print('The network contains the following variables names that are also NuSMVkeywords: %s'%str(keywords))
@@ -544,7 +677,7 @@ def primes2smv(Primes, Update, InitialStates, Specification, FnameSMV=None, Sile
             print(' added INIT constraints (Van Ham encoding) for {k}-valued components {x}'.format(k=k, x=', '.join(vanham[k])))
 
     lines+= ['']
-    lines+= [Specification]
+    lines+= Specification
 
     if FnameSMV==None:
         return '\n'.join(lines)
@@ -695,6 +828,59 @@ def output2acceptingstates(NuSMVOutput):
     return accepting
 
 
+def output2answers(NuSMVOutput):
+    """
+    Converts the output of a NuSMV call into the list of answers, one for each specification in the order of the output.
+
+    **arguments**:
+        * *NuSMVOutput* (str): output of a call to NuSMV
+
+    **returns**:
+        * *Answers* (list of bool): whether NuSMV returns "is true" for each specification
+    """
+
+    answers = []
+    for line in NuSMVOutput.split("\n"):
+        line = line.strip()
+        if not line.startswith("-- specification"):
+            continue
+
+        if line.endswith("is true"):
+            answers.append(True)
+        elif line.endswith("is false"):
+            answers.append(False)
+
+    return answers
+
+
+def output2acceptingstates_list(NuSMVOutput):
+    """
+    Converts the output of a NuSMV call with several CTL specifications into a list of accepting states dictionaries,
+    see :ref:`output2acceptingstates`, one for each specification.
+    The lines of a specification start with "initial states:" or, if NuSMV did not compute the initial states, with "accepting states:".
+
+    **arguments**:
+        * *NuSMVOutput* (str): output of a call to NuSMV
+
+    **returns**:
+        * *AcceptingStates* (list of dict): information about the accepting states of each specification
+    """
+
+    blocks = []
+    for line in NuSMVOutput.split("\n"):
+        if line.startswith("initial states:"):
+            blocks.append([])
+        elif line.startswith("accepting states:"):
+            if not blocks or any(x.startswith("accepting states:") for x in blocks[-1]):
+                blocks.append([])
+        elif not blocks:
+            continue
+
+        blocks[-1].append(line)
+
+    return [output2acceptingstates("\n".join(x)) for x in blocks]
+
+
 def nusmv_handle(Command, Process, Output, Error, DisableCounterExamples, AcceptingStates):
     """
     The part of the code of "check_smv" and "check_primes" that is identical in both functions.
@@ -750,3 +936,336 @@ def nusmv_handle(Command, Process, Output, Error, DisableCounterExamples, Accept
         result.append(accepting)
 
     return tuple(result)
+
+
+def nusmv_handle_batch(Command, Process, Output, Error, Specifications, AcceptingStates):
+    """
+    The part of the code of "check_primes_batch" that handles the output of NuSMV, see :ref:`nusmv_handle`.
+
+    **arguments**:
+        * *Command* (list): list of commands that was used to call subprocess.Popen.
+        * *Process* (subprocess.Popen): the object returned by subprocess.Popen
+        * *Output* (Popen.communicate): the object returned by Popen.communicate
+        * *Specifications* (int): the number of specifications in the smv file
+        * *AcceptingStates* (bool): whether information about the accepting states should be returned
+
+    **returns**:
+        * *Answers* (list): the answers in the order of the output, tuples *(Answer, AcceptingStates)* if *AcceptingStates==True*
+    """
+
+    if Process.returncode != 0:
+        print(Output)
+        print(Error)
+        print('NuSMV did not respond with return code 0')
+        print('command: %s'%' '.join(Command))
+        raise Exception
+
+    answers = output2answers(Output)
+    if len(answers) != Specifications:
+        print(Output)
+        print(Error)
+        print('NuSMV output contains %i instead of %i answers "is false" or "is true".'%(len(answers), Specifications))
+        raise Exception
+
+    if not AcceptingStates:
+        return answers
+
+    accepting = output2acceptingstates_list(Output)
+    if len(accepting) != Specifications:
+        print(Output)
+        print(Error)
+        print('NuSMV output contains accepting states for %i instead of %i specifications.'%(len(accepting), Specifications))
+        raise Exception
+
+    return list(zip(answers, accepting))
+
+
+class NuSMVSession(object):
+    """
+    A :ref:`installation_nusmv` process in interactive mode (*-int*) that has read and encoded the transition system
+    defined by *Primes* and *Update*, so that queries are answered without building the model again.
+    The model is created with the initial states *INIT TRUE* and a query with the initial states *I* and the specification
+    *phi* is checked as *I -> phi*, which is true in all states iff *phi* is true in all states of *I*.
+    A session is used by one thread at a time, see :ref:`SessionPool` for sharing sessions between threads.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Update* (str): the update strategy, either *"synchronous"*, *"asynchronous"* or *"mixed"*
+        * *AcceptingStates* (bool): start NuSMV with *-a print* to compute accepting states
+        * *DynamicReorder* (bool): enables dynamic reordering of variables using *-dynamic*
+
+    **example**::
+
+        >>> session = NuSMVSession(primes, "asynchronous")
+        >>> session.check("INIT v1", "CTLSPEC EF(v2)")
+        True
+        >>> check_primes(primes, "asynchronous", "INIT v1", "CTLSPEC EF(v2)", Session=session)
+        True
+        >>> session.close()
+    """
+
+    MARKER = "PYBOOLNET_COMMAND_DONE"
+    PROMPT = "NuSMV > "
+
+    def __init__(self, Primes, Update, AcceptingStates=False, DynamicReorder=True):
+        self.primes = Primes
+        self.update = Update
+        self.acceptingstates = AcceptingStates
+        self.key = _session_key(Primes, Update, AcceptingStates)
+        self.lock = threading.Lock()
+        self.last_used = time.time()
+
+        tmpfile = tempfile.NamedTemporaryFile(delete=False, prefix="pyboolnet_", suffix=".smv")
+        self.fname = tmpfile.name
+        tmpfile.close()
+        primes2smv(Primes, Update, "INIT TRUE", [], FnameSMV=self.fname, Silent=True)
+
+        self.cmd = [_cmd("CMD_NUSMV"), '-int', '-dcx', '-df']
+        if DynamicReorder:
+            self.cmd+= ['-dynamic']
+        if AcceptingStates:
+            self.cmd+= ['-a', 'print']
+
+        try:
+            self.process = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
+        except Exception:
+            print("could not start process for nusmv")
+            print("cmd: %s"%' '.join(self.cmd))
+            os.remove(self.fname)
+            raise Exception
+
+        for command in ["read_model -i %s"%self.fname, "flatten_hierarchy", "encode_variables", "build_model"]:
+            self.execute(command)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def execute(self, Command):
+        """
+        Sends *Command* to NuSMV and returns its output.
+        """
+
+        with self.lock:
+            try:
+                self.process.stdin.write("%s\necho %s\n"%(Command, self.MARKER))
+                self.process.stdin.flush()
+            except (IOError, OSError):
+                print("NuSMV session is not running")
+                print("cmd: %s"%' '.join(self.cmd))
+                raise Exception
+
+            lines = []
+            while True:
+                line = self.process.stdout.readline()
+                if not line:
+                    print("".join(lines))
+                    print("NuSMV session terminated while executing: %s"%Command)
+                    print("cmd: %s"%' '.join(self.cmd))
+                    raise Exception
+
+                line = line.replace(self.PROMPT, "")
+                if line.strip() == self.MARKER:
+                    break
+                lines.append(line)
+
+            self.last_used = time.time()
+
+        return "".join(lines)
+
+    def _check(self, Formula, Type="CTLSPEC"):
+        """
+        the output of check_ctlspec or check_ltlspec for the formula *Formula*
+        """
+
+        assert('"' not in Formula)
+        command = "check_ctlspec" if Type == "CTLSPEC" else "check_ltlspec"
+
+        return self.execute('%s -p "%s"'%(command, Formula))
+
+    def check(self, InitialStates, Specification):
+        """
+        Checks *Specification* for the initial states *InitialStates*, see :ref:`check_primes`.
+        """
+
+        assert(InitialStates[:5] == "INIT ")
+        assert(Specification[:8] in ["CTLSPEC ", "LTLSPEC "])
+
+        output = self._check("(%s) -> (%s)"%(InitialStates[5:].strip(), Specification[8:].strip()), Specification[:7])
+        answers = output2answers(output)
+        if len(answers) != 1:
+            print(output)
+            print('NuSMV output does not respond with "is false" or "is true".')
+            raise Exception
+
+        return answers[0]
+
+    def check_with_acceptingstates(self, InitialStates, CTLSpec):
+        """
+        Checks *CTLSpec* for the initial states *InitialStates* and computes the accepting states,
+        see :ref:`check_primes_with_acceptingstates`.
+        The initial states, the accepting states and their intersection are computed by three queries.
+        """
+
+        assert(self.acceptingstates)
+        assert(InitialStates[:5] == "INIT ")
+        assert(CTLSpec[:7] == "CTLSPEC")
+
+        init = InitialStates[5:].strip()
+        spec = CTLSpec[7:].strip()
+
+        result_init = output2acceptingstates(self._check(init))
+        result_spec = output2acceptingstates(self._check(spec))
+        result_initspec = output2acceptingstates(self._check("(%s) & (%s)"%(init, spec)))
+
+        accepting = {}
+        accepting["INIT"], accepting["INIT_SIZE"] = _initial_and_accepting(result_init)
+        accepting["ACCEPTING"] = result_spec["ACCEPTING"]
+        accepting["ACCEPTING_SIZE"] = result_spec["ACCEPTING_SIZE"]
+        accepting["INITACCEPTING"], accepting["INITACCEPTING_SIZE"] = _initial_and_accepting(result_initspec)
+
+        return accepting["INITACCEPTING_SIZE"] == accepting["INIT_SIZE"], accepting
+
+    def close(self):
+        if self.is_alive():
+            try:
+                self.process.stdin.write("quit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+                self.process.wait()
+
+        for stream in [self.process.stdin, self.process.stdout]:
+            try:
+                stream.close()
+            except (IOError, OSError):
+                pass
+
+        if os.path.isfile(self.fname):
+            os.remove(self.fname)
+
+
+class SessionPool(object):
+    """
+    A thread-safe pool of :ref:`NuSMVSession` objects, one or more for each *Primes*, *Update* and *AcceptingStates*.
+    A session is used by one thread at a time, threads that work on the same network concurrently get separate sessions.
+    Sessions that are unused for longer than *IdleTimeout* seconds are closed the next time the pool is used,
+    at most *MaxIdle* unused sessions are kept.
+    The pool is accepted by the *Session* argument of :ref:`check_primes` and :ref:`check_primes_with_acceptingstates`.
+
+    **arguments**:
+        * *IdleTimeout* (float): seconds after which an unused session is closed
+        * *MaxIdle* (int): maximal number of unused sessions
+
+    **example**::
+
+        >>> for state in states:
+        ...     init = "INIT %s"%TemporalLogic.subspace2proposition(primes, state)
+        ...     check_primes(primes, "asynchronous", init, "CTLSPEC EF(v2)", Session=SESSION_POOL)
+    """
+
+    def __init__(self, IdleTimeout=60., MaxIdle=8):
+        self.idle_timeout = IdleTimeout
+        self.max_idle = MaxIdle
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def acquire(self, Primes, Update, AcceptingStates=False):
+        """
+        An unused session for *Primes* and *Update*, a new one if there is none.
+        """
+
+        self.close_idle()
+        key = _session_key(Primes, Update, AcceptingStates)
+        with self.lock:
+            for session in reversed(self.idle):
+                if session.key == key:
+                    self.idle.remove(session)
+                    return session
+
+        return NuSMVSession(Primes, Update, AcceptingStates)
+
+    def release(self, Session):
+        """
+        Returns *Session* to the pool.
+        """
+
+        if Session.is_alive():
+            with self.lock:
+                self.idle.append(Session)
+
+        self.close_idle()
+
+    @contextlib.contextmanager
+    def session(self, Primes, Update, AcceptingStates=False):
+        session = self.acquire(Primes, Update, AcceptingStates)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def close_idle(self):
+        """
+        Closes the sessions that are unused for longer than the idle timeout and the oldest unused sessions beyond *MaxIdle*.
+        """
+
+        now = time.time()
+        with self.lock:
+            expired = [x for x in self.idle if now - x.last_used > self.idle_timeout or not x.is_alive()]
+            self.idle = [x for x in self.idle if x not in expired]
+            self.idle.sort(key=lambda x: x.last_used)
+            while len(self.idle) > self.max_idle:
+                expired.append(self.idle.pop(0))
+
+        for session in expired:
+            session.close()
+
+    def close(self):
+        with self.lock:
+            sessions, self.idle = self.idle, []
+
+        for session in sessions:
+            session.close()
+
+
+def _session_key(Primes, Update, AcceptingStates):
+    return json.dumps(Primes, sort_keys=True), Update, AcceptingStates
+
+
+def _initial_and_accepting(AcceptingStates):
+    """
+    formula and size of the initial and accepting states of a session query.
+    NuSMV does not compute the initial states for queries that are equivalent to TRUE or FALSE, see :ref:`print_warning_accstates_bug`,
+    in that case the initial states, i.e., all states, are ignored.
+    """
+
+    if "INITACCEPTING" in AcceptingStates:
+        return AcceptingStates["INITACCEPTING"], AcceptingStates["INITACCEPTING_SIZE"]
+
+    return AcceptingStates["ACCEPTING"], AcceptingStates["ACCEPTING_SIZE"]
+
+
+def _session_handle(Session, Primes, Update, AcceptingStates, Function):
+    """
+    Calls *Function* with a session for *Primes* and *Update*, *Session* is a :ref:`NuSMVSession` or a :ref:`SessionPool`.
+    """
+
+    if isinstance(Session, SessionPool):
+        with Session.session(Primes, Update, AcceptingStates) as session:
+            return Function(session)
+
+    assert(Session.update == Update)
+    assert(Session.primes == Primes)
+    assert(Session.acceptingstates or not AcceptingStates)
+
+    return Function(Session)
+
+
+SESSION_POOL = SessionPool()
+atexit.register(SESSION_POOL.close)
@@ -4,14 +4,21 @@ import os
 import ast
 import inspect
 import itertools
+import numpy
 
 import PyBoolNet.FileExchange
 
+import PyBoolNet.Utility.Misc
+
 BASE = os.path.join(os.path.dirname(__file__))
 fname_nusmvkeywords = os.path.join(BASE, "Dependencies", "nusmvkeywords.json")
-with open(fname_nusmvkeywords) as f:
-            NUSMVKEYWORDS = f.read()
-            NUSMVKEYWORDS = ast.literal_eval(NUSMVKEYWORDS)
+
+
+def __getattr__(name):
+    if name == "NUSMVKEYWORDS":
+        return PyBoolNet.Utility.Misc.get_nusmv_keywords()
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 
@@ -48,17 +55,15 @@ def primes2mindnf(Primes):
             continue
 
         inputs = sorted(set([x for p in Primes[name][1] for x in p]))
-        prod = len(inputs)*[[0,1]]
-        ones = []
-        for i,values in enumerate(itertools.product(*prod)):
-            state = dict(zip(inputs, values))
-
-            for prime in Primes[name][1]:
-                if all([state[x]==prime[x] for x in prime]):
-                    ones+=[i]
-                    
         primes_tuples = [ primedict2primetuple(x, inputs) for x in Primes[name][1] ]
-        
+
+        # the rows of the truth table that are covered by a prime, the first input is the most significant bit
+        rows = numpy.arange(2**len(inputs), dtype=numpy.int64)
+        covered = numpy.zeros(len(rows), dtype=bool)
+        for atoms, mask in primes_tuples:
+            covered |= (rows & ~mask) == atoms
+        ones = numpy.flatnonzero(covered).tolist()
+
         quine = QM(list(reversed(inputs)))
         complexity, minterms = quine.unate_cover(list(primes_tuples), ones)
         
@@ -120,7 +125,7 @@ def functions2mindnf(Functions):
         print('warning: variable names must be at least two characters if you want to you NuSMV.')
         print('Names that are too short: %s'%', '.join(too_short))
 
-    keywords = [x for x in Names if x in fname_nusmvkeywords]
+    keywords = [x for x in Names if x in PyBoolNet.Utility.Misc.get_nusmv_keywords()]
     if keywords:
         print('warning: variable names can not be NuSMV keywords.')
         print('Names that are keywords:', ', '.join(keywords))
@@ -160,10 +165,87 @@ def functions2mindnf(Functions):
         complexity, minterms = quine.unate_cover(list(primes), ones)
 
         expressions[name] = quine.get_function(minterms)
-        
+
 
     return expressions
-        
+
+
+def truthtable2primes(Inputs, Values):
+    """
+    Computes the prime implicants of both values of the Boolean function given by its truth table.
+    Row *i* of the truth table assigns the *k*-th input the *k*-th most significant bit of *i*,
+    i.e., the rows are in the order of *itertools.product([0,1], repeat=len(Inputs))*.
+    The primes are computed by a memoized Shannon expansion of the truth table
+    and the primes of each value are sorted by the inputs in alphabetical order, a free input before 0 and 0 before 1.
+
+    **arguments**:
+        * *Inputs* (list): names of the inputs
+        * *Values* (list/array): values (0/1 or bool) of the function, one per row
+
+    **returns**:
+        * *Primes* (list): the prime implicants of the value 0 and 1 of the function
+
+    **example**:
+
+        >>> truthtable2primes(["v1","v2"], [0,0,0,1])
+        [[{'v2': 0}, {'v1': 0}], [{'v1': 1, 'v2': 1}]]
+    """
+
+    assert(len(Values)==2**len(Inputs))
+
+    table = numpy.asarray(Values, dtype=bool)
+    order = _bit_order(Inputs)
+    memo = {}
+
+    result = []
+    for values in [~table, table]:
+        primes = []
+        for care, value in _table_primes(values, memo):
+            # a free input sorts before 0 and 0 before 1
+            key = tuple(1+(value>>j & 1) if care & 1<<j else 0 for j in order)
+            prime = dict((Inputs[len(Inputs)-1-j], value>>j & 1) for j in order if care & 1<<j)
+            primes.append((key, prime))
+        result.append([prime for key, prime in sorted(primes, key=lambda x: x[0])])
+
+    return result
+
+
+def _bit_order(Inputs):
+    """
+    bits of the inputs in alphabetical order of the inputs, the first input is the most significant bit
+    """
+
+    return sorted(range(len(Inputs)), key=lambda j: Inputs[len(Inputs)-1-j])
+
+
+def _table_primes(Table, Memo):
+    """
+    prime implicants of the truth table *Table* (bool array of length 2^m) as (care, value) masks.
+    Shannon expansion in the most significant variable x with f0=f(x=0), f1=f(x=1):
+    the primes of f are the primes of f0&f1 and the primes of f0 (f1) that are not primes of f0&f1, extended by x=0 (x=1).
+    """
+
+    key = Table.tobytes()
+    if key in Memo:
+        return Memo[key]
+
+    if not Table.any():
+        primes = frozenset()
+    elif Table.all():
+        primes = frozenset([(0,0)])
+    else:
+        half = len(Table)//2
+        f0, f1 = Table[:half], Table[half:]
+        both = _table_primes(f0 & f1, Memo)
+        primes = set(both)
+        primes.update((care|half, value) for care, value in _table_primes(f0, Memo)-both)
+        primes.update((care|half, value|half) for care, value in _table_primes(f1, Memo)-both)
+        primes = frozenset(primes)
+
+    Memo[key] = primes
+
+    return primes
+
         
 
 
@@ -299,51 +381,57 @@ class QM:
     """
     Use the prime implicants to find the essential prime implicants of the
     function, as well as other prime implicants that are necessary to cover
-    the function. This method uses the Petrick's method, which is a technique
-    for determining all minimum sum-of-products solutions from a prime implicant
-    chart.
+    the function. The ones covered by each prime are stored as bitset and the
+    cheapest cover of the ones that are not covered by essential primes is found
+    by branching on the one with the fewest primes, memoizing the solutions of
+    the remaining sets of ones.
 
     primes: the prime implicants that we want to minimize.
     ones: a list of indices for the minterms for which we want the function to
     evaluate to 1.
     """
 
-    chart = []
-    for one in ones:
-      column = []
-      for i in range(len(primes)):
-        if (one & (~primes[i][1])) == primes[i][0]:
-          column.append(i)
-      chart.append(column)
-
+    # the ones covered by each prime as bitset, bit r for ones[r]
+    rows = numpy.asarray(ones, dtype=numpy.int64)
     covers = []
-    if len(chart) > 0:
-      covers = [set([i]) for i in chart[0]]
-    for i in range(1,len(chart)):
-      new_covers = []
-      for cover in covers:
-        for prime_index in chart[i]:
-          x = set(cover)
-          x.add(prime_index)
-          append = True
-          for j in range(len(new_covers)-1,-1,-1):
-            if x <= new_covers[j]:
-              del new_covers[j]
-            elif x > new_covers[j]:
-              append = False
-          if append:
-            new_covers.append(x)
-      covers = new_covers
-
-    min_complexity = 99999999
-    for cover in covers:
-      primes_in_cover = [primes[prime_index] for prime_index in cover]
-      complexity = self.calculate_complexity(primes_in_cover)
-      if complexity < min_complexity:
-        min_complexity = complexity
-        result = primes_in_cover
-
-    return min_complexity,result
+    for value, mask in primes:
+      column = (rows & ~mask) == value
+      covers.append(int.from_bytes(numpy.packbits(column, bitorder='little').tobytes(), 'little'))
+
+    chart = [[i for i in range(len(primes)) if covers[i] >> r & 1] for r in range(len(ones))]
+    if not all(chart):
+      return 99999999, []
+
+    # the complexity of a cover of several primes is the sum of the costs of its primes, see calculate_complexity
+    costs = [self.calculate_complexity([prime]) + 1 for prime in primes]
+
+    # essential primes are the only ones that cover some one
+    essential = sorted(set(column[0] for column in chart if len(column) == 1))
+    uncovered = (1 << len(ones)) - 1
+    for i in essential:
+      uncovered &= ~covers[i]
+
+    memo = {0: (0, ())}
+
+    def cover(uncovered):
+      # cheapest set of primes that covers the bitset uncovered, branches on the one with the fewest primes
+      if uncovered in memo:
+        return memo[uncovered]
+
+      row = min((r for r in range(len(ones)) if uncovered >> r & 1), key=lambda r: len(chart[r]))
+      best = None
+      for i in chart[row]:
+        cost, selection = cover(uncovered & ~covers[i])
+        if best is None or cost + costs[i] < best[0]:
+          best = (cost + costs[i], (i,) + selection)
+
+      memo[uncovered] = best
+      return best
+
+    cost, selection = cover(uncovered)
+    result = [primes[i] for i in sorted(set(essential) | set(selection))]
+
+    return self.calculate_complexity(result), result
 
   def calculate_complexity(self, minterms):
     """
@@ -4,6 +4,7 @@ import random
 import itertools
 import heapq
 import networkx
+import numpy
 
 from typing import List
 
@@ -12,7 +13,15 @@ import PyBoolNet.AspSolver
 import PyBoolNet.Utility.Misc
 import PyBoolNet.Utility.DiGraphs
 
-CMD_DOT = PyBoolNet.Utility.Misc.find_command("dot")
+# the commands are found on first access, assigning the attribute replaces a command
+COMMANDS = {"CMD_DOT": "dot"}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return PyBoolNet.Utility.Misc.find_command(COMMANDS[name])
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 UPDATE_STRATEGIES = ["asynchronous", "synchronous", "mixed"]
 
@@ -110,10 +119,12 @@ def primes2stg(Primes, Update, InitialStates=lambda x: True):
         print("No Primes were given. Hence, the stg is empty.") 
         return stg   
 
+    # integer states with precompiled primes, see primes2masks
+    masks = primes2masks(Primes)
     if Update == "asynchronous":
-        successors = lambda x: successors_asynchronous(Primes, x)
+        successors = lambda x: [int2str(Primes, y) for y in successors_asynchronous_int(masks, int(x, 2))]
     if Update == "synchronous":
-        successors = lambda x: [successor_synchronous(Primes, x)]
+        successors = lambda x: [int2str(Primes, successor_synchronous_int(masks, int(x, 2)))]
     if Update == "mixed":
         successors = lambda x: [successors_mixed(Primes, x)]
     
@@ -161,6 +172,281 @@ def primes2stg(Primes, Update, InitialStates=lambda x: True):
     return stg
 
 
+def primes2compactstg(Primes, Update, InitialStates=None):
+    """
+    Creates the state transition graph (STG) of a network defined by *Primes* and *Update* as a :ref:`CompactSTG`.
+    The states are integers, see :ref:`state2int`, and the transitions are stored in NumPy arrays,
+    which needs a few bytes per transition instead of the hundreds of bytes of a *networkx.DiGraph*.
+    States and positions are 32 bit integers for networks of up to 31 variables.
+    The STG consists of the states that are reachable from *InitialStates*, see :ref:`primes2stg`.
+    The default for *InitialStates* is *None*, i.e., every state is initial.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *Update* (str): either *"asynchronous"* or *"synchronous"*
+        * *InitialStates* (func/str/dict/list): a function, a subspace, a state or a list of states
+
+    **returns**:
+        * *STG* (CompactSTG): state transition graph
+
+    **example**::
+
+        >>> stg = primes2compactstg(primes, "asynchronous")
+        >>> steadystates, cyclic = stg.attractors()
+        >>> nxstg = stg.to_networkx()
+    """
+
+    assert(Update in ["asynchronous", "synchronous"])
+
+    names = sorted(Primes)
+    masks = primes2masks(Primes)
+    size = 2**len(names)
+    dtype = _state_dtype(len(names))
+
+    if InitialStates is None:
+        states = numpy.arange(size, dtype=dtype)
+
+    else:
+        if hasattr(InitialStates, '__call__'):
+            fringe = [x for x in range(size) if InitialStates(int2dict(names, x))]
+        elif type(InitialStates) in [str, dict]:
+            fringe = [int(x, 2) for x in list_states_in_subspace(names, InitialStates)]
+        else:
+            fringe = [state2int(names, x) for x in InitialStates]
+
+        # breadth first search with a bitmap of the visited states
+        visited = numpy.zeros(size, dtype=bool)
+        fringe = numpy.unique(numpy.array(fringe, dtype=dtype))
+        visited[fringe] = True
+        while len(fringe):
+            _, targets, _ = _transitions(masks, Update, fringe)
+            targets = numpy.unique(targets)
+            fringe = targets[~visited[targets]]
+            visited[fringe] = True
+        states = numpy.flatnonzero(visited).astype(dtype)
+
+    rows, targets, indptr = _transitions(masks, Update, states)
+    indices = targets if len(states) == size else numpy.searchsorted(states, targets).astype(dtype)
+
+    return CompactSTG(names, Update, states, indptr, indices)
+
+
+def _state_dtype(N):
+    """
+    NumPy integer type of the states and state positions of a network with *N* variables
+    """
+
+    return numpy.int32 if N <= 31 else numpy.int64
+
+
+def _transitions(Masks, Update, States):
+    """
+    the transitions of the int array *States* as arrays of source positions and target states,
+    sorted by source and, for each source, in the order of successors_asynchronous_int,
+    and the CSR row pointers of the sources (*None* for the synchronous update)
+    """
+
+    successors = numpy.zeros(len(States), dtype=States.dtype)
+    for bit, primes in Masks:
+        active = numpy.zeros(len(States), dtype=bool)
+        for care, value in primes:
+            active |= (States & care) == value
+        successors[active] |= bit
+
+    if Update == "synchronous":
+        return numpy.arange(len(States), dtype=States.dtype), successors, None
+
+    # the transitions grouped by the updated variable, the self loops of steady states first
+    diff = successors ^ States
+    groups = [(numpy.flatnonzero(diff == 0), 0)] + [(numpy.flatnonzero(diff & bit), bit) for bit, _ in Masks]
+    degrees = numpy.zeros(len(States), dtype=States.dtype)
+    for row, _ in groups:
+        degrees[row] += 1
+    size = sum(len(row) for row, _ in groups)
+    indptr = numpy.zeros(len(States)+1, dtype=numpy.int32 if size < 2**31 else numpy.int64)
+    numpy.cumsum(degrees, out=indptr[1:])
+
+    # each group adds at most one transition per source, at the next free position of the source
+    rows = numpy.empty(size, dtype=States.dtype)
+    targets = numpy.empty(size, dtype=States.dtype)
+    free = indptr[:-1].copy()
+    for row, bit in groups:
+        positions = free[row]
+        rows[positions] = row
+        targets[positions] = States[row] ^ bit
+        free[row] += 1
+
+    return rows, targets, indptr
+
+
+class CompactSTG(object):
+    """
+    State transition graph with integer states, see :ref:`state2int`, and the transitions in CSR format:
+    the successors of the state *states[i]* are the states at the positions *indices[indptr[i]:indptr[i+1]]*.
+    For the synchronous update every state has exactly one successor and *indptr* is *None*.
+    Create it with :ref:`primes2compactstg`.
+    """
+
+    def __init__(self, Names, Update, States, Indptr, Indices):
+        self.names = Names
+        self.update = Update
+        self.states = States
+        self.indptr = Indptr
+        self.indices = Indices
+
+    def order(self):
+        return len(self.states)
+
+    def size(self):
+        return len(self.indices)
+
+    def position(self, State):
+        """
+        position of *State* (int/str/dict) in *states*
+        """
+
+        x = state2int(self.names, State)
+        i = int(numpy.searchsorted(self.states, x))
+        if i == len(self.states) or self.states[i] != x:
+            raise KeyError(int2str(self.names, x))
+
+        return i
+
+    def _indptr(self):
+        if self.indptr is None:
+            return numpy.arange(len(self.states)+1, dtype=self.indices.dtype)
+
+        return self.indptr
+
+    def successors(self, State):
+        """
+        the successors of *State* (int/str/dict) in str representation
+        """
+
+        i = self.position(State)
+        indptr = self._indptr()
+
+        return [int2str(self.names, self.states[j]) for j in self.indices[indptr[i]:indptr[i+1]]]
+
+    def edges(self):
+        indptr = self._indptr()
+        for i in range(len(self.states)):
+            source = int2str(self.names, self.states[i])
+            for j in self.indices[indptr[i]:indptr[i+1]]:
+                yield source, int2str(self.names, self.states[j])
+
+    def strongly_connected_components(self):
+        """
+        number of SCCs and the SCC label of each state, computed by scipy if available
+        """
+
+        indptr = self._indptr()
+        try:
+            import scipy.sparse
+            import scipy.sparse.csgraph
+        except ImportError:
+            return _tarjan(indptr, self.indices)
+
+        matrix = scipy.sparse.csr_matrix((numpy.ones(len(self.indices), dtype=bool), self.indices, indptr), shape=(len(self.states), len(self.states)))
+
+        return scipy.sparse.csgraph.connected_components(matrix, directed=True, connection="strong")
+
+    def attractors(self):
+        """
+        the terminal SCCs, returned like :ref:`compute_attractors_tarjan`, sorted by their smallest state
+        """
+
+        count, labels = self.strongly_connected_components()
+        rows = numpy.repeat(numpy.arange(len(self.states), dtype=self.indices.dtype), numpy.diff(self._indptr()))
+        leaving = labels[rows] != labels[self.indices]
+        terminal = numpy.ones(count, dtype=bool)
+        terminal[labels[rows[leaving]]] = False
+
+        steadystates = []
+        cyclic = []
+        seen = set([])
+        for i in numpy.flatnonzero(terminal[labels]):
+            label = labels[i]
+            if label in seen:
+                continue
+            seen.add(label)
+            scc = self.states[labels == label]
+            if len(scc) == 1:
+                steadystates.append(int2str(self.names, scc[0]))
+            else:
+                cyclic.append(set(int2str(self.names, x) for x in scc))
+
+        return steadystates, cyclic
+
+    def to_networkx(self):
+        """
+        the STG as *networkx.DiGraph* with str states, as created by :ref:`primes2stg`
+        """
+
+        stg = networkx.DiGraph()
+        stg.add_nodes_from(int2str(self.names, x) for x in self.states)
+        stg.add_edges_from(self.edges())
+
+        stg.graph["node"] = {"shape": "rect", "color": "none", "style": "filled", "fillcolor": "none"}
+        stg.graph["edge"] = {}
+        stg.graph["subgraphs"] = []
+        stg.graph["overlap"] = "compress" if self.update == "synchronous" else "scale"
+
+        return stg
+
+
+def _tarjan(Indptr, Indices):
+    """
+    iterative Tarjan algorithm on CSR arrays, returns the number of SCCs and the SCC label of each node
+    """
+
+    n = len(Indptr)-1
+    index = numpy.full(n, -1, dtype=numpy.int64)
+    lowlink = numpy.zeros(n, dtype=numpy.int64)
+    labels = numpy.full(n, -1, dtype=numpy.int64)
+    onstack = numpy.zeros(n, dtype=bool)
+    stack = []
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        work = [(root, Indptr[root])]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        onstack[root] = True
+        while work:
+            v, k = work[-1]
+            if k < Indptr[v+1]:
+                work[-1] = (v, k+1)
+                w = Indices[k]
+                if index[w] < 0:
+                    index[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    onstack[w] = True
+                    work.append((w, Indptr[w]))
+                elif onstack[w]:
+                    lowlink[v] = min(lowlink[v], index[w])
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                lowlink[u] = min(lowlink[u], lowlink[v])
+            if lowlink[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    onstack[w] = False
+                    labels[w] = count
+                    if w == v:
+                        break
+                count += 1
+
+    return count, labels
+
+
 def stg2dot(STG, FnameDOT=None):
     """
     Creates a *dot* file from a state transition graph.
@@ -626,6 +912,100 @@ def successors_asynchronous(Primes, State):
     return successors
 
 
+def primes2masks(Primes):
+    """
+    Precompiles *Primes* for the integer representation of states, see :ref:`state2int`.
+    Each prime is encoded by a *care mask*, the bits of its variables, and a *value mask*, the bits of its variables
+    that are 1. A state *x* is in the prime if *x & care == value*.
+
+    **arguments**:
+        * *Primes*: prime implicants
+
+    **returns**:
+        * *Masks* (list): for each variable (in the order of *Primes*) its bit and the care and value masks of its 1-primes
+
+    **example**::
+
+            >>> primes = {
+            'v1': [[{'v2': 0}], [{'v2': 1}]],
+            'v2': [[{'v3': 0}, {'v1': 0}], [{'v1': 1, 'v3': 1}]],
+            'v3': [[{'v1': 1, 'v2': 0}], [{'v2': 1}, {'v1': 0}]]
+            }
+            >>> primes2masks(primes)
+            [(4, [(2, 2)]), (2, [(5, 5)]), (1, [(2, 2), (4, 0)])]
+    """
+
+    names = sorted(Primes)
+    bits = dict((name, 1 << (len(names)-1-i)) for i, name in enumerate(names))
+
+    masks = []
+    for name in Primes:
+        primes = []
+        for prime in Primes[name][1]:
+            care = sum(bits[x] for x in prime)
+            value = sum(bits[x] for x in prime if prime[x] == 1)
+            primes.append((care, value))
+        masks.append((bits[name], primes))
+
+    return masks
+
+
+def successor_synchronous_int(Masks, State):
+    """
+    Returns the successor of *State* in the fully synchronous transition system defined by *Masks*,
+    see :ref:`primes2masks`. States are integers, see :ref:`state2int`.
+
+    **arguments**:
+        * *Masks*: precompiled prime implicants
+        * *State* (int): a state
+
+    **returns**:
+        * *Successor* (int): the synchronous successor of *State*
+
+    **example**::
+
+            >>> masks = primes2masks(primes)
+            >>> successor_synchronous_int(masks, 4)
+            0
+    """
+
+    successor = 0
+    for bit, primes in Masks:
+        for care, value in primes:
+            if State & care == value:
+                successor |= bit
+                break
+
+    return successor
+
+
+def successors_asynchronous_int(Masks, State):
+    """
+    Returns the successors of *State* in the fully asynchronous transition system defined by *Masks*,
+    see :ref:`primes2masks`. States are integers, see :ref:`state2int`.
+    The successors are in the same order as those of :ref:`successors_asynchronous`.
+
+    **arguments**:
+        * *Masks*: precompiled prime implicants
+        * *State* (int): a state
+
+    **returns**:
+        * *Successors* (list of int): the asynchronous successors of *State*
+
+    **example**::
+
+            >>> masks = primes2masks(primes)
+            >>> successors_asynchronous_int(masks, 5)
+            [1, 7, 4]
+    """
+
+    diff = successor_synchronous_int(Masks, State) ^ State
+    if not diff:
+        return [State]
+
+    return [State ^ bit for bit, _ in Masks if diff & bit]
+
+
 def successors_mixed(Primes, State):
     """
     Returns the successors of *State* in the mixed transition system defined by *Primes*.
@@ -846,10 +1226,11 @@ def list_reachable_states(primes: dict, update: str, initial_states: List[str],
     assert type(initial_states[0]) == str, "initial states must be in dict representation: {}".format(initial_states[0])
     assert update in ['asynchronous', 'synchronous']
     
+    masks = primes2masks(primes)
     if update == 'asynchronous':
-        transition_func = lambda state: successors_asynchronous(primes, state)
+        transition_func = lambda state: [int2str(primes, x) for x in successors_asynchronous_int(masks, int(state, 2))]
     else:
-        transition_func = lambda state: [successor_synchronous(primes, state)]
+        transition_func = lambda state: [int2str(primes, successor_synchronous_int(masks, int(state, 2)))]
     
     explored = set([])
     stack = set(initial_states)
@@ -1037,6 +1418,76 @@ def states2dict(Primes, States):
     return [state2dict(Primes, x) for x in States]
 
 
+def state2int(Primes, State):
+    """
+    Converts the string or dictionary representation of a state into the integer representation of a state.
+    The bits of the integer are the values of the variables in alphabetical order, the first variable being the most
+    significant bit, i.e., the binary representation of the integer is the string representation of the state.
+    If *State* is already an integer (*int* or a NumPy integer) it is returned as *int*.
+
+    **arguments**
+        * *Primes*: prime implicants or a list of names
+        * *State* (str/dict/int): a state
+
+    **returns**
+        * *State* (int): integer representation of state
+
+    **example**::
+
+        >>> state2int(primes, "101")
+        5
+        >>> state2int(primes, {"v2":0, "v1":1, "v3":1})
+        5
+    """
+
+    if isinstance(State, (int, numpy.integer)):
+        return int(State)
+
+    return int(state2str(State), 2) if State else 0
+
+
+def int2str(Primes, State):
+    """
+    Converts the integer representation of a state into the string representation of a state, see :ref:`state2int`.
+
+    **arguments**
+        * *Primes*: prime implicants or a list of names
+        * *State* (int): integer representation of state
+
+    **returns**
+        * *State* (str): string representation of state
+
+    **example**::
+
+        >>> int2str(primes, 5)
+        '101'
+    """
+
+    return format(State, "0%ib" % len(Primes)) if Primes else ""
+
+
+def int2dict(Primes, State):
+    """
+    Converts the integer representation of a state into the dictionary representation of a state, see :ref:`state2int`.
+
+    **arguments**
+        * *Primes*: prime implicants or a list of names
+        * *State* (int): integer representation of state
+
+    **returns**
+        * *State* (dict): dictionary representation of state
+
+    **example**::
+
+        >>> int2dict(primes, 5)
+        {'v1':1, 'v2':0, 'v3':1}
+    """
+
+    names = sorted(Primes)
+
+    return dict((name, State >> (len(names)-1-i) & 1) for i, name in enumerate(names))
+
+
 def subspace2str(Primes, Subspace):
     """
     Converts the dictionary representation of a subspace into the string representation of a subspace.
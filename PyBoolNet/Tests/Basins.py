@@ -44,6 +44,110 @@ class TestBasins(unittest.TestCase):
         tmpfile.close()
 
 
+    def test_compute_basins_explicit(self):
+
+        bnet = """
+        v1, !v1&v2 | v1&!v2&!v3
+        v2, v1&v3
+        v3, v2
+        """
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+        attrs = {"primes": primes,
+                 "update": "asynchronous",
+                 "attractors": [{"state": {"str": "000"}, "mintrapspace": {"dict": {"v1":0,"v2":0,"v3":0}}},
+                                {"state": {"str": "100"}, "mintrapspace": {"dict": {"v1":1,"v2":0,"v3":0}}}]}
+
+        PyBoolNet.Basins.compute_basins(attrs, Silent=True, Backend="explicit")
+        answer = [(x["weak_basin"]["size"], x["strong_basin"]["size"], x["cyclefree_basin"]["size"]) for x in attrs["attractors"]]
+        expected = [(7, 4, 2), (4, 1, 1)]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = attrs["attractors"][1]["strong_basin"]["formula"]
+        expected = "(v1&!v2&!v3)"
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # the synchronous basins coincide
+        basins = PyBoolNet.Basins.explicit_basins(primes, "synchronous", ["000", "100"])
+        answer = [(x["weak_basin"]["size"], x["strong_basin"]["size"], x["cyclefree_basin"]["size"]) for x in basins]
+        expected = [(3, 3, 3), (1, 1, 1)]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # more than 64 subspaces are labeled in several chunks
+        bnet = "\n".join("v%i, v%i"%(i,i) for i in range(7))
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+        subspaces = [format(x, "07b") for x in range(70)]
+
+        basins = PyBoolNet.Basins.explicit_basins(primes, "asynchronous", subspaces)
+        answer = [(x["weak_basin"]["size"], x["strong_basin"]["size"], x["cyclefree_basin"]["size"]) for x in basins]
+        expected = [(1, 1, 1)]*70
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = [x["weak_basin"]["formula"] for x in basins[64:66]]
+        expected = ["(v0&!v1&!v2&!v3&!v4&!v5&!v6)", "(v0&!v1&!v2&!v3&!v4&!v5&v6)"]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+
+    def test_compute_basins_explicit_fallback(self):
+        # the mixed update and large networks are checked by NuSMV, whose answers are replaced here
+        calls = []
+        def check_primes_batch(Primes, Update, InitialStates, Specifications, AcceptingStates=False):
+            calls.append(Update)
+            return [(True, {"INITACCEPTING": "v1", "INITACCEPTING_SIZE": 4})]*len(Specifications)
+
+        bnet = """
+        v1, !v1&v2 | v1&!v2&!v3
+        v2, v1&v3
+        v3, v2
+        """
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+        attractors = [{"state": {"str": "000"}, "mintrapspace": {"dict": {"v1":0,"v2":0,"v3":0}}},
+                      {"state": {"str": "100"}, "mintrapspace": {"dict": {"v1":1,"v2":0,"v3":0}}}]
+
+        batch = PyBoolNet.ModelChecking.check_primes_batch
+        max_size = PyBoolNet.Basins.EXPLICIT_MAX_SIZE
+        PyBoolNet.ModelChecking.check_primes_batch = check_primes_batch
+        try:
+            attrs = {"primes": primes, "update": "mixed", "attractors": [dict(x) for x in attractors]}
+            PyBoolNet.Basins.compute_basins(attrs, Silent=True, Backend="explicit")
+            answer = (calls, attrs["attractors"][0]["weak_basin"]["size"])
+            expected = (["mixed"], 4)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            PyBoolNet.Basins.EXPLICIT_MAX_SIZE = 2
+            attrs = {"primes": primes, "update": "asynchronous", "attractors": [dict(x) for x in attractors]}
+            PyBoolNet.Basins.compute_basins(attrs, Silent=True, Backend="explicit")
+            answer = calls
+            expected = ["mixed", "asynchronous"]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            PyBoolNet.Basins.EXPLICIT_MAX_SIZE = max_size
+            attrs = {"primes": primes, "update": "asynchronous", "attractors": [dict(x) for x in attractors]}
+            PyBoolNet.Basins.compute_basins(attrs, Silent=True, Backend="explicit")
+            answer = (calls, attrs["attractors"][0]["weak_basin"]["size"])
+            expected = (["mixed", "asynchronous"], 7)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+        finally:
+            PyBoolNet.ModelChecking.check_primes_batch = batch
+            PyBoolNet.Basins.EXPLICIT_MAX_SIZE = max_size
+
+
 
 
 if __name__=="__main__":
@@ -0,0 +1,51 @@
+"""
+Replays recorded NuSMV output for the tests that run without NuSMV.
+The recording is the json file given by the environment variable PYBOOLNET_NUSMV_RECORDING,
+the output of a batch call is the value of the key "batch".
+In interactive mode (-int) the output of each command is the value of the command in the dict "interactive",
+other commands have no output. The commands are appended to the file PYBOOLNET_NUSMV_LOG if it is set.
+"""
+
+import os
+import sys
+import json
+
+PROMPT = "NuSMV > "
+
+
+def log(Line):
+    if os.environ.get("PYBOOLNET_NUSMV_LOG"):
+        with open(os.environ["PYBOOLNET_NUSMV_LOG"], "a") as f:
+            f.write(Line+"\n")
+
+
+def main():
+    with open(os.environ["PYBOOLNET_NUSMV_RECORDING"]) as f:
+        recording = json.load(f)
+
+    if "-int" not in sys.argv:
+        sys.stdout.write(recording["batch"])
+        return
+
+    log("pid %i"%os.getpid())
+    while True:
+        sys.stdout.write(PROMPT)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            log("eof")
+            return
+
+        command = line.strip()
+        log(command)
+        if command == "quit":
+            return
+        if command.startswith("echo "):
+            sys.stdout.write(command[5:]+"\n")
+        else:
+            sys.stdout.write(recording.get("interactive", {}).get(command, ""))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,17 @@ import unittest
 import os
 import sys
 import networkx
+import numpy
 import itertools
+import random
 import tempfile
 import shutil
+import json
+import subprocess
+import contextlib
+import threading
+import time
+import concurrent.futures
 
 BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 sys.path.insert(0, BASE)
@@ -19,6 +27,7 @@ import PyBoolNet.AspSolver
 import PyBoolNet.ModelChecking
 import PyBoolNet.Attractors
 import PyBoolNet.Basins
+import PyBoolNet.Commitment
 import PyBoolNet.TemporalLogic
 import PyBoolNet.QuineMcCluskey
 import PyBoolNet.Repository
@@ -31,6 +40,33 @@ FILES_OUT = tempfile.mkdtemp(prefix='pyboolnet_')
 
 
 
+@contextlib.contextmanager
+def recorded_nusmv(Recording):
+    """
+    replaces NuSMV by Files/Input/nusmv_recorded.py, which replays the outputs in the dict *Recording*
+    """
+
+    fname_recording = os.path.join(FILES_OUT, "nusmv_recording.json")
+    with open(fname_recording, "w") as f:
+        json.dump(Recording, f)
+
+    fname_cmd = os.path.join(FILES_OUT, "nusmv_recorded")
+    with open(fname_cmd, "w") as f:
+        f.write("#!%s\n"%sys.executable)
+        f.write("import runpy\n")
+        f.write("runpy.run_path(%r, run_name='__main__')\n"%os.path.join(FILES_IN, "nusmv_recorded.py"))
+    os.chmod(fname_cmd, 0o755)
+
+    cmd = PyBoolNet.ModelChecking.CMD_NUSMV
+    PyBoolNet.ModelChecking.CMD_NUSMV = fname_cmd
+    os.environ["PYBOOLNET_NUSMV_RECORDING"] = fname_recording
+    try:
+        yield fname_cmd
+    finally:
+        PyBoolNet.ModelChecking.CMD_NUSMV = cmd
+        del os.environ["PYBOOLNET_NUSMV_RECORDING"]
+
+
 def run():
 
     #import PyBoolNet.Tests.StateTransitionGraphs
@@ -71,6 +107,36 @@ class TestUtility(unittest.TestCase):
         msg+= "\ngot:      "+str(answer)
         self.assertTrue(answer==expected, msg)
 
+    def test_digraph2condensationgraph(self):
+        digraph = networkx.DiGraph()
+        digraph.add_edges_from([("a","b"),("b","a"),("b","c"),("c","d"),("d","e"),("e","d"),("e","f"),("f","f"),("a","g"),("g","f"),("h","h")])
+        cgraph = PyBoolNet.Utility.DiGraphs.digraph2condensationgraph(digraph)
+
+        expected = [(("a","b"), {"depth":1, "id":0}), (("d","e"), {"depth":2, "id":1}), (("f",), {"depth":3, "id":2}), (("h",), {"depth":1, "id":3})]
+        answer = list(cgraph.nodes(data=True))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        expected = [(("a","b"),("d","e")), (("a","b"),("f",)), (("d","e"),("f",))]
+        answer = list(cgraph.edges())
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_lazy_imports(self):
+        code = "import sys, PyBoolNet; print(sorted(x for x in sys.modules if x.startswith('PyBoolNet.') or x in ['networkx', 'numpy']))"
+        answer = subprocess.check_output([sys.executable, "-c", code], cwd=BASE).decode().strip()
+        expected = "[]"
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        expected = PyBoolNet.ModelChecking.NUSMVKEYWORDS
+        answer = PyBoolNet.Utility.Misc.get_nusmv_keywords()
+        self.assertTrue("MODULE" in answer)
+        self.assertTrue(answer is expected)
+
 
 class TestBooleanLogic(unittest.TestCase):
     def test_minimize_espresso1(self):
@@ -161,6 +227,30 @@ class TestQuineMcCluskey(unittest.TestCase):
         msg+= "\ngot:      "+str(answer)
         self.assertTrue(answer==expected, msg)
 
+        # cyclic prime chart without essential primes, a minimal cover has three of the six primes
+        primes = PyBoolNet.FileExchange.bnet2primes("v1, !v1&!v2 | !v1&!v3 | !v2&v3 | v2&!v3 | v1&v3 | v1&v2\nv2, v2\nv3, v3")
+        answer = PyBoolNet.QuineMcCluskey.primes2mindnf(primes)
+        expected = 3
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer["v1"])
+        self.assertTrue(len(answer["v1"].split(" | "))==expected, msg)
+
+        answer = PyBoolNet.FileExchange.bnet2primes("v1, "+answer["v1"]+"\nv2, v2\nv3, v3")
+        self.assertTrue(PyBoolNet.PrimeImplicants.are_equal(answer, primes))
+
+    def test_truthtable2primes(self):
+        answer = PyBoolNet.QuineMcCluskey.truthtable2primes(["v1","v2"], [0,0,0,1])
+        expected = [[{'v2': 0}, {'v1': 0}], [{'v1': 1, 'v2': 1}]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.QuineMcCluskey.truthtable2primes(["v1"], [1,1])
+        expected = [[], [{}]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
 
 class TestStateTransitionGraphs(unittest.TestCase):
     def test_energy(self):
@@ -289,6 +379,99 @@ class TestStateTransitionGraphs(unittest.TestCase):
         msg+= "\ngot:      "+str(answer)
         self.assertTrue(answer==expected, msg)
 
+    def test_state2int(self):
+        primes = ["v1", "v2", "v3"]
+        state = {"v2":0, "v1":1, "v3":1}
+
+        answer = PyBoolNet.StateTransitionGraphs.state2int(primes, state)
+        expected = 5
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        for state_int in [5, numpy.int64(5), numpy.uint32(5)]:
+            answer = PyBoolNet.StateTransitionGraphs.state2int(primes, state_int)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected and type(answer)==int, msg)
+
+        answer = PyBoolNet.StateTransitionGraphs.int2str(primes, 5)
+        expected = "101"
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.StateTransitionGraphs.int2dict(primes, 5)
+        msg = "\nexpected: "+str(state)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==state, msg)
+
+    def test_successors_int(self):
+        fname_in = os.path.join(FILES_IN, "randomnet.bnet")
+        primes = PyBoolNet.FileExchange.bnet2primes(fname_in)
+        masks = PyBoolNet.StateTransitionGraphs.primes2masks(primes)
+
+        for i in range(200):
+            state = PyBoolNet.StateTransitionGraphs.random_state(primes)
+            x = PyBoolNet.StateTransitionGraphs.state2int(primes, state)
+
+            answer = PyBoolNet.StateTransitionGraphs.int2dict(primes, PyBoolNet.StateTransitionGraphs.successor_synchronous_int(masks, x))
+            expected = PyBoolNet.StateTransitionGraphs.successor_synchronous(primes, state)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            answer = [PyBoolNet.StateTransitionGraphs.int2dict(primes, y) for y in PyBoolNet.StateTransitionGraphs.successors_asynchronous_int(masks, x)]
+            expected = PyBoolNet.StateTransitionGraphs.successors_asynchronous(primes, state)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+    def test_primes2compactstg(self):
+        fname_in = os.path.join(FILES_IN, "irma.primes")
+        primes = PyBoolNet.FileExchange.read_primes(FnamePRIMES=fname_in)
+
+        init = lambda x: x["Cbf1"]+x["Ash1"]+x["Gal80"]==1
+
+        for update in ["asynchronous", "synchronous"]:
+            for initial in [None, init, "--1---", ["100001", "001100"]]:
+                stg = PyBoolNet.StateTransitionGraphs.primes2compactstg(primes, update, initial)
+                expected = PyBoolNet.StateTransitionGraphs.primes2stg(primes, update, (lambda x: True) if initial is None else initial)
+
+                answer = [x.dtype for x in [stg.states, stg.indices] + ([] if stg.indptr is None else [stg.indptr])]
+                msg = "\ngot: "+str(answer)
+                self.assertTrue(all(x==numpy.int32 for x in answer), msg)
+
+                answer = stg.to_networkx()
+                answer = (sorted(answer.nodes()), sorted(answer.edges()))
+                expected = (sorted(expected.nodes()), sorted(expected.edges()))
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+    def test_compactstg_attractors(self):
+        fname_in = os.path.join(FILES_IN, "irma.primes")
+        primes = PyBoolNet.FileExchange.read_primes(FnamePRIMES=fname_in)
+
+        for update in ["asynchronous", "synchronous"]:
+            stg = PyBoolNet.StateTransitionGraphs.primes2stg(primes, update)
+            steady, cyclic = PyBoolNet.Attractors.compute_attractors_tarjan(stg)
+            expected = (sorted(steady), sorted(sorted(x) for x in cyclic))
+
+            stg = PyBoolNet.StateTransitionGraphs.primes2compactstg(primes, update)
+            steady, cyclic = PyBoolNet.Attractors.compute_attractors_tarjan(stg)
+            answer = (sorted(steady), sorted(sorted(x) for x in cyclic))
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            count, labels = PyBoolNet.StateTransitionGraphs._tarjan(stg._indptr(), stg.indices)
+            answer = len(set(labels))
+            expected = stg.strongly_connected_components()[0]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==count==expected, msg)
+
     def test_primes2stg(self):
         fname_in  = os.path.join(FILES_IN,  "irma.primes")
         fname_out = os.path.join(FILES_OUT, "irma_stg.pdf")
@@ -435,6 +618,26 @@ class TestStateTransitionGraphs(unittest.TestCase):
         msg+= "\ngot:      "+str(cyclic)
         self.assertTrue(cyclic==cyclic_expected, msg)
 
+    def test_compute_attractors_tarjan_synchronous(self):
+        bnet = ["x, !y",
+                "y, x",
+                "z, z"]
+        bnet = "\n".join(bnet)
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+        expected = ([], [set(["000","100","110","010"]), set(["001","101","111","011"])])
+
+        stg = PyBoolNet.StateTransitionGraphs.primes2stg(primes, "synchronous")
+        answer = PyBoolNet.Attractors.compute_attractors_tarjan(stg)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        stg = PyBoolNet.StateTransitionGraphs.primes2compactstg(primes, "synchronous")
+        answer = PyBoolNet.Attractors.compute_attractors_tarjan(stg)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
     def test_find_attractor_state_by_randomwalk_and_ctl(self):
         fname_in  = os.path.join(FILES_IN,  "randomnet.bnet")
         fname_out = os.path.join(FILES_OUT, "randomnet.primes")
@@ -740,6 +943,337 @@ class TestModelChecking(unittest.TestCase):
         msg+= "\ngot:      "+str(accepting)
         self.assertTrue(accepting==expected, msg)
 
+    def test_check_primes_batch(self):
+        bnet = """
+        Erk, Raf&Mek | Mek&Erk
+    Mek, Raf&Mek | Erk
+    Raf, !Raf | !Erk
+        """
+
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+        init = "INIT TRUE"
+        update = "asynchronous"
+        specs = ["LTLSPEC F(G(Erk))", "CTLSPEC EF(!Erk&!Mek&Raf) &  EF(Erk&Mek&Raf)", "CTLSPEC EF(Erk)"]
+
+        answer = PyBoolNet.ModelChecking.check_primes_batch(primes, update, init, specs)
+        expected = [PyBoolNet.ModelChecking.check_primes(primes, update, init, x) for x in specs]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.ModelChecking.check_primes_batch(primes, update, init, specs[1:], AcceptingStates=True)
+        expected = [PyBoolNet.ModelChecking.check_primes_with_acceptingstates(primes, update, init, x) for x in specs[1:]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_check_primes_session(self):
+        primes = PyBoolNet.Repository.get_primes("raf")
+        update = "asynchronous"
+        queries = [("INIT TRUE", "CTLSPEC EF(Erk&Mek)"), ("INIT Erk", "CTLSPEC AG(Erk)"), ("INIT !Raf", "LTLSPEC F(G(Mek))")]
+
+        pool = PyBoolNet.ModelChecking.SessionPool()
+        for init, spec in queries:
+            answer = PyBoolNet.ModelChecking.check_primes(primes, update, init, spec, Session=pool)
+            expected = PyBoolNet.ModelChecking.check_primes(primes, update, init, spec)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+        init, spec = queries[0]
+        answer = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(primes, update, init, spec, Session=pool)
+        expected = PyBoolNet.ModelChecking.check_primes_with_acceptingstates(primes, update, init, spec)
+        answer = (answer[0], answer[1]["INITACCEPTING_SIZE"], answer[1]["ACCEPTING_SIZE"])
+        expected = (expected[0], expected[1]["INITACCEPTING_SIZE"], expected[1]["ACCEPTING_SIZE"])
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        pool.close()
+
+    @unittest.skipIf(os.name == "nt", "the recorded NuSMV is started as script")
+    def test_nusmv_session_recorded(self):
+        primes = PyBoolNet.Repository.get_primes("raf")
+        interactive = {'check_ctlspec -p "(TRUE) -> (EF(Erk&Mek))"': "-- specification (TRUE -> EF (Erk & Mek))  is true\n",
+                       'check_ltlspec -p "(!Raf) -> (F(G(Mek)))"': "-- specification (!Raf ->  F ( G Mek))  is false\n-- as demonstrated by the following execution sequence\nTrace Type: Counterexample\n",
+                       'check_ctlspec -p "(Erk) -> (AG(Erk))"': "*** WARNING: no answer\n",
+                       'check_ctlspec -p "TRUE"': "accepting states: TRUE\nnumber of accepting states: 8\n-- specification TRUE  is true\n",
+                       'check_ctlspec -p "EF(Erk&Mek)"': "accepting states: Erk | Mek\nnumber of accepting states: 6\n-- specification EF (Erk & Mek)  is false\n",
+                       'check_ctlspec -p "(TRUE) & (EF(Erk&Mek))"': "accepting states: Erk | Mek\nnumber of accepting states: 6\n-- specification (TRUE & EF (Erk & Mek))  is false\n"}
+        fname_log = os.path.join(FILES_OUT, "nusmv_session.log")
+        if os.path.isfile(fname_log):
+            os.remove(fname_log)
+        os.environ["PYBOOLNET_NUSMV_LOG"] = fname_log
+
+        try:
+            with recorded_nusmv({"interactive": interactive}):
+                session = PyBoolNet.ModelChecking.NuSMVSession(primes, "asynchronous", AcceptingStates=True)
+
+                # the prompts are removed, the output ends before the marker
+                answer = session.execute('check_ltlspec -p "(!Raf) -> (F(G(Mek)))"')
+                expected = interactive['check_ltlspec -p "(!Raf) -> (F(G(Mek)))"']
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+                answer = [session.check("INIT TRUE", "CTLSPEC EF(Erk&Mek)"), session.check("INIT !Raf", "LTLSPEC F(G(Mek))")]
+                expected = [True, False]
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+                self.assertRaises(Exception, session.check, "INIT Erk", "CTLSPEC AG(Erk)")
+
+                answer = session.check_with_acceptingstates("INIT TRUE", "CTLSPEC EF(Erk&Mek)")
+                expected = (False, {'INIT': 'TRUE', 'INIT_SIZE': 8, 'ACCEPTING': 'Erk | Mek', 'ACCEPTING_SIZE': 6, 'INITACCEPTING': 'Erk | Mek', 'INITACCEPTING_SIZE': 6})
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+                fname_smv = session.fname
+                session.close()
+
+            self.assertFalse(session.is_alive())
+            self.assertFalse(os.path.isfile(fname_smv))
+
+            with open(fname_log) as f:
+                answer = [x for x in f.read().splitlines() if not x.startswith("echo ") and not x.startswith("pid ")]
+            expected = ["read_model -i %s"%fname_smv, "flatten_hierarchy", "encode_variables", "build_model"]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer[:4]==expected and answer[-1]=="quit", msg)
+
+        finally:
+            del os.environ["PYBOOLNET_NUSMV_LOG"]
+
+    @unittest.skipIf(os.name == "nt", "the recorded NuSMV is started as script")
+    def test_session_pool_recorded(self):
+        primes1 = PyBoolNet.Repository.get_primes("raf")
+        primes2 = PyBoolNet.FileExchange.bnet2primes("v1, v2\nv2, v1")
+
+        with recorded_nusmv({"interactive": {}}) as fname_cmd:
+            pool = PyBoolNet.ModelChecking.SessionPool(MaxIdle=2)
+
+            # a released session is reused for the same network and update
+            with pool.session(primes1, "asynchronous") as session1:
+                pass
+            with pool.session(primes1, "asynchronous") as session2:
+                # a concurrent query gets a second session
+                with pool.session(primes1, "asynchronous") as session3:
+                    pass
+            answer = (session1 is session2, session2 is session3)
+            expected = (True, False)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            with pool.session(primes1, "synchronous") as session4:
+                pass
+            with pool.session(primes2, "asynchronous") as session5:
+                pass
+
+            # at most MaxIdle unused sessions, the least recently used are closed
+            answer = [x in pool.idle for x in [session1, session3, session4, session5]]
+            expected = [False, False, True, True]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+            self.assertFalse(session1.is_alive() or session3.is_alive())
+
+            # sessions unused for longer than IdleTimeout are closed
+            pool.idle_timeout = 0.
+            pool.close_idle()
+            answer = (pool.idle, session4.is_alive(), session5.is_alive(), os.path.isfile(session5.fname))
+            expected = ([], False, False, False)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            # the sessions of the default pool are closed when the interpreter exits
+            code = ["import sys",
+                    "import PyBoolNet.ModelChecking",
+                    "PyBoolNet.ModelChecking.CMD_NUSMV = sys.argv[1]",
+                    "primes = {'v1': [[{'v1': 0}], [{'v1': 1}]]}",
+                    "with PyBoolNet.ModelChecking.SESSION_POOL.session(primes, 'asynchronous') as session:",
+                    "    print(session.fname)"]
+            fname_log = os.path.join(FILES_OUT, "nusmv_atexit.log")
+            if os.path.isfile(fname_log):
+                os.remove(fname_log)
+            env = dict(os.environ, PYBOOLNET_NUSMV_LOG=fname_log)
+            fname_smv = subprocess.check_output([sys.executable, "-c", "\n".join(code), fname_cmd], cwd=BASE, env=env).decode().strip()
+
+        with open(fname_log) as f:
+            lines = f.read().splitlines()
+        answer = (lines[-1], os.path.isfile(fname_smv))
+        expected = ("quit", False)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_output2answers(self):
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "initial states: TRUE",
+                            "number of initial states: 8",
+                            "accepting states: !(Erk & (Mek) | !Erk & ((Raf) | !Mek))",
+                            "number of accepting states: 3",
+                            "initial and accepting states: !(Erk & (Mek) | !Erk & ((Raf) | !Mek))",
+                            "number of initial and accepting states: 3",
+                            "-- specification (EF ((!Erk & !Mek) & Raf) & EF ((Erk & Mek) & Raf))  is false",
+                            "accepting states: TRUE",
+                            "number of accepting states: 8",
+                            "-- specification EF TRUE  is true"])
+
+        expected = [False, True]
+        answer = PyBoolNet.ModelChecking.output2answers(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        expected = [{'INIT': 'TRUE', 'INIT_SIZE': 8, 'ACCEPTING': '!(Erk & (Mek) | !Erk & ((Raf) | !Mek))', 'ACCEPTING_SIZE': 3, 'INITACCEPTING': '!(Erk & (Mek) | !Erk & ((Raf) | !Mek))', 'INITACCEPTING_SIZE': 3},
+                    {'ACCEPTING': 'TRUE', 'ACCEPTING_SIZE': 8}]
+        answer = PyBoolNet.ModelChecking.output2acceptingstates_list(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_output2acceptingstates_list(self):
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "initial states: TRUE",
+                            "number of initial states: 8",
+                            "accepting states: Erk",
+                            "number of accepting states: 4",
+                            "initial and accepting states: Erk",
+                            "number of initial and accepting states: 4",
+                            "-- specification EF Erk  is false",
+                            "accepting states: FALSE",
+                            "number of accepting states: 0",
+                            "-- specification EF FALSE  is false",
+                            "initial states: Raf",
+                            "number of initial states: 4",
+                            "accepting states: Mek | Raf",
+                            "number of accepting states: 6",
+                            "initial and accepting states: Raf",
+                            "number of initial and accepting states: 4",
+                            "-- specification EF (Mek | Raf)  is true"])
+
+        expected = [False, False, True]
+        answer = PyBoolNet.ModelChecking.output2answers(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        expected = [{'INIT': 'TRUE', 'INIT_SIZE': 8, 'ACCEPTING': 'Erk', 'ACCEPTING_SIZE': 4, 'INITACCEPTING': 'Erk', 'INITACCEPTING_SIZE': 4},
+                    {'ACCEPTING': 'FALSE', 'ACCEPTING_SIZE': 0},
+                    {'INIT': 'Raf', 'INIT_SIZE': 4, 'ACCEPTING': 'Mek | Raf', 'ACCEPTING_SIZE': 6, 'INITACCEPTING': 'Raf', 'INITACCEPTING_SIZE': 4}]
+        answer = PyBoolNet.ModelChecking.output2acceptingstates_list(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # output without accepting states
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "-- specification EF Erk  is true",
+                            "-- specification AG Erk  is false",
+                            "-- specification  F ( G Erk)  is false"])
+
+        expected = [True, False, False]
+        answer = PyBoolNet.ModelChecking.output2answers(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        expected = []
+        answer = PyBoolNet.ModelChecking.output2acceptingstates_list(output)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_nusmv_handle_batch(self):
+        class Process:
+            returncode = 0
+
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "accepting states: TRUE",
+                            "number of accepting states: 8",
+                            "-- specification EF TRUE  is true",
+                            "initial states: Erk",
+                            "number of initial states: 4",
+                            "accepting states: FALSE",
+                            "number of accepting states: 0",
+                            "initial and accepting states: FALSE",
+                            "number of initial and accepting states: 0",
+                            "-- specification (Erk -> AG !Erk)  is false"])
+
+        answer = PyBoolNet.ModelChecking.nusmv_handle_batch(["NuSMV"], Process, output, "", 2, False)
+        expected = [True, False]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.ModelChecking.nusmv_handle_batch(["NuSMV"], Process, output, "", 2, True)
+        expected = [(True, {'ACCEPTING': 'TRUE', 'ACCEPTING_SIZE': 8}),
+                    (False, {'INIT': 'Erk', 'INIT_SIZE': 4, 'ACCEPTING': 'FALSE', 'ACCEPTING_SIZE': 0, 'INITACCEPTING': 'FALSE', 'INITACCEPTING_SIZE': 0})]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # wrong number of answers, missing accepting states and failed calls
+        self.assertRaises(Exception, PyBoolNet.ModelChecking.nusmv_handle_batch, ["NuSMV"], Process, output, "", 3, False)
+        output = "\n".join(["-- specification EF TRUE  is true", "-- specification EF FALSE  is false"])
+        self.assertRaises(Exception, PyBoolNet.ModelChecking.nusmv_handle_batch, ["NuSMV"], Process, output, "", 2, True)
+        Process.returncode = 1
+        self.assertRaises(Exception, PyBoolNet.ModelChecking.nusmv_handle_batch, ["NuSMV"], Process, output, "", 2, False)
+
+    @unittest.skipIf(os.name == "nt", "the recorded NuSMV is started as script")
+    def test_check_primes_batch_recorded(self):
+        primes = PyBoolNet.Repository.get_primes("raf")
+        specs = ["LTLSPEC F(G(Erk))", "CTLSPEC EF(Erk)", "CTLSPEC AG(Erk)"]
+
+        # NuSMV answers the CTL specifications first
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "-- specification EF Erk  is true",
+                            "-- specification AG Erk  is false",
+                            "-- specification  F ( G Erk)  is false"])
+
+        with recorded_nusmv({"batch": output}):
+            answer = PyBoolNet.ModelChecking.check_primes_batch(primes, "asynchronous", "INIT TRUE", specs)
+
+        expected = [False, True, False]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        output = "\n".join(["*** This is NuSMV 2.6.0",
+                            "initial states: TRUE",
+                            "number of initial states: 8",
+                            "accepting states: Erk",
+                            "number of accepting states: 4",
+                            "initial and accepting states: Erk",
+                            "number of initial and accepting states: 4",
+                            "-- specification AG Erk  is false",
+                            "accepting states: TRUE",
+                            "number of accepting states: 8",
+                            "-- specification EF TRUE  is true"])
+
+        with recorded_nusmv({"batch": output}):
+            answer = PyBoolNet.ModelChecking.check_primes_batch(primes, "asynchronous", "INIT TRUE", ["CTLSPEC AG(Erk)", "CTLSPEC EF(TRUE)"], AcceptingStates=True)
+
+        expected = [(False, {'INIT': 'TRUE', 'INIT_SIZE': 8, 'ACCEPTING': 'Erk', 'ACCEPTING_SIZE': 4, 'INITACCEPTING': 'Erk', 'INITACCEPTING_SIZE': 4}),
+                    (True, {'ACCEPTING': 'TRUE', 'ACCEPTING_SIZE': 8})]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_primes2smv_specifications(self):
+        primes = PyBoolNet.Repository.get_primes("raf")
+        specs = ["CTLSPEC EF(Erk)", "LTLSPEC F(Mek)"]
+
+        answer = PyBoolNet.ModelChecking.primes2smv(primes, "asynchronous", "INIT TRUE", specs).split("\n")[-2:]
+        expected = specs
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
 
     def test_check_smv_true(self):
         fname_in  = os.path.join(FILES_IN,  "modelchecking_check_smv_true.smv")
@@ -1159,6 +1693,158 @@ class TestAspSolver(unittest.TestCase):
         self.assertTrue(result==expected, msg)
 
 
+    def test_clingo_handle(self):
+        fname_in  = os.path.join(FILES_IN,  "trapspaces_bounded.bnet")
+        primes = PyBoolNet.FileExchange.bnet2primes(fname_in)
+
+        PyBoolNet.AspSolver.clear_clingo_cache()
+
+        # bounds are switched by an external atom of the same grounded program
+        expected_bounded = {(1,1): [{"v1":1}, {"v3":0}, {"v3":1}],
+                            (2,3): [{"v1":0,"v2":0}, {"v1":1,"v2":1}, {"v1":1,"v3":0}, {"v1":1,"v3":1}, {"v3":1,"v4":1}]}
+        for bounds in [(1,1), (2,3), (1,1)]:
+            answer = PyBoolNet.AspSolver.clingo_handle(primes, "max", bounds, None, 1000)
+            answer.sort(key=lambda x: tuple(sorted(x.items())))
+            expected = expected_bounded[bounds]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+        answer = len(PyBoolNet.AspSolver._CLINGO_CONTROLS)
+        expected = 1
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # cached results are copied
+        answer = PyBoolNet.AspSolver.trap_spaces(primes, "min")
+        answer[0]["v1"] = 2
+        answer = PyBoolNet.AspSolver.trap_spaces(primes, "min")
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v1":0,"v2":0,"v3":0,"v4":0},
+                    {"v1":0,"v2":0,"v3":1,"v4":1},
+                    {"v1":1,"v2":1,"v3":0,"v4":1},
+                    {"v1":1,"v2":1,"v3":1,"v4":1},
+                    ]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        PyBoolNet.AspSolver.clear_clingo_cache()
+
+
+    def test_python_handle(self):
+        fname_in  = os.path.join(FILES_IN,  "trapspaces_bounded.bnet")
+        primes = PyBoolNet.FileExchange.bnet2primes(fname_in)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "min", None, None, 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v1":0,"v2":0,"v3":0,"v4":0},
+                    {"v1":0,"v2":0,"v3":1,"v4":1},
+                    {"v1":1,"v2":1,"v3":0,"v4":1},
+                    {"v1":1,"v2":1,"v3":1,"v4":1},
+                    ]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "max", (1,4), None, 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v1":0,"v2":0}, {"v1":1}, {"v3":0}, {"v3":1}]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "min", (2,3), None, 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v1":0,"v2":0,"v3":0},
+                    {"v1":0,"v2":0,"v3":1},
+                    {"v1":1,"v2":1,"v3":0},
+                    {"v1":1,"v2":1,"v3":1},
+                    {"v1":1,"v2":1,"v4":1},
+                    {"v1":1,"v3":1,"v4":1},
+                    ]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = len(PyBoolNet.AspSolver.python_handle(primes, "all", None, None, 1000))
+        expected = 19
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # minimal and maximal refer to the projections, as for clasp's --project
+        answer = PyBoolNet.AspSolver.python_handle(primes, "min", (2,3), ["v2","v4"], 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v2":0}, {"v2":1,"v4":1}]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "max", (2,3), ["v1","v3"], 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"v1":0}, {"v1":1}, {"v3":1}]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "max", (1,4), ["v1"], 1000)
+        expected = [{}]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        bnet = "\n".join(["x,    !x&!y | x&y", "y,    y", "z,    z"])
+        primes = PyBoolNet.FileExchange.bnet2primes(bnet)
+
+        answer = PyBoolNet.AspSolver.python_handle(primes, "all", (3,3), ["y","x"], 1000)
+        answer.sort(key=lambda x: tuple(sorted(x.items())))
+        expected = [{"x":0, "y":1}, {"x":1, "y":1}]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+
+    @unittest.skipIf(PyBoolNet.AspSolver.clingo is None, "requires the clingo module")
+    def test_python_handle_clingo(self):
+        def normal(Subspaces):
+            return sorted(json.dumps(x, sort_keys=True) for x in Subspaces)
+
+        rnd = random.Random(0)
+        networks = [PyBoolNet.Repository.get_primes(x) for x in ["raf", "arellano_rootstem", "n6s1c2", "xiao_wnt5a"]]
+        for i in range(40):
+            names = ["v%i"%j for j in range(rnd.randint(2,7))]
+            lines = []
+            for name in names:
+                regulators = rnd.sample(names, rnd.randint(1,min(3,len(names))))
+                terms = ["&".join(rnd.choice(["","!"])+x for x in rnd.sample(regulators, rnd.randint(1,len(regulators)))) for j in range(rnd.randint(1,3))]
+                lines.append("%s, %s"%(name, " | ".join(terms)))
+            networks.append(PyBoolNet.FileExchange.bnet2primes("\n".join(lines)))
+
+        for primes in networks:
+            names = sorted(primes)
+            n = len(names)
+            for project in [None, rnd.sample(names, 1), rnd.sample(names, min(3,n)), names[:-1]]:
+                for bounds in [None, (1,n), (0,2), (2,3), (n,n)]:
+                    for type_ in ["min", "max", "all", "percolated"]:
+                        answer = normal(PyBoolNet.AspSolver.python_handle(primes, type_, bounds, project, 10000))
+                        expected = normal(PyBoolNet.AspSolver.clingo_handle(primes, type_, bounds, project, 10000))
+                        msg = "\nprimes:   "+str(primes)+"\ntype:     "+type_+"\nbounds:   "+str(bounds)+"\nproject:  "+str(project)
+                        msg+= "\nexpected: "+str(expected)
+                        msg+= "\ngot:      "+str(answer)
+                        self.assertTrue(answer==expected, msg)
+
+                answer = normal(PyBoolNet.AspSolver.python_handle(primes, "circuits", None, project, 10000))
+                expected = normal(PyBoolNet.AspSolver.clingo_handle(primes, "circuits", None, project, 10000))
+                msg = "\nprimes:   "+str(primes)+"\nproject:  "+str(project)
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+        PyBoolNet.AspSolver.clear_clingo_cache()
+
+
 class TestPrimeImplicants(unittest.TestCase):
     def test_remove_variables(self):
         expected = {'v1': [[{'v1': 0}], [{'v1': 1}]]}
@@ -1200,7 +1886,7 @@ class TestPrimeImplicants(unittest.TestCase):
             expected = {'Raf23': [[{'Raf23': 1, 'Erk': 1}], [{'Raf23': 0}, {'Erk': 0}]], 'Mek': [[{'Raf23': 0, 'Erk': 0}, {'Mek': 0, 'Erk': 0}], [{'Mek': 1, 'Raf23': 1}, {'Erk': 1}]], 'Erk': [[{'Raf23': 0, 'Erk': 0}, {'Mek': 0}], [{'Mek': 1, 'Raf23': 1}, {'Mek': 1, 'Erk': 1}]]}
             msg = "\nexpected: "+str(expected)
             msg+= "\ngot:      "+str(primes)
-            self.assertTrue(primes==expected, msg)
+            self.assertTrue(PyBoolNet.PrimeImplicants.are_equal(primes, expected), msg)
 
         self.assertRaises(Exception, PyBoolNet.PrimeImplicants.rename_variable, primes, "GADD", "GADD12")
 
@@ -1432,6 +2118,18 @@ class TestFileExchange(unittest.TestCase):
         primes_expected = {'A': [[{}], []], 'B': [[], [{}]]}
         self.assertTrue(PyBoolNet.PrimeImplicants.are_equal(primes,primes_expected), str(primes))
 
+    def test_bnet2primes_python(self):
+        # primes computed by BNetToPrime
+        for name in ["irma", "missing_inputs", "trapspaces_bounded", "trapspaces_posfeedback", "trapspaces_tsfree", "interactiongraphs_topology"]:
+            fname_in = os.path.join(FILES_IN, name+".bnet")
+            with open(os.path.join(FILES_IN, name+".primes")) as f:
+                expected = json.load(f)
+
+            answer = PyBoolNet.FileExchange.bnet2primes(fname_in)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(PyBoolNet.PrimeImplicants.are_equal(answer, expected), msg)
+
     def test_bnet2primes_stdinout(self):
         fname_in  = os.path.join(FILES_IN,  "fileexchange_constants.bnet")
         fname_out1 = os.path.join(FILES_OUT, "fileexchange_stdout1.primes")
@@ -1698,6 +2396,66 @@ class TestInteractionGraphs(unittest.TestCase):
         ## no assertion ##
 
 
+class TestCommitment(unittest.TestCase):
+    def test_ordered_results(self):
+        lock = threading.Lock()
+        running = [0]
+        started = []
+        maximum = [0]
+
+        def function(job):
+            with lock:
+                running[0]+= 1
+                started.append(job)
+                maximum[0] = max(maximum[0], running[0])
+            # later jobs finish first
+            time.sleep(0.002*(10-job%10))
+            with lock:
+                running[0]-= 1
+            return job**2
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        try:
+            answer = list(PyBoolNet.Commitment._ordered_results(executor, function, range(25), 2))
+            expected = [x**2 for x in range(25)]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            # at most Workers jobs run at a time although the executor has more threads
+            answer = maximum[0]
+            expected = 2
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            # a consumer that stops early leaves at most Workers jobs started ahead of it
+            del started[:]
+            results = PyBoolNet.Commitment._ordered_results(executor, function, range(25), 3)
+            answer = [next(results) for i in range(5)]
+            results.close()
+            expected = [x**2 for x in range(5)]
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            executor.shutdown(wait=True)
+            answer = sorted(started)
+            msg = "\nexpected: at most "+str(list(range(8)))
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==list(range(len(answer))) and len(answer)<=8, msg)
+
+        finally:
+            executor.shutdown(wait=True)
+
+        # without executor the jobs run in the calling thread
+        answer = list(PyBoolNet.Commitment._ordered_results(None, function, range(5), 2))
+        expected = [x**2 for x in range(5)]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+
 if __name__=="__main__":
 
 
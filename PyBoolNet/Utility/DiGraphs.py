@@ -7,7 +7,12 @@ import itertools
 
 import PyBoolNet.Utility.Misc
 
-LAYOUT_ENGINES = {name:PyBoolNet.Utility.Misc.find_command(name) for name in ["dot","neato","fdp","sfdp","circo","twopi"]}
+# the commands of the layout engines are found on first access
+def __getattr__(name):
+    if name == "LAYOUT_ENGINES":
+        return {x: PyBoolNet.Utility.Misc.find_command(x) for x in PyBoolNet.Utility.Misc.GRAPHVIZ_ENGINES}
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 
@@ -206,7 +211,7 @@ def dot2image(FnameDOT, FnameIMAGE, LayoutEngine):
     filetype = FnameIMAGE.split('.')[-1]
 
 
-    cmd = [LAYOUT_ENGINES[LayoutEngine], "-T"+filetype, FnameDOT, "-o", FnameIMAGE]
+    cmd = [PyBoolNet.Utility.Misc.find_command(LayoutEngine), "-T"+filetype, FnameDOT, "-o", FnameIMAGE]
     proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     output, error = proc.communicate()
 
@@ -241,7 +246,7 @@ def digraph2image(DiGraph, FnameIMAGE, LayoutEngine, Silent=False):
 
     filetype = FnameIMAGE.split('.')[-1]
 
-    cmd = [LAYOUT_ENGINES[LayoutEngine], "-T"+filetype, "-o", FnameIMAGE]
+    cmd = [PyBoolNet.Utility.Misc.find_command(LayoutEngine), "-T"+filetype, "-o", FnameIMAGE]
     dotfile = digraph2dot(DiGraph, FnameDOT=None)
 
     proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -416,6 +421,8 @@ def digraph2condensationgraph(Digraph):
     The condensation graph is cycle-free and does distinguish between inputs
     and constants.
     The graph has no additional data.
+    The SCCs and the depths take linear time, the edges are found with bitsets of
+    reachable SCCs in *O(E*C/64)* time for *E* edges and *C* SCCs.
 
     **arguments**:
         * *Digraph* (networkx.DiGraph): directed graph
@@ -434,34 +441,55 @@ def digraph2condensationgraph(Digraph):
     """
 
     sccs = sorted([tuple(sorted(c)) for c in networkx.strongly_connected_components(Digraph)])
-    cascades = [c for c in sccs if (len(c)==1) and not Digraph.has_edge(c[0],c[0])]
-    noncascades = [c for c in sccs if c not in cascades]
+    component = dict((x, i) for i, c in enumerate(sccs) for x in c)
+    noncascade = [len(c)>1 or Digraph.has_edge(c[0],c[0]) for c in sccs]
+
+    # edges of the SCC graph
+    successors = [set() for c in sccs]
+    indegree = [0] * len(sccs)
+    for u, w in Digraph.edges():
+        U, W = component[u], component[w]
+        if U!=W and W not in successors[U]:
+            successors[U].add(W)
+            indegree[W]+= 1
+
+    # topological order of the SCC graph
+    order = [U for U in range(len(sccs)) if not indegree[U]]
+    for U in order:
+        for W in successors[U]:
+            indegree[W]-= 1
+            if not indegree[W]:
+                order.append(W)
+
+    # reach[U] is the bitset of noncascade components that are reachable
+    # from U by a path whose inner nodes are cascade components, each union
+    # costs O(C/64) for C components
+    reach = [0] * len(sccs)
+    for U in reversed(order):
+        for W in successors[U]:
+            reach[U]|= (1 << W) if noncascade[W] else reach[W]
 
     cgraph = networkx.DiGraph()
-    cgraph.add_nodes_from(noncascades)
-
-    # rgraph is a copy of Digraph with edges leaving noncascade components removed.
-    # will use rgraph to decide if there is a cascade path between U and W (i.e. edge in cgraph)
-    rgraph = networkx.DiGraph(Digraph.edges())
+    cgraph.add_nodes_from(c for U, c in enumerate(sccs) if noncascade[U])
 
-    for U,W in itertools.product(noncascades,noncascades):
-        if U==W: continue
+    for U in range(len(sccs)):
+        if not noncascade[U]: continue
 
-        rgraph = Digraph.copy()
-        for X in noncascades:
-            if not X==U and not X==W:
-                rgraph.remove_nodes_from(X)
+        bits = reach[U]
+        while bits:
+            W = (bits & -bits).bit_length() - 1
+            bits^= 1 << W
+            cgraph.add_edge(sccs[U], sccs[W])
 
-        if has_path(rgraph, U, W):
-            cgraph.add_edge(U,W)
+    # annotate each node with its depth in the hierarchy, i.e., the number of nodes
+    # of the longest path that ends in it, and an integer ID
+    depth = {}
+    for U in order:
+        if not noncascade[U]: continue
+        depth[sccs[U]] = 1 + max([depth[V] for V in cgraph.predecessors(sccs[U])] + [0])
 
-    # annotate each node with its depth in the hierarchy and an integer ID
     for ID, target in enumerate(cgraph.nodes()):
-        depth = 1
-        for source in networkx.ancestors(cgraph, target):
-            for p in networkx.all_simple_paths(cgraph, source, target):
-                depth = max(depth, len(p))
-        cgraph.nodes[target]["depth"] = depth
+        cgraph.nodes[target]["depth"] = depth[target]
         cgraph.nodes[target]["id"]    = ID
 
     return cgraph
@@ -12,6 +12,7 @@ except ImportError:
 
 myconfigparser = configparser
 
+import ast
 import math
 import json
 
@@ -36,24 +37,56 @@ def _load_cfg():
         execs = { n:config.get("Executables", n) for n in config.options("Executables") }
     
     return execs
-EXECUTABLES = _load_cfg()
+
+# settings.cfg and nusmvkeywords.json are read on first use
+_CACHE = {}
+
+
+def get_executables() -> dict:
+    """
+    the executables of settings.cfg, the file is read once
+    """
+    if "executables" not in _CACHE:
+        _CACHE["executables"] = _load_cfg()
+    return _CACHE["executables"]
+
+
+def get_nusmv_keywords() -> list:
+    """
+    the NuSMV keywords of nusmvkeywords.json, the file is read once
+    """
+    if "nusmvkeywords" not in _CACHE:
+        with open(os.path.join(BASE, "Dependencies", "nusmvkeywords.json")) as f:
+            _CACHE["nusmvkeywords"] = ast.literal_eval(f.read())
+    return _CACHE["nusmvkeywords"]
+
+
+def __getattr__(name):
+    if name == "EXECUTABLES":
+        return get_executables()
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 def os_is_windows() -> bool:
     return os.name == 'nt'
 
 def find_command(name) -> str:
     """
-    find the path to a command, in local dependencies or in the shared execution PATH
-    """
-    if name in EXECUTABLES:
-        cmd = EXECUTABLES[name]
-        if cmd.startswith(":"):
-            cmd = cmd[1:]
+    find the path to a command, in local dependencies or in the shared execution PATH, the path is found once
+    """
+    commands = _CACHE.setdefault("commands", {})
+    if name not in commands:
+        executables = get_executables()
+        if name in executables:
+            cmd = executables[name]
+            if cmd.startswith(":"):
+                cmd = cmd[1:]
+            else:
+                cmd = os.path.normpath(os.path.join(BASE, "Dependencies", cmd))
         else:
-            cmd = os.path.normpath(os.path.join(BASE, "Dependencies", cmd))
-    else:
-        cmd = name
-    return cmd 
+            cmd = name
+        commands[name] = cmd
+    return commands[name]
 
 def dicts_are_consistent(d1: dict, d2: dict) -> bool:
     """
@@ -0,0 +1,15 @@
+import importlib
+
+# the submodules are imported on first access, see PyBoolNet/__init__.py
+SUBMODULES = ["DiGraphs", "Misc"]
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES))
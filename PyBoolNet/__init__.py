@@ -3,24 +3,24 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
-import PyBoolNet.Attractors
-import PyBoolNet.Basins
-import PyBoolNet.Commitment
-import PyBoolNet.Phenotypes
-import PyBoolNet.FileExchange
-import PyBoolNet.InteractionGraphs
-import PyBoolNet.ModelChecking
-import PyBoolNet.PrimeImplicants
-import PyBoolNet.QuineMcCluskey
-import PyBoolNet.StateTransitionGraphs
-import PyBoolNet.TemporalLogic
-import PyBoolNet.AspSolver
-import PyBoolNet.Repository
-import PyBoolNet.Utility
-import PyBoolNet.BooleanLogic
-import PyBoolNet.Tests
-
-import pprint as prettyprint
+import importlib
+
+# the submodules are imported on first access, see PEP 562,
+# "import PyBoolNet.Attractors" imports a submodule explicitly
+SUBMODULES = ["Attractors", "Basins", "Commitment", "Phenotypes", "FileExchange", "InteractionGraphs",
+              "ModelChecking", "PrimeImplicants", "QuineMcCluskey", "StateTransitionGraphs", "TemporalLogic",
+              "AspSolver", "Repository", "Utility", "BooleanLogic", "Tests"]
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES))
 
 
 def version() -> str:
@@ -28,5 +28,7 @@ def version() -> str:
 
 
 def pprint(x):
+    import pprint as prettyprint
+
     pp = prettyprint.PrettyPrinter(indent=4)
     pp.pprint(x)
@@ -4,33 +4,89 @@ Created on Thu Mar 12 13:29:38 2020
 
 @author: ansu
 """
+import os
 import itertools
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 import dcgs.sccTofvs as sccTofvs
 import dcgs.canalFunction as canalFunction
+import dcgs.canalizingSetSearch as canalizingSetSearch
 from dcgs.booleanlogic_preprocessing import modeltext2nummodeltext
 from dcgs.booleanlogic_preprocessing import get_interaction_network
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic
 
-def algorithm(booleanlogic, targetattractor):
-    # initial setting
-    booleanlogicNum, node2num, num2node = modeltext2nummodeltext(booleanlogic)
+# network shared by the canalizing set searches of one process.
+# It is set once per worker process by _init_search.
+_search = {}
+
+def _init_search(booleanlogicNum, nodeList, state_fix, targetattractor, nodenum, cache_size, find_all):
+    canalLogic = canalFunction.compile_logic(booleanlogicNum)
+    _search['nodeList'] = nodeList
+    _search['targetState'] = dict((n, 'False' if targetattractor[int(n[1:])-1] == '0' else 'True') for n in nodeList)
+    _search['find_all'] = find_all
+    _search['state_fix'] = state_fix
+    _search['targetattractor'] = targetattractor
+    _search['nodenum'] = nodenum
+    _search['canalCache'] = canalFunction.CanalCache(canalLogic, maxsize=cache_size)
+
+# canalizing sets of one SCC for one FVS
+def _search_canalizing_sets(task):
+    sccname, currentFVS = task
+    nodeList = _search['nodeList']
+    targetattractor = _search['targetattractor']
+    canalCache = _search['canalCache']
+    sccnodes = sccname.split('_')
+    sccnodeindex = sorted([int(x[1:]) for x in sccnodes])
+    sccnodes = ['n'+'0'*(int(np.log10(_search['nodenum']))+1-len(str(x)))+str(x) for x in sccnodeindex]
+    sccFVS = sorted(set(sccnodes).intersection(currentFVS)) # current analyzed FVS in the SCC
+    state_fix_scc = _search['state_fix'].copy() # canalizing effect of input nodes
+    node2fix = list(set(nodeList)-set(sccnodes)) # nodes that are not related to the current SCC.
+    # fix the nodes' state to target attractor state
+    for nscc in node2fix:
+        if targetattractor[int(nscc[1:])-1] == '0':
+            state_fix_scc[nscc] = 'False'
+        else:
+            state_fix_scc[nscc] = 'True'
+    state_fix_scc=canalCache.propagate(state_fix_scc) # Canalizing effect of fixed nodes
+    node2fix = set([x for x in state_fix_scc if state_fix_scc[x] in ['True','False']])
+    scc_fvs = [sorted(set(sccnodes).intersection(currentFVS) - node2fix)]
+    # If scc is fixed by the fixed nodes, there is no canalizing set
+    if '' not in list(state_fix_scc.values()):
+        return(sccFVS, [], [])
+    # minimum FVS subsets with canalizing effect on the whole network
+    CS = canalizingSetSearch.minimal_canalizing_sets(canalCache.logic, state_fix_scc, scc_fvs[0], _search['targetState'], find_all=_search['find_all'], canalCache=canalCache)
+    cCS = [[sorted(list(set(sccFVS).difference(cc)))] for cc in CS]
+    return(sccFVS, CS, cCS)
+
+# FVSs of the whole network, one per combination of the FVSs of each SCC
+def iter_fvs(dic_fvs):
+    for fvs in itertools.product(*dic_fvs.values()):
+        yield [n for f in fvs for n in f]
+
+# control sets of the whole network, one per combination of the canalizing
+# sets of each SCC (SCCs without canalizing set are skipped), without duplicates
+def iter_control_sets(dic_CS):
+    csLists = [dic_CS[scc] for scc in dic_CS if dic_CS[scc] != [[]]]
+    if not csLists:
+        return
+    seen = set()
+    for css in itertools.product(*csLists):
+        controlSet = [n for cs in css for n in cs]
+        if tuple(controlSet) in seen:
+            continue
+        seen.add(tuple(controlSet))
+        yield controlSet
+
+def algorithm(booleanlogic, targetattractor, cache_size=8192, n_jobs=1, find_all=True):
+    # initial setting, the Boolean logic (text or BooleanNetwork) is parsed once
+    booleanlogicNum, node2num, num2node = modeltext2nummodeltext(parse_booleanlogic(booleanlogic))
     dgraph, nodeList, inputNodeState = get_interaction_network(booleanlogicNum)
     dic_hierarchy, dic_fvs, minimal_fvs = sccTofvs.scc2fvs_bruteforce(dgraph)
     hierarchylist =  list(dic_hierarchy.keys())
     hierarchylistorder = hierarchylist.copy()
     hierarchylistorder.reverse()
     minimal_fvs = [minimal_fvs]
-    fvs_raw = []
-    for scc in dic_fvs:
-        if len(fvs_raw) == 0:
-            fvs_raw = dic_fvs[scc]
-            continue
-        fvs2 = []
-        for n,k in enumerate(fvs_raw):
-            for f in dic_fvs[scc]:
-                fvs2.append(fvs_raw[n] + f)
-        fvs_raw = fvs2.copy()
     # if no FVS exists, return.
     if not minimal_fvs[0]:
         print('controlled by only input nodes')
@@ -43,52 +99,34 @@ def algorithm(booleanlogic, targetattractor):
     dic_CS = {} # dictionary for canalizing sets
     dic_cCS = {} # dictionary for canalized sets
     dic_sccFVS = {} # FVS in each SCC
-    # analyze each SCC sequentially
+    # all (SCC, FVS) searches are independent; analyze SCCs in hierarchy order.
+    # Each SCC is analyzed only with its own FVSs, the FVS of the other SCCs
+    # do not change the result.
+    tasks = [(hierarchylist[-(i+1)], currentFVS) for i in range(len(hierarchylist)) for currentFVS in dic_fvs[hierarchylist[-(i+1)]]]
+    initargs = (booleanlogicNum, nodeList, state_fix, targetattractor, len(node2num), cache_size, find_all)
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count()
+    if n_jobs == 1 or len(tasks) == 1:
+        _init_search(*initargs)
+        results = list(map(_search_canalizing_sets, tasks))
+    else:
+        # each worker gets the network once through the initializer
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_search, initargs=initargs) as executor:
+            results = list(executor.map(_search_canalizing_sets, tasks, chunksize=max(1, len(tasks)//(4*n_jobs))))
+    # merge results in task order
+    results = iter(results)
     for i in range(len(hierarchylist)):
+        sccname = hierarchylist[-(i+1)]
         CS = [] # canalizing sets
         cCS = [] # canalized sets
-        # analyze all FVS in each SCC
-        for currentFVS in fvs_raw:
-            sccnodes = hierarchylist[-(i+1)].split('_')
-            sccnodeindex = sorted([int(x[1:]) for x in sccnodes])
-            sccnodes = ['n'+'0'*(int(np.log10(len(node2num)))+1-len(str(x)))+str(x) for x in sccnodeindex]
-            dic_sccFVS[hierarchylist[-(i+1)]] = list(set(sccnodes).intersection(currentFVS)) # current analyzed FVS in the SCC
-            state_fix_scc = state_fix.copy() # canalizing effect of input nodes
-            node2fix = list(set(nodeList)-set(sccnodes)) # nodes that are not related to the current SCC.
-            # fix the nodes' state to target attractor state
-            for nscc in node2fix:
-                if targetattractor[int(nscc[1:])-1] == '0':
-                    state_fix_scc[nscc] = 'False'
-                else:
-                    state_fix_scc[nscc] = 'True'
-            state_fix_scc=canalFunction.main(state_fix_scc,booleanlogicNum) # Canalizing effect of fixed nodes
-            node2fix = set([x for x in state_fix_scc if state_fix_scc[x] in ['True','False']])
-            scc_fvs = [list(set(sccnodes).intersection(currentFVS) - node2fix)]
-            # If scc is fixed by the fixed nodes, then save result and continue
-            if '' not in list(state_fix_scc.values()):
-                dic_cCS[hierarchylist[-(i+1)]] = [dic_sccFVS[hierarchylist[-(i+1)]]]
-                dic_CS[hierarchylist[-(i+1)]] = [[]]
-                continue
-            # check canalizing effect of FVS subsets
-            find_combi = False
-            for L, F in enumerate(scc_fvs[0]):
-                if find_combi:
-                        break
-                for cc in itertools.combinations(scc_fvs[0],L+1):
-                    cstate = state_fix_scc.copy()
-                    for cc2 in cc:
-                        if targetattractor[int(cc2[1:])-1] == '0':
-                            cstate[cc2] = 'False'
-                        else:
-                            cstate[cc2] = 'True'
-                    ss2=canalFunction.main(cstate,booleanlogicNum) # canalizing effect of FVS subset.
-                    if '' not in list(ss2.values()):
-                        find_combi=True
-                        CS.append(list(cc))
-                        cCS.append([sorted(list(set(dic_sccFVS[hierarchylist[-(i+1)]]).difference(cc)))])
+        for currentFVS in dic_fvs[sccname]:
+            sccFVS, cs, ccs = next(results)
+            dic_sccFVS[sccname] = sccFVS
+            CS.extend(cs)
+            cCS.extend(ccs)
         if CS == []:
-            dic_cCS[hierarchylist[-(i+1)]] = [dic_sccFVS[hierarchylist[-(i+1)]]]
-            dic_CS[hierarchylist[-(i+1)]] = [[]]
+            dic_cCS[sccname] = [dic_sccFVS[sccname]]
+            dic_CS[sccname] = [[]]
             continue
         # select minimum canalizing sets.
         CS_minsize = min([len(x) for x in CS])
@@ -99,8 +137,8 @@ def algorithm(booleanlogic, targetattractor):
                 continue
             CS_filtered.append(CS[cs_num])
             cCS_filtered.append(cCS[cs_num])
-        dic_CS[hierarchylist[-(i+1)]] = CS_filtered
-        dic_cCS[hierarchylist[-(i+1)]] = cCS_filtered
+        dic_CS[sccname] = CS_filtered
+        dic_cCS[sccname] = cCS_filtered
 
     return(dic_CS,dic_cCS, dic_fvs)
     
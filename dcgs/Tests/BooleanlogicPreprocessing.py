@@ -0,0 +1,148 @@
+import unittest
+import os
+
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic, modeltext2nummodeltext, get_interaction_network
+
+BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+MODELS = os.path.join(BASE, "biological random Boolean network")
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+# A is a prefix of AB, and AB of ABC
+BOOLEANLOGIC = '''
+  AB =   (A and not(ABC))or AB
+A=not AB
+ABC = ( ( A ) )
+'''
+
+
+
+class TestParse(unittest.TestCase):
+
+    def test_parse_booleanlogic(self):
+        network = parse_booleanlogic(BOOLEANLOGIC)
+
+        answer = network.nodes
+        expected = ['AB', 'A', 'ABC']
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = network.exprs
+        expected = [('or', (('and', (('var', 1), ('not', ('var', 2)))), ('var', 0))), ('not', ('var', 0)), ('var', 1)]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # whitespace and redundant parentheses do not change the network
+        answer = parse_booleanlogic('AB = A and not ABC or AB\nA = not AB\nABC = A').exprs
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # not > and > or
+        answer = parse_booleanlogic('x = not x or y and not z\ny = x\nz = y').exprs[0]
+        expected = ('or', (('not', ('var', 0)), ('and', (('var', 1), ('not', ('var', 2))))))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # a BooleanNetwork is returned as is
+        self.assertTrue(parse_booleanlogic(network) is network)
+
+    def test_nodes_without_rule(self):
+        network = parse_booleanlogic('x = y and C\nC = True\n')
+
+        answer = (network.nodes, network.exprs[2], network.nodeList())
+        expected = (['x', 'C', 'y'], None, ['x', 'C'])
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        dgraph, nodeList, inputNodeState = get_interaction_network('x = y and C\nC = True\ny = not x or y\n')
+        answer = (sorted(dgraph.edges()), nodeList, inputNodeState)
+        expected = ([('C', 'x'), ('x', 'y'), ('y', 'x'), ('y', 'y')], ['x', 'C', 'y'], {'x': '', 'C': 'True', 'y': ''})
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_errors(self):
+        for text in ['A = B and', 'A = (B or C\nB = A', 'A = B )', 'A = B\nA = not B', 'A B', 'A = B or or C']:
+            with self.assertRaises(ValueError):
+                parse_booleanlogic(text)
+
+
+class TestText(unittest.TestCase):
+
+    def test_to_text(self):
+        network = parse_booleanlogic(BOOLEANLOGIC)
+
+        answer = network.to_text()
+        expected = 'AB = A and not ABC or AB\nA = not AB\nABC = A\n'
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = network.to_bnet()
+        expected = 'AB,\tA & ! ABC | AB\nA,\t! AB\nABC,\tA\n'
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # parentheses are kept where the precedence needs them
+        text = 'x = not ( x or y ) and ( y or z )\ny = True\nz = not not x\n'
+        answer = parse_booleanlogic(text).to_text()
+        msg = "\nexpected: "+str(text)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==text, msg)
+
+    def test_round_trip(self):
+        # the text of a network is parsed into the same network
+        for k in range(1, 101):
+            with open(os.path.join(MODELS, "random_net_10_%i.txt" % k)) as f:
+                network = parse_booleanlogic(f.read())
+            text = network.to_text()
+            answer = parse_booleanlogic(text)
+            msg = "\nmodel:    "+str(k)
+            msg+= "\nexpected: "+text
+            msg+= "\ngot:      "+answer.to_text()
+            self.assertTrue((answer.nodes, answer.exprs)==(network.nodes, network.exprs) and answer.to_text()==text, msg)
+
+
+class TestRenumbering(unittest.TestCase):
+
+    def test_modeltext2nummodeltext(self):
+        answer = modeltext2nummodeltext(BOOLEANLOGIC)
+        # names that are prefixes of other names are replaced as whole tokens, the layout is kept
+        expected = ('\n  n1 =   (n2 and not(n3))or n1\nn2=not n1\nn3 = ( ( n2 ) )\n',
+                    {'ABC': 3, 'AB': 1, 'A': 2},
+                    {'1': 'AB', '2': 'A', '3': 'ABC'})
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # the renamed BooleanNetwork has the same text
+        network, node2num, num2node = modeltext2nummodeltext(parse_booleanlogic(BOOLEANLOGIC))
+        answer = network.to_text()
+        expected = parse_booleanlogic(expected[0]).to_text()
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_zero_padding(self):
+        text = ''.join('x%i = x%i\n' % (i, (i+1) % 10) for i in range(10))
+        answer, node2num, num2node = modeltext2nummodeltext(text)
+        expected = ''.join('n%02i = n%02i\n' % (i+1, (i+1) % 10 + 1) for i in range(10))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # undefined nodes keep their names
+        answer, node2num, num2node = modeltext2nummodeltext('x = y and not x\n')
+        expected = 'n1 = y and not n1\n'
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
@@ -0,0 +1,79 @@
+import unittest
+import os
+import itertools
+import threading
+
+from dcgs import bruteforceCK
+from dcgs.booleanlogic_preprocessing import modeltext2nummodeltext
+
+BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+MODELS = os.path.join(BASE, "biological random Boolean network")
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+def read_model(k):
+    with open(os.path.join(MODELS, "random_net_10_%i.txt" % k)) as f:
+        return f.read()
+
+# control kernels of corpus models for one of their point attractors
+KERNELS = [
+    (1, '0101100110', [('n04', 'n07'), ('n05', 'n07'), ('n06', 'n07')]),
+    (2, '0001100101', [('n02', 'n10'), ('n04', 'n10'), ('n05', 'n10'), ('n06', 'n10'), ('n09', 'n10')]),
+    (3, '0100000000', [('n04',), ('n06',)]),
+    ]
+
+
+
+class TestControlKernels(unittest.TestCase):
+
+    def setUp(self):
+        # several chunks per level
+        self.chunk_size = bruteforceCK.CHUNK_SIZE
+        bruteforceCK.CHUNK_SIZE = 7
+
+    def tearDown(self):
+        bruteforceCK.CHUNK_SIZE = self.chunk_size
+        bruteforceCK._check.clear()
+
+    def test_algorithm(self):
+        for k, target, expected in KERNELS:
+            for n_jobs in [1, 2]:
+                answer = bruteforceCK.algorithm(read_model(k), target, n_jobs=n_jobs)
+                msg = "\nmodel:    "+str(k)+"\nn_jobs:   "+str(n_jobs)
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+    def test_first(self):
+        # a single control kernel of minimum size
+        for k, target, expected in KERNELS:
+            for n_jobs in [1, 2]:
+                answer = bruteforceCK.algorithm(read_model(k), target, n_jobs=n_jobs, first=True)
+                msg = "\nmodel:    "+str(k)+"\nn_jobs:   "+str(n_jobs)
+                msg+= "\nexpected: one of "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(len(answer)==1 and answer[0] in expected, msg)
+
+    def test_stop(self):
+        # with first=True the check of a chunk stops at the first kernel and sets the stop event,
+        # the workers then skip their remaining chunks
+        k, target, expected = KERNELS[1]
+        booleanlogicNum, node2num, num2node = modeltext2nummodeltext(read_model(k))
+        nodes = sorted(set(x for kernel in expected for x in kernel))
+        stop = threading.Event()
+        bruteforceCK._init_check(booleanlogicNum, target, stop, True)
+
+        answer = bruteforceCK._check_kernels(list(itertools.combinations(nodes, 2)))
+        expected = [expected[0]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected and stop.is_set(), msg)
+
+        answer = bruteforceCK._check_kernels(list(itertools.combinations(nodes, 2)))
+        expected = []
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
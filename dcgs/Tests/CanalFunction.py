@@ -0,0 +1,311 @@
+import unittest
+import os
+import random
+import itertools
+
+import numpy as np
+
+from dcgs import canalFunction
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic, modeltext2nummodeltext, get_interaction_network
+
+BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+MODELS = os.path.join(BASE, "biological random Boolean network")
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+def read_model(k):
+    with open(os.path.join(MODELS, "random_net_10_%i.txt" % k)) as f:
+        return f.read()
+
+def pinned(nodes, pins):
+    state = dict((node, '') for node in nodes)
+    state.update(pins)
+    return state
+
+NODES = ['x%02i' % i for i in range(1, 11)]
+
+def random_values(rnd, size):
+    return [rnd.choice([True, False, None, None, None]) for i in range(size)]
+
+# canalized states of corpus models, as computed by the former sympy
+# implementation of canalFunction.main
+CANALIZED = [
+    (3, {'x06': 'False'},
+     {'x01': 'False', 'x02': 'True', 'x03': 'False', 'x04': 'False', 'x05': 'False', 'x06': 'False', 'x07': 'False', 'x08': 'False', 'x09': 'False', 'x10': 'False'}),
+    (3, {'x03': 'True', 'x06': 'False', 'x07': 'True'},
+     {'x01': 'True', 'x02': '', 'x03': 'True', 'x04': 'False', 'x05': 'False', 'x06': 'False', 'x07': 'True', 'x08': 'False', 'x09': 'False', 'x10': ''}),
+    (3, {'x10': 'True'},
+     {'x01': '', 'x02': 'True', 'x03': '', 'x04': '', 'x05': '', 'x06': '', 'x07': '', 'x08': '', 'x09': '', 'x10': 'True'}),
+    (8, {'x08': 'False'},
+     {'x01': 'True', 'x02': 'False', 'x03': 'False', 'x04': 'True', 'x05': 'False', 'x06': 'True', 'x07': 'True', 'x08': 'False', 'x09': 'False', 'x10': 'False'}),
+    (8, {'x07': 'True', 'x09': 'False'},
+     {'x01': '', 'x02': '', 'x03': '', 'x04': 'True', 'x05': 'False', 'x06': '', 'x07': 'True', 'x08': '', 'x09': 'False', 'x10': 'False'}),
+    (26, {'x02': 'True'},
+     {'x01': 'False', 'x02': 'True', 'x03': 'True', 'x04': 'False', 'x05': 'False', 'x06': 'True', 'x07': 'False', 'x08': 'False', 'x09': 'False', 'x10': 'True'}),
+    (26, {'x04': 'False', 'x05': 'False'},
+     {'x01': 'False', 'x02': '', 'x03': '', 'x04': 'False', 'x05': 'False', 'x06': 'True', 'x07': 'False', 'x08': '', 'x09': 'False', 'x10': 'True'}),
+    (26, {},
+     {'x01': '', 'x02': '', 'x03': '', 'x04': '', 'x05': '', 'x06': '', 'x07': '', 'x08': '', 'x09': '', 'x10': ''}),
+    ]
+
+
+class TestCanalFunction(unittest.TestCase):
+
+    def test_main(self):
+        for k, pins, expected in CANALIZED:
+            state = pinned(NODES, pins)
+            answer = canalFunction.main(state, read_model(k))
+            msg = "\nmodel:    "+str(k)+"\npins:     "+str(pins)
+            msg+= "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+            # the state is not changed in place
+            answer = state
+            expected = pinned(NODES, pins)
+            msg = "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected, msg)
+
+    def test_main_inputs(self):
+        # text, BooleanNetwork and CanalLogic give the same STATE
+        for k, pins, expected in CANALIZED:
+            text = read_model(k)
+            for booleanlogic in [text, parse_booleanlogic(text), canalFunction.CanalLogic(text)]:
+                answer = canalFunction.main(pinned(NODES, pins), booleanlogic)
+                msg = "\ninput:    "+type(booleanlogic).__name__
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+    def test_main_inputnodes(self):
+        # canalizing effect of the input nodes, as in Main.algorithm
+        booleanlogic = '''
+        A = B
+        E = False
+        C = not B and E
+        B = A or C
+        D = False
+        '''
+        booleanlogicNum, node2num, num2node = modeltext2nummodeltext(booleanlogic)
+        dgraph, nodeList, inputNodeState = get_interaction_network(booleanlogicNum)
+
+        answer = canalFunction.main(inputNodeState, booleanlogicNum)
+        expected = {'n1': '', 'n2': 'False', 'n3': 'False', 'n4': '', 'n5': 'False'}
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_propagate_values_changed(self):
+        # extending a closure by one node gives the closure computed from scratch
+        for k in [3, 8, 26]:
+            logic = canalFunction.CanalLogic(read_model(k))
+            for base in [{}, {'x06': 'False'}, {'x02': 'True'}, {'x09': 'False'}]:
+                closure = logic.propagate_values(logic.state2values(pinned(NODES, base)))
+                for node in NODES:
+                    i = logic.index[node]
+                    if closure[i] is not None:
+                        continue
+                    for value in [True, False]:
+                        values = list(closure)
+                        values[i] = value
+                        answer = logic.propagate_values(values, changed=[i])
+
+                        values = logic.state2values(pinned(NODES, base))
+                        values[i] = value
+                        expected = logic.propagate_values(values)
+                        msg = "\nmodel:    "+str(k)+"\nbase:     "+str(base)+"\nnode:     "+node+"="+str(value)
+                        msg+= "\nexpected: "+str(expected)
+                        msg+= "\ngot:      "+str(answer)
+                        self.assertTrue(answer==expected, msg)
+
+
+class TestBitplanes(unittest.TestCase):
+
+    def test_pack_rows(self):
+        # bit r%64 of word r//64 is row r
+        bits = np.zeros((2, 130), dtype=bool)
+        bits[0, 0] = True
+        bits[0, 65] = True
+        bits[1, 129] = True
+        planes = canalFunction.pack_rows(bits)
+
+        answer = planes.tolist()
+        expected = [[1, 2, 0], [0, 0, 2]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = (canalFunction.unpack_rows(planes, 130) == bits).all()
+        self.assertTrue(answer)
+
+    def test_propagate_values_batch(self):
+        # batches below and above MIN_BATCH, and with a partially used last word
+        rnd = random.Random(0)
+        for k in [3, 8, 26]:
+            logic = canalFunction.CanalLogic(read_model(k))
+            for nrows in [canalFunction.MIN_BATCH-1, canalFunction.MIN_BATCH, 64, 100, 130]:
+                rows = [random_values(rnd, len(logic.nodes)) for r in range(nrows)]
+                answer = logic.propagate_values_batch(rows)
+                expected = [logic.propagate_values(list(values)) for values in rows]
+                msg = "\nmodel:    "+str(k)+"\nrows:     "+str(nrows)
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+    def test_canalizes(self):
+        rnd = random.Random(1)
+        for k in [3, 8, 26]:
+            logic = canalFunction.CanalLogic(read_model(k))
+            state = pinned(NODES, {})
+            for nrows in [10, 100]:
+                overrides = [dict((node, rnd.choice(['True', 'False'])) for node in rnd.sample(NODES, rnd.randint(1, 4))) for r in range(nrows)]
+                answer = logic.canalizes(state, overrides)
+
+                expected = []
+                for override in overrides:
+                    STATE = logic.propagate(pinned(NODES, override))
+                    expected.append('' not in STATE.values())
+                msg = "\nmodel:    "+str(k)+"\nrows:     "+str(nrows)
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+                answer = logic.propagate_batch([pinned(NODES, x) for x in overrides])
+                expected = [logic.propagate(pinned(NODES, x)) for x in overrides]
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+    def test_product_bitplanes(self):
+        # 2^7 rows in the order of itertools.product
+        logic = canalFunction.CanalLogic(read_model(26))
+        state = pinned(NODES, {'x04': 'False'})
+        nodes = ['x01', 'x02', 'x03', 'x05', 'x07', 'x08', 'x10']
+        ones, zeros = logic.product_bitplanes(state, nodes)
+        ones, zeros = logic.propagate_bitplanes(ones, zeros)
+        answer = logic.bitplanes2states(ones, zeros, 2**len(nodes), state)
+
+        expected = []
+        for combi in itertools.product(('False', 'True'), repeat=len(nodes)):
+            STATE = state.copy()
+            STATE.update(zip(nodes, combi))
+            expected.append(logic.propagate(STATE))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+
+class TestCanalCache(unittest.TestCase):
+
+    def test_closures(self):
+        # cached, subset seeded and cold closures are equal
+        rnd = random.Random(2)
+        for k in [3, 8, 26, 40, 77]:
+            logic = canalFunction.CanalLogic(read_model(k))
+            cache = canalFunction.CanalCache(logic)
+            for r in range(40):
+                pins = dict((logic.index[node], rnd.choice([True, False])) for node in rnd.sample(NODES, rnd.randint(1, 3)))
+                bigger = pins.copy()
+                for node in rnd.sample(NODES, 2):
+                    bigger[logic.index[node]] = rnd.choice([True, False])
+
+                answer = cache.closures([pins, bigger, pins])
+                expected = []
+                for x in [pins, bigger, pins]:
+                    values = [None] * len(logic.nodes)
+                    for i, v in x.items():
+                        values[i] = v
+                    expected.append(tuple(logic.propagate_values(values)))
+                msg = "\nmodel:    "+str(k)+"\npins:     "+str([pins, bigger])
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
+
+            # some of the larger pins were seeded from a cached subset
+            self.assertTrue(cache.cache_info().reused > 0)
+
+    def test_seed(self):
+        logic = canalFunction.CanalLogic(read_model(3))
+        cache = canalFunction.CanalCache(logic)
+        x02, x06, x10 = [logic.index[x] for x in ['x02', 'x06', 'x10']]
+
+        # the closure of x10=True fixes x02=True, it seeds x10=True, x06=False
+        cache.closures([{x10: True}])
+        answer = cache.closures([{x10: True, x06: False}])[0]
+        expected = tuple(logic.propagate_values(logic.state2values({'x10': 'True', 'x06': 'False'})))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = cache.cache_info().reused
+        expected = 1
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # but not x10=True, x02=False, which contradicts it
+        answer = cache.closures([{x10: True, x02: False}])[0]
+        expected = tuple(logic.propagate_values(logic.state2values({'x10': 'True', 'x02': 'False'})))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = cache.cache_info().reused
+        expected = 1
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_cache_info(self):
+        logic = canalFunction.CanalLogic(read_model(8))
+        cache = canalFunction.CanalCache(logic, maxsize=2)
+        a, b, c = [{logic.index[x]: True} for x in ['x01', 'x04', 'x07']]
+
+        # a key that occurs twice in one call is a single miss
+        cache.closures([a, a])
+        answer = cache.cache_info()
+        expected = canalFunction.CacheInfo(hits=0, misses=1, reused=0, maxsize=2, currsize=1)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        cache.closures([a, b])
+        answer = cache.cache_info()
+        expected = canalFunction.CacheInfo(hits=1, misses=2, reused=0, maxsize=2, currsize=2)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # a was used more recently than b, c evicts b
+        cache.closures([a])
+        cache.closures([c])
+        cache.closures([a, b])
+        answer = cache.cache_info()
+        expected = canalFunction.CacheInfo(hits=3, misses=4, reused=0, maxsize=2, currsize=2)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        cache.cache_clear()
+        answer = cache.cache_info()
+        expected = canalFunction.CacheInfo(hits=0, misses=0, reused=0, maxsize=2, currsize=0)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_propagate(self):
+        # the memoized STATE is the one of CanalLogic
+        logic = canalFunction.CanalLogic(read_model(26))
+        cache = canalFunction.CanalCache(logic)
+        for k, pins, expected in CANALIZED:
+            if k != 26:
+                continue
+            for i in range(2):
+                answer = cache.propagate(pinned(NODES, pins))
+                msg = "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
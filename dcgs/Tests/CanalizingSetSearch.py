@@ -0,0 +1,133 @@
+import unittest
+import os
+
+from dcgs import canalFunction
+from dcgs import canalizingSetSearch
+from dcgs import synchronousSimulator
+
+BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+MODELS = os.path.join(BASE, "biological random Boolean network")
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+BOOLEANLOGIC = '''
+x1 = x2
+x2 = x1 or x3
+x3 = x2 and x5
+x4 = x5 or x3
+x5 = x4
+'''
+
+NODES = ['x1', 'x2', 'x3', 'x4', 'x5']
+
+def str2target(nodes, state):
+    return dict((node, 'True' if s == '1' else 'False') for node, s in zip(nodes, state))
+
+
+
+class TestMinimalCanalizingSets(unittest.TestCase):
+
+    def setUp(self):
+        # count the calls of the fallback search
+        self.fallbacks = []
+        self.levelwise = canalizingSetSearch.levelwise_canalizing_sets
+        def levelwise(*args):
+            self.fallbacks.append(args[3])
+            return self.levelwise(*args)
+        canalizingSetSearch.levelwise_canalizing_sets = levelwise
+
+    def tearDown(self):
+        canalizingSetSearch.levelwise_canalizing_sets = self.levelwise
+
+    def test_minimal_canalizing_sets(self):
+        logic = canalFunction.CanalLogic(BOOLEANLOGIC)
+        state = dict((node, '') for node in NODES)
+
+        # x3 fixes x2, x1, x4 and x5
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, state, NODES, str2target(NODES, '11111'))
+        expected = [['x3']]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # no single node canalizes, supersets of the pairs are not returned
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, state, NODES, str2target(NODES, '00000'))
+        expected = [['x1', 'x4'], ['x1', 'x5'], ['x2', 'x4'], ['x2', 'x5']]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, state, NODES, str2target(NODES, '00000'), find_all=False)
+        msg = "\nexpected: one of "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(len(answer)==1 and answer[0] in expected, msg)
+
+        # nodes that are already fixed are no candidates
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, dict(state, x4='False'), NODES, str2target(NODES, '00000'))
+        expected = [['x1'], ['x2']]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = self.fallbacks
+        expected = []
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_inconsistent_target(self):
+        logic = canalFunction.CanalLogic(BOOLEANLOGIC)
+        cache = canalFunction.CanalCache(logic)
+        state = dict((node, '') for node in NODES)
+
+        # x3 canalizes x2 to True, not to its target, the search falls back to all subsets
+        target = str2target(NODES, '10101')
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, state, NODES, target, canalCache=cache)
+        expected = [['x3']]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = self.fallbacks
+        expected = [target]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # the fallback uses the cache
+        self.assertTrue(cache.cache_info().misses > 0)
+
+        # the fixed nodes already contradict the target
+        self.fallbacks = []
+        target = str2target(NODES, '00000')
+        answer = canalizingSetSearch.minimal_canalizing_sets(logic, dict(state, x3='True'), NODES, target)
+        expected = self.levelwise(logic, dict(state, x3='True'), NODES, target)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = self.fallbacks
+        expected = [target]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_steady_states(self):
+        # the branch and bound search finds the canalizing sets of the level by level search
+        for k in range(1, 21):
+            with open(os.path.join(MODELS, "random_net_10_%i.txt" % k)) as f:
+                logic = canalFunction.CanalLogic(f.read())
+            dynamics = synchronousSimulator.SyncDynamics(logic)
+            steady, cyclic = synchronousSimulator.compute_attractors(dynamics)
+            state = dict((node, '') for node in dynamics.nodes)
+            for x in steady:
+                target = str2target(dynamics.nodes, x)
+                answer = canalizingSetSearch.minimal_canalizing_sets(logic, state, dynamics.nodes, target)
+                expected = self.levelwise(logic, state, dynamics.nodes, target)
+                msg = "\nmodel:    "+str(k)+"\ntarget:   "+x
+                msg+= "\nexpected: "+str(expected)
+                msg+= "\ngot:      "+str(answer)
+                self.assertTrue(answer==expected, msg)
@@ -0,0 +1,183 @@
+import unittest
+import os
+import tempfile
+import shutil
+
+import networkx as nx
+
+from dcgs import resultCache
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='dcgs_')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_put(self):
+        cache = resultCache.DiskCache(self.directory)
+        key = cache.key('primes', 'A = B\n', [1, 2])
+
+        answer = cache.get(key)
+        expected = (False, None)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        value = {'A': [[{'B': 0}], [{'B': 1}]], 'B': [[{'B': 0}], [{'B': 1}]]}
+        cache.put(key, value)
+        answer = cache.get(key)
+        expected = (True, value)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = (cache.hits, cache.misses)
+        expected = (1, 1)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # a new instance on the same directory finds the entry
+        answer = resultCache.DiskCache(self.directory).get(key)
+        expected = (True, value)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_evict(self):
+        cache = resultCache.DiskCache(self.directory)
+        keys = [cache.key('test', i) for i in range(4)]
+        for i, key in enumerate(keys[:3]):
+            cache.put(key, i)
+            os.utime(cache._path(key), (1000*(i+1), 1000*(i+1)))
+
+        # the first entry is used again, the second one is the least recently used
+        cache.get(keys[0])
+        cache.max_bytes = cache.size()
+        cache.put(keys[3], 3)
+
+        answer = [cache.get(key)[0] for key in keys]
+        expected = [True, False, True, True]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = cache._size
+        expected = cache.size()
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_size(self):
+        cache = resultCache.DiskCache(self.directory)
+        key = cache.key('test', 0)
+        cache.put(key, list(range(100)))
+        cache.put(key, [])
+        cache.put(cache.key('test', 1), 'x')
+
+        answer = cache._size
+        expected = cache.size()
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        cache.clear()
+        answer = (cache._size, cache.size())
+        expected = (0, 0)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+
+class TestKeys(unittest.TestCase):
+
+    def test_network_key(self):
+        # the key is the normalized text of the network
+        answer = resultCache.network_key('\n  A = B   and not C\nB=A\n\n')
+        expected = 'A = B and not C\nB = A\n'
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = resultCache.network_key('A = (B and not C)\nB = A\n')
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        cache = resultCache.DiskCache.__new__(resultCache.DiskCache)
+        answer = cache.key('primes', resultCache.network_key('A = B and not C\nB = A'))
+        expected = cache.key('primes', expected)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_graph_key(self):
+        DG = nx.DiGraph()
+        DG.add_edges_from([('n1', 'n2'), ('n2', 'n1'), ('n2', 2)])
+
+        answer = resultCache.graph_key(DG)
+        expected = [['n1', 'n2', '2'], [['n1', 'n2'], ['n2', 'n1'], ['n2', '2']]]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        cache = resultCache.DiskCache.__new__(resultCache.DiskCache)
+        answer = cache.key('scc2fvs_bruteforce', resultCache.graph_key(DG))
+        expected = cache.key('scc2fvs_bruteforce', resultCache.graph_key(DG.copy()))
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # other insertion order, other key
+        DG2 = nx.DiGraph()
+        DG2.add_edges_from([('n2', 'n1'), ('n1', 'n2'), ('n2', 2)])
+        answer = cache.key('scc2fvs_bruteforce', resultCache.graph_key(DG2))
+        self.assertTrue(answer!=expected)
+
+
+class TestCached(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='dcgs_')
+        self.previous = resultCache.get_cache()
+
+    def tearDown(self):
+        resultCache._cache[0] = self.previous
+        shutil.rmtree(self.directory)
+
+    def test_cached(self):
+        calls = []
+
+        @resultCache.cached('test', lambda x, y=1: [x, y])
+        def add(x, y=1):
+            calls.append((x, y))
+            return x+y
+
+        # without cache every call computes
+        resultCache.configure(None)
+        answer = [add(1), add(1)]
+        expected = [2, 2]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected and len(calls)==2, msg)
+
+        cache = resultCache.configure(self.directory)
+        answer = [add(1), add(1), add(1, 2), add(1, y=2)]
+        expected = [2, 2, 3, 3]
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = (len(calls), cache.hits, cache.misses)
+        expected = (4, 2, 2)
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
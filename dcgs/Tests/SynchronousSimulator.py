@@ -0,0 +1,105 @@
+import unittest
+import os
+
+import numpy as np
+
+import PyBoolNet.FileExchange
+import PyBoolNet.StateTransitionGraphs
+import PyBoolNet.Attractors
+
+from dcgs import synchronousSimulator
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic, BooleanNetwork
+
+BASE = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+MODELS = os.path.join(BASE, "biological random Boolean network")
+
+
+def run():
+    unittest.main(verbosity=2, buffer=True, exit=False, module=__name__)
+
+
+def read_model(k):
+    with open(os.path.join(MODELS, "random_net_10_%i.txt" % k)) as f:
+        return f.read()
+
+def normal(steady, cyclic):
+    return sorted(steady), sorted(sorted(x) for x in cyclic)
+
+
+
+class TestSyncDynamics(unittest.TestCase):
+
+    def test_compute_attractors(self):
+        # corpus models with cyclic synchronous attractors
+        for k in [6, 9, 17, 52, 75, 95]:
+            text = read_model(k)
+            answer = normal(*synchronousSimulator.compute_attractors(synchronousSimulator.SyncDynamics(text)))
+
+            primes = PyBoolNet.FileExchange.bnet2primes(parse_booleanlogic(text).to_bnet())
+            stg = PyBoolNet.StateTransitionGraphs.primes2stg(primes, "synchronous")
+            expected = normal(*PyBoolNet.Attractors.compute_attractors_tarjan(stg))
+            msg = "\nmodel:    "+str(k)
+            msg+= "\nexpected: "+str(expected)
+            msg+= "\ngot:      "+str(answer)
+            self.assertTrue(answer==expected and expected[1], msg)
+
+    def test_successors(self):
+        # the first node is the most significant bit
+        dynamics = synchronousSimulator.SyncDynamics('b = a\na = not b\nc = a and b\n')
+        answer = [dynamics.int2str(x) for x in dynamics.successors()]
+        expected = ['100', '100', '000', '000', '110', '110', '011', '011']
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        answer = dynamics.state2int({'a': 1, 'b': 'False', 'c': 'True'})
+        expected = 5
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_pinned_successors(self):
+        # overriding the bits of pinned nodes is the dynamics with constant update rules
+        for k in [6, 9, 52]:
+            network = parse_booleanlogic(read_model(k))
+            dynamics = synchronousSimulator.SyncDynamics(network)
+            successors = dynamics.successors()
+            for pins in [{'x01': 1}, {'x03': 0, 'x07': 1}, {'x02': 'True', 'x05': 'False', 'x10': 'True'}]:
+                answer = dynamics.pinned_successors(successors, pins)
+
+                exprs = list(network.exprs)
+                for node, s in pins.items():
+                    exprs[network.index[node]] = ('const', s in (1, 'True'))
+                expected = synchronousSimulator.SyncDynamics(BooleanNetwork(network.nodes, exprs).to_text()).successors()
+                msg = "\nmodel:    "+str(k)+"\npins:     "+str(pins)
+                self.assertTrue((answer==expected).all(), msg)
+
+                # the base successors are not changed
+                self.assertTrue((successors==dynamics.successors()).all())
+
+    def test_attractor_states(self):
+        # a transient of 9 states into the cycle 8, 9 and the steady state 10
+        successors = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 8, 10], dtype=np.uint32)
+        answer = synchronousSimulator.attractor_states(successors)
+        expected = ([10], [[8, 9]])
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+        # a single cycle through all states
+        successors = np.array([3, 0, 1, 4, 2], dtype=np.uint32)
+        answer = synchronousSimulator.attractor_states(successors)
+        expected = ([], [[0, 3, 4, 2, 1]])
+        msg = "\nexpected: "+str(expected)
+        msg+= "\ngot:      "+str(answer)
+        self.assertTrue(answer==expected, msg)
+
+    def test_errors(self):
+        # the successor array of more than MAX_NODES nodes is not built
+        n = synchronousSimulator.MAX_NODES + 1
+        text = ''.join('v%i = v%i\n' % (i, (i+1) % n) for i in range(n))
+        with self.assertRaises(ValueError):
+            synchronousSimulator.SyncDynamics(text)
+
+        with self.assertRaises(ValueError):
+            synchronousSimulator.SyncDynamics('a = b\n')
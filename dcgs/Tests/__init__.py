@@ -0,0 +1,6 @@
+
+import dcgs.Tests.ResultCache
+
+
+def run():
+    dcgs.Tests.ResultCache.run()
@@ -1 +1 @@
-__all__ = ['booleanlogic_preprocessing','canalFunction','fvs','Main','replace_str','sccTofvs']
+__all__ = ['benchmark','booleanlogic_preprocessing','canalFunction','canalizingSetSearch','fvs','Main','replace_str','resultCache','sccTofvs','synchronousSimulator']
@@ -8,37 +8,35 @@ import copy
 import networkx as nx
 from itertools import product
 from dcgs import canalFunction
-from dcgs.replace_str import replaceMultiple2
-import PyBoolNet as PyBoolNet # code from https://github.com/hklarner/PyBoolNet
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic
+from dcgs import resultCache
+# code from https://github.com/hklarner/PyBoolNet, only the submodules in use are imported
+import PyBoolNet.FileExchange
+import PyBoolNet.StateTransitionGraphs
+import PyBoolNet.Attractors
 # get canalized states by using canalizing effect of fixed FVS
 def get_canalized_states(booleanlogic, dgraph, nodeList, inputNodeState, minimal_fvs):
-    canalized_states = []
+    canalLogic = canalFunction.compile_logic(booleanlogic)
     # Canalizing effect(CE) of input node
-    state=canalFunction.main(inputNodeState,booleanlogic)
+    state=canalFunction.main(inputNodeState,canalLogic)
     state_origin = state.copy()
     # If minimal_fvs is empty, return the state with fixed inputs
     if minimal_fvs == []:
         CSS = state_origin.copy()
         return(CSS, state_origin)
-    # generate 0,1 combination
+    # generate 0,1 combination of fvs states as bitplanes,
+    # one row per state in the order of product(('False', 'True'), repeat=fvs_len)
     fvs_len = len(minimal_fvs[0])
-    possible_fvs_values = product(('False', 'True'), repeat=fvs_len)
-    # calculate canalization of each fvs state
-    for fstate in possible_fvs_values:
-        state = state_origin.copy()
-        for fvn,fs in zip(minimal_fvs[0],fstate):
-            state[fvn] = fs
-        modeltext = '%s' % booleanlogic
-        # Canalizing effect(CE) of fvs fixation
-        fixedState=canalFunction.main(state,modeltext)
-        canalized_states.append(fixedState)
+    ones, zeros = canalLogic.product_bitplanes(state_origin, minimal_fvs[0])
+    # Canalizing effect(CE) of all fvs fixations at once
+    ones, zeros = canalLogic.propagate_bitplanes(ones, zeros)
+    canalized_states = canalLogic.bitplanes2states(ones, zeros, 2**fvs_len, state_origin)
     CSS = canalized_states
     return(CSS,state_origin)
 
+@resultCache.cached('primes', resultCache.network_key)
 def getPrimeFromBoolean(booleanlogic):
-    bnet = booleanlogic.replace('=',',\t')
-    bnet = replaceMultiple2(bnet, [' and ',' or ',' not '], [' & ',' | ',' ! '])
-    bnet = replaceMultiple2(bnet, ['True','False'], [' 1 ',' 0 '])
+    bnet = parse_booleanlogic(booleanlogic).to_bnet()
     primes = PyBoolNet.FileExchange.bnet2primes(bnet)
     from collections import OrderedDict
     primes = OrderedDict(sorted(primes.items(), key=lambda t: int(t[0][1:])))
@@ -154,6 +152,7 @@ def primes2stg_search_depth(Primes, Update,  InitialStates, search_depth=0):
 
 	return stg
 
+@resultCache.cached('pointattractors', lambda booleanlogic, CSS: [resultCache.network_key(booleanlogic), [list(css.items()) for css in CSS]])
 def get_pointattractorFromCSS(booleanlogic, CSS):   
     primes = getPrimeFromBoolean(booleanlogic)
     initialstates = []
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the DCGS pipeline on the bundled Boolean network models.
+
+Every model of the corpus (default: "biological random Boolean network") and,
+on request, the models of the example notebooks is run through the stages
+
+    modeltext2nummodeltext, get_interaction_network, scc2fvs_bruteforce,
+    get_canalized_states, get_pointattractorFromCSS, Main.algorithm,
+    bruteforceCK.algorithm
+
+and the wall time, the memory the stage adds to the resident set size and the
+number of calls (of the stage and of the canalization) are recorded for each
+stage. The target attractor of
+Main.algorithm and bruteforceCK.algorithm is the first steady state of the
+synchronous dynamics. Results are written to JSON and compared against a
+stored baseline:
+
+    python -m dcgs.benchmark --output bench.json --save-baseline baseline.json
+    python -m dcgs.benchmark --output bench.json --baseline baseline.json
+
+A stage whose total time, over the models on which it succeeds in both runs,
+exceeds the baseline by more than the tolerance, or that fails on more models
+than in the baseline, is reported as a regression and the exit status is 1.
+
+The import time of the packages (best of several fresh interpreters) is
+recorded and compared in the same way, alone with
+
+    python -m dcgs.benchmark --imports-only --output imports.json --baseline baseline.json
+"""
+import os
+import sys
+import io
+import glob
+import json
+import time
+import platform
+import argparse
+import subprocess
+import contextlib
+import traceback
+
+BASE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CORPUS = os.path.join(BASE, 'biological random Boolean network')
+NOTEBOOKS = [os.path.join(BASE, 'Tutorial_example.ipynb'), os.path.join(BASE, 'MAPK_EGFR GoF.ipynb')]
+STAGES = ['modeltext2nummodeltext', 'get_interaction_network', 'scc2fvs_bruteforce',
+          'get_canalized_states', 'get_pointattractorFromCSS', 'Main.algorithm', 'bruteforceCK.algorithm']
+IMPORTS = ['PyBoolNet', 'PyBoolNet.StateTransitionGraphs', 'dcgs.attractorlandscapeSeeker', 'dcgs.bruteforceCK']
+
+# peak resident set size in kB. On Linux the high-water mark is reset before
+# each stage, elsewhere it is the peak of the whole process. The memory of a
+# stage is its peak minus the resident set size at its start, which is only
+# known if the reset works.
+def _reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except (IOError, OSError):
+        return False
+
+def _rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    return None
+
+def _peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    except ImportError:
+        return None
+
+class _CallCounter:
+    # counts the calls of functions while active, the functions are patched
+    # as attributes of their module or class
+    def __init__(self, targets):
+        self.targets = targets
+        self.counts = dict((name, 0) for name, _, _ in targets)
+        self._originals = []
+
+    def __enter__(self):
+        for name, owner, attribute in self.targets:
+            original = getattr(owner, attribute)
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *args):
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+
+    def _wrap(self, name, function):
+        counts = self.counts
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+def _counted_functions():
+    from dcgs import canalFunction
+    return [('canalFunction.main', canalFunction, 'main'),
+            ('CanalLogic.propagate_values', canalFunction.CanalLogic, 'propagate_values'),
+            ('CanalLogic.propagate_bitplanes', canalFunction.CanalLogic, 'propagate_bitplanes')]
+
+def _run_stage(name, function, *args):
+    record = {}
+    counter = _CallCounter(_counted_functions())
+    reset = _reset_peak_rss()
+    rss = _rss()
+    start = time.perf_counter()
+    try:
+        with counter, contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args)
+        record['error'] = None
+    except Exception as e:
+        result = None
+        record['error'] = '%s: %s' % (type(e).__name__, e)
+    record['time'] = time.perf_counter() - start
+    record['peak_rss_kb'] = _peak_rss()
+    if reset and rss is not None and record['peak_rss_kb'] is not None:
+        record['stage_rss_kb'] = record['peak_rss_kb'] - rss
+    else:
+        record['stage_rss_kb'] = None
+    calls = dict(counter.counts)
+    calls[name] = 1
+    record['calls'] = calls
+    return result, record
+
+def load_corpus(corpus=CORPUS, notebooks=False, limit=None):
+    # {model name: Boolean logic text}
+    models = {}
+    files = sorted(glob.glob(os.path.join(corpus, '*.txt')), key=lambda f: [int(x) if x.isdigit() else x for x in os.path.basename(f).replace('.', '_').split('_')])
+    for f in files[:limit]:
+        with open(f) as fp:
+            models[os.path.basename(f)] = fp.read()
+    if notebooks:
+        for nb in NOTEBOOKS:
+            if not os.path.exists(nb):
+                continue
+            with open(nb) as fp:
+                cells = json.load(fp)['cells']
+            for cell in cells:
+                source = ''.join(cell['source'])
+                if cell['cell_type'] == 'code' and "booleanlogic = '''" in source:
+                    models[os.path.basename(nb)] = source.split("'''")[1]
+                    break
+    return models
+
+def benchmark_model(booleanlogic, stages=STAGES):
+    from dcgs import booleanlogic_preprocessing, sccTofvs, attractorlandscapeSeeker, Main, bruteforceCK, synchronousSimulator
+    records = {}
+    booleanlogicNum, r = _run_stage('modeltext2nummodeltext', booleanlogic_preprocessing.modeltext2nummodeltext, booleanlogic)
+    records['modeltext2nummodeltext'] = r
+    if booleanlogicNum is None:
+        return records
+    booleanlogicNum = booleanlogicNum[0]
+    network, r = _run_stage('get_interaction_network', booleanlogic_preprocessing.get_interaction_network, booleanlogicNum)
+    records['get_interaction_network'] = r
+    if network is None:
+        return records
+    dgraph, nodeList, inputNodeState = network
+    minimal_fvs = None
+    if 'scc2fvs_bruteforce' in stages:
+        fvs, records['scc2fvs_bruteforce'] = _run_stage('scc2fvs_bruteforce', sccTofvs.scc2fvs_bruteforce, dgraph)
+        minimal_fvs = None if fvs is None else fvs[2]
+    CSS = None
+    if 'get_canalized_states' in stages and minimal_fvs is not None:
+        css, records['get_canalized_states'] = _run_stage('get_canalized_states', attractorlandscapeSeeker.get_canalized_states, booleanlogicNum, dgraph, nodeList, inputNodeState, [minimal_fvs])
+        CSS = None if css is None else css[0]
+    if 'get_pointattractorFromCSS' in stages and CSS is not None:
+        _, records['get_pointattractorFromCSS'] = _run_stage('get_pointattractorFromCSS', attractorlandscapeSeeker.get_pointattractorFromCSS, booleanlogicNum, CSS)
+    # target attractor: first steady state of the synchronous dynamics, the
+    # nodes of booleanlogicNum are numbered in the order of the model text
+    target = None
+    if 'Main.algorithm' in stages or 'bruteforceCK.algorithm' in stages:
+        try:
+            dynamics = synchronousSimulator.SyncDynamics(booleanlogicNum)
+            steady, cyclic = synchronousSimulator.compute_attractors(dynamics)
+            target = steady[0] if steady else None
+        except ValueError:
+            target = None
+    if target is None:
+        return records
+    if 'Main.algorithm' in stages:
+        _, records['Main.algorithm'] = _run_stage('Main.algorithm', Main.algorithm, booleanlogic, target)
+    if 'bruteforceCK.algorithm' in stages:
+        _, records['bruteforceCK.algorithm'] = _run_stage('bruteforceCK.algorithm', bruteforceCK.algorithm, booleanlogic, target)
+    return records
+
+# seconds to import each module in a fresh interpreter, the best of repeat runs
+def import_times(modules=IMPORTS, repeat=5):
+    code = 'import time; t = time.perf_counter(); import %s; print(time.perf_counter() - t)'
+    times = {}
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            try:
+                output = subprocess.check_output([sys.executable, '-c', code % module], cwd=BASE, stderr=subprocess.DEVNULL)
+            except subprocess.CalledProcessError:
+                best = None
+                break
+            t = float(output.split()[-1])
+            best = t if best is None else min(best, t)
+        times[module] = best
+    return times
+
+def summarize(models):
+    summary = {}
+    for records in models.values():
+        for stage, record in records.items():
+            s = summary.setdefault(stage, {'time': 0.0, 'peak_rss_kb': 0, 'stage_rss_kb': None, 'calls': {}, 'models': 0, 'failed': 0})
+            s['models'] += 1
+            if record['error']:
+                s['failed'] += 1
+                continue
+            s['time'] += record['time']
+            if record['peak_rss_kb'] is not None:
+                s['peak_rss_kb'] = max(s['peak_rss_kb'], record['peak_rss_kb'])
+            if record.get('stage_rss_kb') is not None:
+                s['stage_rss_kb'] = max(s['stage_rss_kb'] or 0, record['stage_rss_kb'])
+            for name, count in record['calls'].items():
+                s['calls'][name] = s['calls'].get(name, 0) + count
+    return dict((stage, summary[stage]) for stage in STAGES if stage in summary)
+
+def environment():
+    versions = {}
+    for module in ['numpy', 'networkx']:
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'packages': versions}
+
+def run(models, stages=STAGES, verbose=True, imports=IMPORTS):
+    results = {'environment': environment(), 'imports': import_times(imports), 'models': {}}
+    for name, booleanlogic in models.items():
+        if verbose:
+            print('%s ...' % name, end=' ', flush=True)
+        start = time.perf_counter()
+        try:
+            results['models'][name] = benchmark_model(booleanlogic, stages)
+        except Exception:
+            traceback.print_exc()
+            results['models'][name] = {}
+        if verbose:
+            print('%.3f s' % (time.perf_counter()-start))
+    results['summary'] = summarize(results['models'])
+    return results
+
+# total time of stage over the models on which it succeeded in both runs
+def _common_times(stage, results, baseline):
+    before = after = 0.0
+    for name, records in results['models'].items():
+        current = records.get(stage)
+        old = baseline.get('models', {}).get(name, {}).get(stage)
+        if current is None or old is None or current['error'] or old['error']:
+            continue
+        before += old['time']
+        after += current['time']
+    return before, after
+
+# stages (and imports) whose time grew by more than tolerance (relative) since
+# baseline and stages that fail on more models than in baseline
+def compare(results, baseline, tolerance=0.2):
+    timings = []
+    for stage, current in results['summary'].items():
+        if stage in baseline.get('summary', {}):
+            before, after = _common_times(stage, results, baseline)
+            failed = (baseline['summary'][stage]['failed'], current['failed'])
+            timings.append((stage, before, after, failed))
+    for module, current in results.get('imports', {}).items():
+        before = baseline.get('imports', {}).get(module)
+        if before is not None:
+            # an import that fails now counts as failed model
+            failed = (0, int(current is None))
+            timings.append(('import ' + module, before, before if current is None else current, failed))
+    regressions = []
+    lines = ['%-40s %12s %12s %8s %8s' % ('stage', 'baseline[s]', 'current[s]', 'ratio', 'failed')]
+    for stage, before, current, failed in timings:
+        if before > 0:
+            ratio = current / before
+        else:
+            ratio = 1.0 if current == 0 else float('inf')
+        flag = ''
+        if failed[1] > failed[0]:
+            regressions.append(stage)
+            flag = '  FAILED'
+        elif ratio > 1 + tolerance:
+            regressions.append(stage)
+            flag = '  REGRESSION'
+        lines.append('%-40s %12.4f %12.4f %8.2f %4i->%-3i%s' % (stage, before, current, ratio, failed[0], failed[1], flag))
+    return regressions, '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the DCGS pipeline on the bundled models.')
+    parser.add_argument('--corpus', default=CORPUS, help='directory of Boolean logic text files')
+    parser.add_argument('--notebooks', action='store_true', help='also run the models of the example notebooks (the FVS search of the MAPK model takes long)')
+    parser.add_argument('--limit', type=int, default=None, help='number of corpus models')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--imports-only', action='store_true', help='only measure the import time of the packages')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file for the results')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--save-baseline', default=None, help='also write the results as baseline to this file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown per stage')
+    args = parser.parse_args(argv)
+
+    models = {} if args.imports_only else load_corpus(args.corpus, args.notebooks, args.limit)
+    results = run(models, args.stages)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=1)
+    for module, t in results['imports'].items():
+        print('%-40s %10s s' % ('import ' + module, 'failed' if t is None else '%.4f' % t))
+    for stage, s in results['summary'].items():
+        print('%-28s %10.4f s  %8s kB peak  %8s kB stage  %3i/%i failed' % (stage, s['time'], s['peak_rss_kb'], s['stage_rss_kb'], s['failed'], s['models']))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions, table = compare(results, baseline, args.tolerance)
+        print(table)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
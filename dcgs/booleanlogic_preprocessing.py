@@ -4,56 +4,194 @@ Created on Fri Dec  4 11:00:00 2020
 
 @author: ansu
 """
-from dcgs.replace_str import replaceMultiple
-from dcgs.replace_str import replaceMultiple2
 import re
-import numpy as np
 import networkx as nx
 
+# The Boolean logic text is tokenized and parsed once into a BooleanNetwork.
+# Nodes get integer ids in the order of their definition (nodes without update
+# rule follow in the order of their first occurrence), the update rules are
+# expression trees over the ids:
+#   ('const', True/False), ('var', id), ('not', expr),
+#   ('and', (expr, ...)), ('or', (expr, ...))
+# The functions of dcgs accept a BooleanNetwork in place of the text.
+
+_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+_NAME = re.compile(r'[^\s()=]+')
+
+def _tokenize(expression):
+    return _TOKEN.findall(expression)
+
+def _parse(tokens, index):
+    # recursive descent parser, precedence: not > and > or
+    pos = [0]
+    def peek():
+        return tokens[pos[0]] if pos[0] < len(tokens) else None
+    def take():
+        tok = peek()
+        if tok is None:
+            raise ValueError('unexpected end of expression: %s' % ' '.join(tokens))
+        pos[0] += 1
+        return tok
+    def parse_or():
+        args = [parse_and()]
+        while peek() == 'or':
+            take()
+            args.append(parse_and())
+        return args[0] if len(args) == 1 else ('or', tuple(args))
+    def parse_and():
+        args = [parse_not()]
+        while peek() == 'and':
+            take()
+            args.append(parse_not())
+        return args[0] if len(args) == 1 else ('and', tuple(args))
+    def parse_not():
+        if peek() == 'not':
+            take()
+            return ('not', parse_not())
+        return parse_atom()
+    def parse_atom():
+        tok = take()
+        if tok == '(':
+            expr = parse_or()
+            if take() != ')':
+                raise ValueError('missing closing parenthesis: %s' % ' '.join(tokens))
+            return expr
+        if tok in ('True', 'False'):
+            return ('const', tok == 'True')
+        if tok in ('and', 'or', 'not', ')'):
+            raise ValueError('unexpected token "%s": %s' % (tok, ' '.join(tokens)))
+        if tok not in index:
+            index[tok] = len(index)
+        return ('var', index[tok])
+    expr = parse_or()
+    if peek() is not None:
+        raise ValueError('unexpected token "%s": %s' % (peek(), ' '.join(tokens)))
+    return expr
+
+def _regulators(expr, found):
+    # variables of expr in the order of their first occurrence (dict as ordered set)
+    if expr[0] == 'var':
+        found[expr[1]] = None
+    elif expr[0] == 'not':
+        _regulators(expr[1], found)
+    elif expr[0] in ('and', 'or'):
+        for arg in expr[1]:
+            _regulators(arg, found)
+    return found
+
+_PRECEDENCE = {'or': 0, 'and': 1, 'not': 2, 'var': 3, 'const': 3}
+
+def _format(expr, names, operators):
+    kind = expr[0]
+    if kind == 'const':
+        return operators['True'] if expr[1] else operators['False']
+    if kind == 'var':
+        return names[expr[1]]
+    def arg(e):
+        text = _format(e, names, operators)
+        return '( %s )' % text if _PRECEDENCE[e[0]] < _PRECEDENCE[kind] else text
+    if kind == 'not':
+        return '%s %s' % (operators['not'], arg(expr[1]))
+    return (' %s ' % operators[kind]).join(arg(e) for e in expr[1])
+
+BOOLEANLOGIC = {'and': 'and', 'or': 'or', 'not': 'not', 'True': 'True', 'False': 'False'}
+BNET = {'and': '&', 'or': '|', 'not': '!', 'True': '1', 'False': '0'}
+
+class BooleanNetwork:
+    # nodes : node names, the position is the node id
+    # exprs : expression tree of each node, None for nodes without update rule
+    def __init__(self, nodes, exprs):
+        self.nodes = list(nodes)
+        self.index = dict((node, i) for i, node in enumerate(self.nodes))
+        self.exprs = list(exprs)
+        # ids of the nodes with update rule, in the order of definition
+        self.defined = [i for i, e in enumerate(self.exprs) if e is not None]
+        # regulator ids of each node in the order of occurrence
+        self.regulators = [[] if e is None else list(_regulators(e, {})) for e in self.exprs]
+        # 'True'/'False' for input nodes (constant update rule), '' otherwise
+        self.inputNodeState = {}
+        for i in self.defined:
+            e = self.exprs[i]
+            self.inputNodeState[self.nodes[i]] = str(e[1]) if e[0] == 'const' else ''
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def nodeList(self):
+        return [self.nodes[i] for i in self.defined]
+
+    def interaction_network(self):
+        # regulator -> target graph, edges in the order of the update rules
+        dgraph = nx.DiGraph()
+        for i in self.defined:
+            for j in self.regulators[i]:
+                dgraph.add_edge(self.nodes[j], self.nodes[i])
+        return dgraph
+
+    def rename(self, names):
+        # the same network with the nodes renamed by the dict names
+        return BooleanNetwork([names.get(node, node) for node in self.nodes], self.exprs)
+
+    def expression(self, node, operators=BOOLEANLOGIC):
+        return _format(self.exprs[self.index[node]], self.nodes, operators)
+
+    def to_text(self, operators=BOOLEANLOGIC, separator=' = '):
+        return '\n'.join(self.nodes[i] + separator + _format(self.exprs[i], self.nodes, operators) for i in self.defined) + '\n'
+
+    def to_bnet(self):
+        return self.to_text(BNET, ',\t')
+
+# BooleanNetwork of the Boolean logic text (a BooleanNetwork is returned as is)
+def parse_booleanlogic(booleanlogic):
+    if isinstance(booleanlogic, BooleanNetwork):
+        return booleanlogic
+    index = {}
+    lines = []
+    for line in booleanlogic.splitlines():
+        if line.strip() == '':
+            continue
+        target, separator, expression = line.partition('=')
+        target = target.strip()
+        if not separator or not target:
+            raise ValueError('not an update rule: %s' % line.strip())
+        if target in index:
+            raise ValueError('node %s is defined twice' % target)
+        index[target] = len(index)
+        lines.append(_tokenize(expression))
+    exprs = [_parse(tokens, index) for tokens in lines]
+    nodes = sorted(index, key=index.get)
+    exprs += [None] * (len(nodes) - len(exprs))
+    return BooleanNetwork(nodes, exprs)
+
+# rename the defined nodes to n1, n2, ... (zero padded) in the order of definition.
+# Returns the renamed text, or the renamed BooleanNetwork if booleanlogic is one.
 def modeltext2nummodeltext(modeltext):
-    modeltextLine = modeltext.splitlines()
+    network = parse_booleanlogic(modeltext)
+    width = len(str(len(network.defined)))
     node2num = {}
     num2node = {}
-    i = 0
-    for m in modeltextLine:
-        if not (m.strip() == ""):
-            i+=1
-            target_node = m.split('=')[0].strip()
-            node2num[target_node] = i
-            num2node[str(i)] = target_node
-    # To avoid the error when node name is included in other node name.
-    new_d = {}
-    for k in sorted(node2num, key=len, reverse=True):
-        new_d[k] = node2num[k]
-    node2num = new_d.copy()
-    for node in node2num:
-        modeltext = replaceMultiple2(modeltext, [node+' ='],['n'+'0'*(int(np.log10(len(node2num)))+1-len(str(node2num[node])))+str(node2num[node])+' ='])
-        modeltext = replaceMultiple2(modeltext, [' '+node+' '],[' '+'n'+'0'*(int(np.log10(len(node2num)))+1-len(str(node2num[node])))+str(node2num[node])+' '])
-        modeltext = replaceMultiple2(modeltext, [' '+node+'\n'],[' '+'n'+'0'*(int(np.log10(len(node2num)))+1-len(str(node2num[node])))+str(node2num[node])+'\n'])
-
+    numbers = {}
+    for k, i in enumerate(network.defined):
+        node = network.nodes[i]
+        node2num[node] = k+1
+        num2node[str(k+1)] = node
+        numbers[node] = 'n%0*i' % (width, k+1)
+    # longest names first, as before
+    node2num = dict((node, node2num[node]) for node in sorted(node2num, key=len, reverse=True))
+    if isinstance(modeltext, BooleanNetwork):
+        return(network.rename(numbers), node2num, num2node)
+    # rename all tokens in one pass, the text layout is kept
+    modeltext = _NAME.sub(lambda m: numbers.get(m.group(), m.group()), modeltext)
     return(modeltext, node2num, num2node)
 
-# get pyhsical interaction network from boolean logic text
+# get pyhsical interaction network from boolean logic text (or BooleanNetwork)
 def get_interaction_network(booleanlogic):
-    dgraph = nx.DiGraph()
-    inputNodeState = {}
-    nodeList = []
-    for line in booleanlogic.split('\n'):
-        if line.strip() == '':
-            continue
-        line = line.strip().split('=')
-        targetnode = line[0].strip()
-        nodeList.append(targetnode)
-        sourceline = replaceMultiple(line[1],[' and ',' or ',' not ','(',')'],' ')
-        sournodelist = [sn.strip() for sn in sourceline.split(' ') if sn.strip() != '']
-        if sournodelist[0] in ['True','False']:
-            inputNodeState[targetnode] = sournodelist[0]
-            continue
-        inputNodeState[targetnode] = ''
-        for sourcenode in sournodelist:
-            dgraph.add_edge(sourcenode,targetnode)
+    network = parse_booleanlogic(booleanlogic)
+    dgraph = network.interaction_network()
+    nodeList = network.nodeList()
+    inputNodeState = dict(network.inputNodeState)
     return(dgraph, nodeList, inputNodeState)
-    
+
 if __name__ == '__main__':
     booleanlogic = '''
     A = B
@@ -65,4 +203,7 @@ if __name__ == '__main__':
     booleanlogicNum, node2num, num2node = modeltext2nummodeltext(booleanlogic)
 #    print('# Search for point attractors')
     dgraph, nodeList, inputNodeState = get_interaction_network(booleanlogic)
-    
+    # parse once, the network is accepted in place of the text
+    network = parse_booleanlogic(booleanlogic)
+    networkNum, node2num, num2node = modeltext2nummodeltext(network)
+    dgraph, nodeList, inputNodeState = get_interaction_network(networkNum)
@@ -11,55 +11,114 @@ Created on Tue Dec  1 17:01:59 2020
 
 @author: ansu
 """
-import pandas as pd
 import itertools
-import pickle
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-import PyBoolNet # code from https://github.com/hklarner/PyBoolNet
-from dcgs.replace_str import replaceMultiple2
-from dcgs.booleanlogic_preprocessing import get_interaction_network,modeltext2nummodeltext
-from dcgs.attractorlandscapeSeeker import getPrimeFromBoolean
+from dcgs.booleanlogic_preprocessing import get_interaction_network,modeltext2nummodeltext,parse_booleanlogic
+from dcgs import synchronousSimulator
 
-def algorithm(booleanlogic, targetattractor):
-    booleanlogicNum, node2num, num2node = modeltext2nummodeltext(booleanlogic)
+# number of node subsets checked by a worker at a time
+CHUNK_SIZE = 256
+
+# network shared by the control kernel checks of one process.
+# It is set once per worker process by _init_check.
+_check = {}
+
+def _init_check(booleanlogicNum, targetattractor, stop=None, first=False):
+    # synchronous successors of all states, computed once
+    dynamics = synchronousSimulator.SyncDynamics(booleanlogicNum)
+    _check['dynamics'] = dynamics
+    _check['successors'] = dynamics.successors()
+    _check['targetattractor'] = targetattractor
+    _check['stop'] = stop
+    _check['first'] = first
+
+# the node subsets of combinationsets that globally stabilize the network
+def _check_kernels(combinationsets):
+    dynamics = _check['dynamics']
+    successors = _check['successors']
+    attractor = _check['targetattractor']
+    stop = _check['stop']
+    CK = []
+    for combinationnodes in combinationsets:
+        if stop is not None and stop.is_set():
+            break
+        # fix the nodes to the target attractor state
+        pins = {}
+        for Cnode in combinationnodes:
+            if attractor[int(Cnode[1:])-1] == '1':
+                pins[Cnode] = 1
+            elif attractor[int(Cnode[1:])-1] == '0':
+                pins[Cnode] = 0
+        successors_pert = dynamics.pinned_successors(successors, pins)
+        steady, cyclic = synchronousSimulator.compute_attractors(dynamics, successors_pert)
+        if len(cyclic) == 0:
+            if len(steady) == 1:
+                CK.append(combinationnodes)
+                if _check['first']:
+                    if stop is not None:
+                        stop.set()
+                    break
+    return(CK)
+
+def _chunks(iterable):
+    return iter(lambda: list(itertools.islice(iterable, CHUNK_SIZE)), [])
+
+# control kernels of minimum size, yielded as they are found.
+# Node subsets are checked level by level (by size), the search stops after
+# the first level with a control kernel. With n_jobs > 1 the subsets of each
+# level are sharded across a process pool; with first=True the search stops
+# at the first control kernel.
+def iter_control_kernels(booleanlogic, targetattractor, n_jobs=1, first=False):
+    booleanlogicNum, node2num, num2node = modeltext2nummodeltext(parse_booleanlogic(booleanlogic))
     dgraph, nodeList, inputNodeState = get_interaction_network(booleanlogicNum)
-    netsize = len(dgraph.nodes())
     inputnode = []
     for n in dgraph.in_degree():
         if n[1] == 0:
             inputnode.append(n[0])
-    primes = getPrimeFromBoolean(booleanlogicNum)
-    attractor = targetattractor
-    bnet = booleanlogicNum.replace('=',',\t')
-    bnet = replaceMultiple2(bnet, [' and ',' or ',' not '], [' & ',' | ',' ! '])
-    bnet = replaceMultiple2(bnet, ['True','False'], [' 1 ',' 0 '])
-    bnetline = bnet.split('\n')
-    nodelist_WO_inputnode = list(set(dgraph.nodes())-set(inputnode))
-    FindCK = False    
-    CK = []
-    for combinationnum in range(len(nodelist_WO_inputnode)+1):
-        if FindCK == True:
-            return(CK)
-        combinationset = itertools.combinations(nodelist_WO_inputnode, combinationnum)
-        for combinationnodes in combinationset:
-            bnetline_pert = bnetline.copy()
-            for linenum, line in enumerate(bnetline_pert):
-                if line.strip() == '':
-                    continue
-                Cnode = line.split(',\t')[0].strip()
-                if Cnode in combinationnodes:
-                    if attractor[int(Cnode[1:])-1] == '1':
-                        bnetline_pert[linenum] = Cnode +' ,\t '+str(1)
-                    elif attractor[int(Cnode[1:])-1] == '0':
-                        bnetline_pert[linenum] = Cnode +' ,\t '+str(0)
-            bnet_pert = '\n'.join(bnetline_pert)
-            primes_pert = PyBoolNet.FileExchange.bnet2primes(bnet_pert)
-            stg = PyBoolNet.StateTransitionGraphs.primes2stg(primes_pert,"synchronous")
-            steady, cyclic = PyBoolNet.Attractors.compute_attractors_tarjan(stg)
-            if len(cyclic) == 0:
-                if len(steady) == 1:
-                    CK.append(combinationnodes)
+    nodelist_WO_inputnode = sorted(set(dgraph.nodes())-set(inputnode))
+    levels = (itertools.combinations(nodelist_WO_inputnode, combinationnum) for combinationnum in range(len(nodelist_WO_inputnode)+1))
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count()
+    if n_jobs == 1:
+        _init_check(booleanlogicNum, targetattractor, first=first)
+        for combinationset in levels:
+            FindCK = False
+            for chunk in _chunks(combinationset):
+                for CK in _check_kernels(chunk):
                     FindCK = True
+                    yield CK
+                    if first:
+                        return
+            if FindCK:
+                return
+        return
+    context = multiprocessing.get_context()
+    stop = context.Event()
+    futures = []
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, initializer=_init_check, initargs=(booleanlogicNum, targetattractor, stop, first)) as executor:
+        try:
+            for combinationset in levels:
+                FindCK = False
+                futures = [executor.submit(_check_kernels, chunk) for chunk in _chunks(combinationset)]
+                for future in futures:
+                    for CK in future.result():
+                        FindCK = True
+                        yield CK
+                        if first:
+                            return
+                if FindCK:
+                    return
+        finally:
+            # let the workers skip the remaining subsets
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+def algorithm(booleanlogic, targetattractor, n_jobs=1, first=False):
+    return(list(iter_control_kernels(booleanlogic, targetattractor, n_jobs=n_jobs, first=first)))
 if __name__ == '__main__':
     booleanlogic = '''
     x1 = x2
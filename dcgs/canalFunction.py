@@ -1,41 +1,433 @@
-import copy
-from sympy import sympify, true, false, Or
-from dcgs.replace_str import replaceMultiple2
-def main(state, booleanlogic):
-    step = True
-    STATE = state.copy()
-    booleanlogic = replaceMultiple2(booleanlogic, [' and ',' or ',' not '], [' & ',' | ',' ~ '])
-    booleanlogicLine = booleanlogic.splitlines()
-    booleanlogicDic = {}
-    for line in booleanlogicLine:
-        if line.strip() == "":
-            continue
-        linelist = line.strip().split('=')
-        booleanlogicDic[linelist[0].strip()] = ' '+ linelist[1].strip()+' '
-        if STATE[linelist[0].strip()] in ['True','False']:
-            booleanlogicDic[linelist[0].strip()] = STATE[linelist[0].strip()]
-    while step:
-        new_booleanlogicDic = copy.deepcopy(booleanlogicDic) 
-        for fvn in STATE:
-            if STATE[fvn] == '':
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+import numpy as np
+from dcgs.booleanlogic_preprocessing import parse_booleanlogic
+
+# Compiled canalization engine.
+# The Boolean logic is parsed once into per-node expression trees over
+# integer node indices (booleanlogic_preprocessing.BooleanNetwork), which are compiled into closures evaluated with
+# three-valued (Kleene) logic: True, False and None (not fixed).
+# Constant propagation is driven by a worklist, so only the successors of
+# newly fixed nodes are re-evaluated.
+#
+# expression tree nodes:
+#   ('const', True/False), ('var', index), ('not', expr),
+#   ('and', (expr, ...)), ('or', (expr, ...))
+
+def _compile(expr):
+    kind = expr[0]
+    if kind == 'const':
+        value = expr[1]
+        return lambda v: value
+    if kind == 'var':
+        i = expr[1]
+        return lambda v: v[i]
+    if kind == 'not':
+        f = _compile(expr[1])
+        def _not(v):
+            r = f(v)
+            return None if r is None else not r
+        return _not
+    fs = tuple(_compile(arg) for arg in expr[1])
+    if kind == 'and':
+        def _and(v):
+            result = True
+            for f in fs:
+                r = f(v)
+                if r is False:
+                    return False
+                if r is None:
+                    result = None
+            return result
+        return _and
+    def _or(v):
+        result = False
+        for f in fs:
+            r = f(v)
+            if r is True:
+                return True
+            if r is None:
+                result = None
+        return result
+    return _or
+
+# Bit-parallel three-valued logic.
+# A batch of partial assignments is stored as two bitplanes of shape
+# (number of nodes, number of 64-bit words): bit r of ones[i] is set if node i
+# is fixed to True in row r, bit r of zeros[i] if it is fixed to False.
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+# batches with fewer rows are faster to propagate row by row
+MIN_BATCH = 32
+
+def _compile_planes(expr):
+    kind = expr[0]
+    if kind == 'const':
+        if expr[1]:
+            return lambda ones, zeros: (np.full(ones.shape[1], _ALL), np.zeros(ones.shape[1], np.uint64))
+        return lambda ones, zeros: (np.zeros(ones.shape[1], np.uint64), np.full(ones.shape[1], _ALL))
+    if kind == 'var':
+        i = expr[1]
+        return lambda ones, zeros: (ones[i], zeros[i])
+    if kind == 'not':
+        f = _compile_planes(expr[1])
+        def _not(ones, zeros):
+            one, zero = f(ones, zeros)
+            return zero, one
+        return _not
+    fs = tuple(_compile_planes(arg) for arg in expr[1])
+    if kind == 'and':
+        def _and(ones, zeros):
+            one, zero = fs[0](ones, zeros)
+            for f in fs[1:]:
+                o, z = f(ones, zeros)
+                one = one & o
+                zero = zero | z
+            return one, zero
+        return _and
+    def _or(ones, zeros):
+        one, zero = fs[0](ones, zeros)
+        for f in fs[1:]:
+            o, z = f(ones, zeros)
+            one = one | o
+            zero = zero & z
+        return one, zero
+    return _or
+
+def pack_rows(bits):
+    # bool array (nodes, rows) -> uint64 bitplanes (nodes, words)
+    bits = np.asarray(bits, dtype=bool)
+    nwords = max(1, -(-bits.shape[1] // 64))
+    padded = np.zeros((bits.shape[0], nwords * 64), dtype=bool)
+    padded[:, :bits.shape[1]] = bits
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+def unpack_rows(planes, nrows):
+    # uint64 bitplanes (nodes, words) -> bool array (nodes, rows)
+    planes = np.ascontiguousarray(planes, dtype='<u8')
+    return np.unpackbits(planes.view(np.uint8), axis=1, bitorder='little')[:, :nrows].astype(bool)
+
+class CanalLogic:
+    # Boolean logic text or BooleanNetwork compiled for canalization (constant propagation).
+    def __init__(self, booleanlogic):
+        network = parse_booleanlogic(booleanlogic)
+        self.network = network
+        self.index = network.index
+        self.nodes = network.nodes
+        self.exprs = network.exprs
+        self.funcs = [None if e is None else _compile(e) for e in self.exprs]
+        self.plane_funcs = [None if e is None else _compile_planes(e) for e in self.exprs]
+        self.targets = list(network.defined)
+        self.successors = [[] for _ in self.nodes]
+        for i in self.targets:
+            for j in sorted(network.regulators[i]):
+                self.successors[j].append(i)
+
+    def state2values(self, state):
+        values = [None] * len(self.nodes)
+        for node, s in state.items():
+            if s in ('True', 'False') and node in self.index:
+                values[self.index[node]] = (s == 'True')
+        return values
+
+    def propagate_values(self, values, changed=None):
+        # worklist-driven fixpoint; values is updated in place.
+        # If values is already a closure except for the nodes in changed,
+        # only their successors need to be evaluated.
+        funcs = self.funcs
+        successors = self.successors
+        if changed is None:
+            work = [i for i in range(len(values)) if values[i] is None and funcs[i] is not None]
+        else:
+            work = sorted(set(j for i in changed for j in successors[i] if values[j] is None and funcs[j] is not None))
+        queued = [False] * len(values)
+        for i in work:
+            queued[i] = True
+        while work:
+            i = work.pop()
+            queued[i] = False
+            if values[i] is not None:
+                continue
+            r = funcs[i](values)
+            if r is None:
                 continue
-            for n in booleanlogicDic:
-                if fvn in booleanlogicDic[n]:
-                    new_booleanlogicDic[n] = new_booleanlogicDic[n].replace(' '+fvn+' ', ' '+STATE[fvn]+' ')
-        if new_booleanlogicDic == booleanlogicDic:
-            step = False
-            return(STATE)
-        elif new_booleanlogicDic != booleanlogicDic:
-            booleanlogicDic = copy.deepcopy(new_booleanlogicDic)
-            for fvn in booleanlogicDic.keys():
-                line = booleanlogicDic[fvn]
-                line = replaceMultiple2(line, ['True', 'False'], ['true','false'])
-                line_sim = ' '+str(sympify(line))+' '
-                if STATE[fvn] == '':
-                    if line_sim in [' False ',' True ']:     
-                        STATE[fvn] = line_sim.strip()                  
-                else:
-                    booleanlogicDic[fvn] = line_sim
+            values[i] = r
+            for j in successors[i]:
+                if values[j] is None and not queued[j] and funcs[j] is not None:
+                    queued[j] = True
+                    work.append(j)
+        return values
+
+    def propagate(self, state):
+        STATE = state.copy()
+        values = self.propagate_values(self.state2values(state))
+        for node, i in self.index.items():
+            if values[i] is not None and node in STATE:
+                STATE[node] = 'True' if values[i] else 'False'
+        return STATE
+
+    def propagate_bitplanes(self, ones, zeros):
+        # canalization of all rows at once; returns new (ones, zeros) bitplanes.
+        # Pinned bits are never changed, only undetermined bits get fixed.
+        ones = np.array(ones, dtype=np.uint64)
+        zeros = np.array(zeros, dtype=np.uint64)
+        funcs = self.plane_funcs
+        successors = self.successors
+        dirty = [i for i in range(len(funcs)) if funcs[i] is not None]
+        while dirty:
+            changed = []
+            for i in dirty:
+                undetermined = ~(ones[i] | zeros[i])
+                if not undetermined.any():
+                    continue
+                one, zero = funcs[i](ones, zeros)
+                one = one & undetermined
+                zero = zero & undetermined
+                if one.any() or zero.any():
+                    ones[i] |= one
+                    zeros[i] |= zero
+                    changed.append(i)
+            dirty = sorted(set(j for i in changed for j in successors[i] if funcs[j] is not None))
+        return ones, zeros
+
+    def states2bitplanes(self, states):
+        ones = np.zeros((len(self.nodes), len(states)), dtype=bool)
+        zeros = np.zeros((len(self.nodes), len(states)), dtype=bool)
+        for r, state in enumerate(states):
+            for node, s in state.items():
+                if node in self.index:
+                    if s == 'True':
+                        ones[self.index[node], r] = True
+                    elif s == 'False':
+                        zeros[self.index[node], r] = True
+        return pack_rows(ones), pack_rows(zeros)
+
+    def _base_rows(self, state, nrows):
+        one = np.zeros(len(self.nodes), dtype=bool)
+        zero = np.zeros(len(self.nodes), dtype=bool)
+        for node, s in state.items():
+            if node in self.index:
+                one[self.index[node]] = (s == 'True')
+                zero[self.index[node]] = (s == 'False')
+        return np.repeat(one[:, np.newaxis], nrows, axis=1), np.repeat(zero[:, np.newaxis], nrows, axis=1)
+
+    def override_bitplanes(self, state, overrides):
+        # bitplanes of state with one row per dict of overriding node states
+        ones, zeros = self._base_rows(state, len(overrides))
+        for r, override in enumerate(overrides):
+            for node, s in override.items():
+                i = self.index[node]
+                ones[i, r] = (s == 'True')
+                zeros[i, r] = (s == 'False')
+        return pack_rows(ones), pack_rows(zeros)
+
+    def product_bitplanes(self, state, nodes):
+        # bitplanes of state with all 2^len(nodes) assignments of nodes,
+        # rows in the order of itertools.product(('False','True'), repeat=len(nodes))
+        nrows = 2 ** len(nodes)
+        ones, zeros = self._base_rows(state, nrows)
+        rows = np.arange(nrows)
+        for j, node in enumerate(nodes):
+            i = self.index[node]
+            ones[i] = (rows >> (len(nodes) - 1 - j)) & 1 == 1
+            zeros[i] = ~ones[i]
+        return pack_rows(ones), pack_rows(zeros)
+
+    def bitplanes2states(self, ones, zeros, nrows, template):
+        # STATE dicts with the keys of template, one per row
+        keys = list(template)
+        one = unpack_rows(ones, nrows)
+        zero = unpack_rows(zeros, nrows)
+        columns = []
+        for key in keys:
+            if key in self.index:
+                i = self.index[key]
+                columns.append(np.where(one[i], 'True', np.where(zero[i], 'False', '')).tolist())
+            else:
+                columns.append([template[key]] * nrows)
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def all_fixed(self, ones, zeros, nrows):
+        # bool array, True for rows in which every node is fixed
+        fixed = np.bitwise_and.reduce((ones | zeros)[self.targets], axis=0)
+        return unpack_rows(fixed[np.newaxis, :], nrows)[0]
+
+    def propagate_values_batch(self, rows):
+        # closures of a list of value lists. Small batches are propagated
+        # row by row, larger ones bit-parallel.
+        if len(rows) < MIN_BATCH:
+            return [self.propagate_values(list(values)) for values in rows]
+        ones = pack_rows(np.array([[v is True for v in values] for values in rows], dtype=bool).T)
+        zeros = pack_rows(np.array([[v is False for v in values] for values in rows], dtype=bool).T)
+        ones, zeros = self.propagate_bitplanes(ones, zeros)
+        result = np.full((len(rows), len(self.nodes)), None, dtype=object)
+        result[unpack_rows(zeros, len(rows)).T] = False
+        result[unpack_rows(ones, len(rows)).T] = True
+        return result.tolist()
+
+    def canalizes(self, state, overrides):
+        # for each dict of overriding node states, whether fixing it on top of
+        # state canalizes every node. Small batches are propagated row by row,
+        # larger ones bit-parallel.
+        if len(overrides) < MIN_BATCH:
+            result = []
+            for override in overrides:
+                STATE = state.copy()
+                STATE.update(override)
+                values = self.propagate_values(self.state2values(STATE))
+                result.append(all(values[i] is not None for i in self.targets))
+            return result
+        ones, zeros = self.override_bitplanes(state, overrides)
+        ones, zeros = self.propagate_bitplanes(ones, zeros)
+        return self.all_fixed(ones, zeros, len(overrides)).tolist()
+
+    def propagate_batch(self, states):
+        # canalizing effect of a list of states, evaluated bit-parallel
+        ones, zeros = self.states2bitplanes(states)
+        ones, zeros = self.propagate_bitplanes(ones, zeros)
+        one = unpack_rows(ones, len(states))
+        zero = unpack_rows(zeros, len(states))
+        STATES = []
+        for r, state in enumerate(states):
+            STATE = state.copy()
+            for node in STATE:
+                if node in self.index:
+                    i = self.index[node]
+                    if one[i, r]:
+                        STATE[node] = 'True'
+                    elif zero[i, r]:
+                        STATE[node] = 'False'
+            STATES.append(STATE)
+        return STATES
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'reused', 'maxsize', 'currsize'])
+
+class CanalCache:
+    # Size-capped LRU cache of canalization closures of a CanalLogic.
+    # Keys are the frozen partial assignments {(node index, value)}.
+    # The closure is monotone in the fixed nodes, so on a miss the propagation
+    # starts from the cached closure of the largest cached subset of the key
+    # (found within max_lookups lookups of subsets with fewer fixed nodes),
+    # provided the additional fixed nodes do not contradict it.
+    def __init__(self, canalLogic, maxsize=8192, max_lookups=64):
+        self.logic = canalLogic
+        self.maxsize = maxsize
+        self.max_lookups = max_lookups
+        self.hits = 0
+        self.misses = 0
+        self.reused = 0
+        self._closures = OrderedDict()
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.reused, self.maxsize, len(self._closures))
+
+    def cache_clear(self):
+        self._closures.clear()
+        self.hits = self.misses = self.reused = 0
+
+    def _pins(self, state):
+        index = self.logic.index
+        return dict((index[node], s == 'True') for node, s in state.items() if s in ('True', 'False') and node in index)
+
+    def _get(self, key):
+        closure = self._closures.get(key)
+        if closure is not None:
+            self._closures.move_to_end(key)
+        return closure
+
+    def _put(self, key, closure):
+        self._closures[key] = closure
+        self._closures.move_to_end(key)
+        while len(self._closures) > self.maxsize:
+            self._closures.popitem(last=False)
+
+    def _seed(self, key, pins):
+        # values to start the propagation of key from
+        lookups = 0
+        level = [key]
+        seen = set()
+        while level and lookups < self.max_lookups:
+            subsets = []
+            for k in level:
+                for item in k:
+                    sub = k - {item}
+                    if sub in seen:
+                        continue
+                    seen.add(sub)
+                    closure = self._get(sub)
+                    lookups += 1
+                    if closure is not None and all(closure[i] is None or closure[i] == v for i, v in key - sub):
+                        self.reused += 1
+                        values = list(closure)
+                        for i, v in pins.items():
+                            values[i] = v
+                        return values
+                    subsets.append(sub)
+                    if lookups >= self.max_lookups:
+                        break
+                if lookups >= self.max_lookups:
+                    break
+            level = subsets
+        values = [None] * len(self.logic.nodes)
+        for i, v in pins.items():
+            values[i] = v
+        return values
+
+    def closures(self, pinslist):
+        # closures (tuples of True/False/None per node index) of a list of pins
+        result = [None] * len(pinslist)
+        keys = [frozenset(pins.items()) for pins in pinslist]
+        missing = {}
+        for r, key in enumerate(keys):
+            closure = self._get(key)
+            if closure is not None:
+                self.hits += 1
+                result[r] = closure
+            elif key in missing:
+                missing[key].append(r)
+            else:
+                self.misses += 1
+                missing[key] = [r]
+        seeds = [self._seed(key, pinslist[rows[0]]) for key, rows in missing.items()]
+        for (key, rows), closure in zip(missing.items(), self.logic.propagate_values_batch(seeds)):
+            closure = tuple(closure)
+            self._put(key, closure)
+            for r in rows:
+                result[r] = closure
+        return result
+
+    def propagate(self, state):
+        # same as CanalLogic.propagate, memoized
+        closure = self.closures([self._pins(state)])[0]
+        STATE = state.copy()
+        for node, i in self.logic.index.items():
+            if closure[i] is not None and node in STATE:
+                STATE[node] = 'True' if closure[i] else 'False'
+        return STATE
+
+    def canalizes(self, state, overrides):
+        # same as CanalLogic.canalizes, memoized
+        base = self._pins(state)
+        index = self.logic.index
+        pinslist = []
+        for override in overrides:
+            pins = base.copy()
+            for node, s in override.items():
+                pins[index[node]] = (s == 'True')
+            pinslist.append(pins)
+        targets = self.logic.targets
+        return [all(closure[i] is not None for i in targets) for closure in self.closures(pinslist)]
+
+@lru_cache(maxsize=32)
+def compile_logic(booleanlogic):
+    return CanalLogic(booleanlogic)
+
+# canalizing effect of the fixed nodes in state.
+# booleanlogic is the Boolean logic text, a BooleanNetwork or a compiled CanalLogic.
+def main(state, booleanlogic):
+    if not isinstance(booleanlogic, CanalLogic):
+        booleanlogic = compile_logic(booleanlogic)
+    return booleanlogic.propagate(state)
+
 if __name__ == '__main__':
     from booleanlogic_preprocessing import modeltext2nummodeltext
     from booleanlogic_preprocessing import get_interaction_network
@@ -49,4 +441,4 @@ if __name__ == '__main__':
     booleanlogicNum, node2num, num2node = modeltext2nummodeltext(booleanlogic)
     dgraph, nodeList, inputNodeState = get_interaction_network(booleanlogicNum)
     canalizedState = main(inputNodeState,booleanlogicNum)
-    
+
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Branch-and-bound search for minimal canalizing sets.
+
+A canalizing set is a subset of the candidate nodes which, fixed to their
+target states on top of a given state, canalizes every node of the network.
+If the target is consistent with the canalization (every canalized node gets
+its target state, as for a point attractor), the canalization closure is
+monotone in the fixed nodes. Then
+  - a node that is already canalized by the chosen nodes never has to be added,
+    any canalizing set containing it is not minimal,
+  - a canalizing set is never extended, its supersets are not minimal and
+  - branches deeper than the smallest canalizing set found so far are cut.
+Candidates are ordered by the number of nodes their single node closure
+fixes, so large canalizing effects are tried first.
+If the target is not consistent, the search falls back to checking all
+subsets level by level.
+"""
+import itertools
+
+# number of subsets canalized together in one bitplane batch by the fallback
+BATCH_SIZE = 4096
+
+def _canalized(values, targets):
+    for i in targets:
+        if values[i] is None:
+            return False
+    return True
+
+def _consistent(values, targetvalues):
+    for v, t in zip(values, targetvalues):
+        if v is not None and t is not None and v != t:
+            return False
+    return True
+
+# check all subsets of candidates level by level, the minimum canalizing sets
+# in itertools.combinations order
+def levelwise_canalizing_sets(canal, state, candidates, target):
+    CS = []
+    for L in range(1, len(candidates)+1):
+        combinationset = itertools.combinations(candidates, L)
+        for combis in iter(lambda: list(itertools.islice(combinationset, BATCH_SIZE)), []):
+            overrides = [dict((cc, target[cc]) for cc in combi) for combi in combis]
+            for combi, fixed in zip(combis, canal.canalizes(state, overrides)):
+                if fixed:
+                    CS.append(list(combi))
+        if CS:
+            break
+    return CS
+
+# minimum canalizing sets of candidates, as lists of nodes, in
+# itertools.combinations order of candidates.
+# canalLogic : compiled logic (canalFunction.CanalLogic)
+# state : STATE dict the candidates are fixed on
+# target : target state ('True'/'False') of the nodes
+# find_all : all minimum canalizing sets, otherwise only one
+# canalCache : canalFunction.CanalCache for the fallback search
+def minimal_canalizing_sets(canalLogic, state, candidates, target, find_all=True, canalCache=None):
+    index = canalLogic.index
+    targets = canalLogic.targets
+    targetvalues = [None] * len(canalLogic.nodes)
+    for node, s in target.items():
+        if node in index and s in ('True', 'False'):
+            targetvalues[index[node]] = (s == 'True')
+    position = dict((node, k) for k, node in enumerate(candidates))
+    base = canalLogic.propagate_values(canalLogic.state2values(state))
+    if not _consistent(base, targetvalues):
+        return levelwise_canalizing_sets(canalCache or canalLogic, state, candidates, target)
+
+    def extend(values, node):
+        values = list(values)
+        i = index[node]
+        values[i] = targetvalues[i]
+        return canalLogic.propagate_values(values, changed=[i])
+
+    # order candidates by the size of their single node closure
+    fixes = {}
+    for node in candidates:
+        fixes[node] = sum(v is not None for v in extend(base, node))
+    order = sorted((node for node in candidates if base[index[node]] is None), key=lambda n: (-fixes[n], position[n]))
+
+    found = []
+    best = [len(order)+1]
+    inconsistent = [False]
+
+    def dfs(start, chosen, values):
+        if inconsistent[0]:
+            return
+        if _canalized(values, targets):
+            if len(chosen) < best[0]:
+                best[0] = len(chosen)
+                del found[:]
+            found.append(list(chosen))
+            return
+        for k in range(start, len(order)):
+            # bound: a deeper branch can not be minimal
+            if len(chosen)+1 > best[0] or (not find_all and len(chosen)+1 >= best[0]):
+                return
+            node = order[k]
+            # already canalized by the chosen nodes
+            if values[index[node]] is not None:
+                continue
+            new_values = extend(values, node)
+            if not _consistent(new_values, targetvalues):
+                inconsistent[0] = True
+                return
+            chosen.append(node)
+            dfs(k+1, chosen, new_values)
+            chosen.pop()
+            if inconsistent[0]:
+                return
+
+    dfs(0, [], base)
+    if inconsistent[0]:
+        return levelwise_canalizing_sets(canalCache or canalLogic, state, candidates, target)
+    CS = [sorted(cs, key=position.get) for cs in found]
+    return sorted(CS, key=lambda cs: [position[n] for n in cs])
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed on-disk cache for results of the pipeline stages.
+
+A result is stored under the SHA-256 hash of its namespace, the normalized
+network (text or graph) and the parameters of the call, so reruns on the same
+models skip the computation. Entries are pickled into one file each, written
+to a temporary file and renamed into place, so concurrent processes never see
+partial entries. The modification time of an entry is its last use: if the
+cache directory grows beyond the size limit the least recently used entries
+are removed. The size of the directory is counted once and then tracked by
+the writes of this process, so the directory is only walked again to evict.
+
+The cache is off until a directory is configured, either by
+
+    from dcgs import resultCache
+    resultCache.configure('/path/to/cache', max_bytes=2**30)
+
+or by the environment variables DCGS_CACHE_DIR and DCGS_CACHE_SIZE (bytes).
+"""
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import functools
+
+# part of every key, increase to invalidate entries of older versions
+VERSION = 1
+MAX_BYTES = 2**28
+SUFFIX = '.pkl'
+
+class DiskCache:
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # size of the entries in bytes, counted on the first write
+        self._size = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, namespace, *parts):
+        # parts are JSON serializable (tuples become lists)
+        data = json.dumps([VERSION, namespace, parts], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key+SUFFIX)
+
+    def get(self, key):
+        # (True, value) for a stored key, otherwise (False, None)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if self._size is None:
+            self._size = self.size()
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        # (last use, size, path) of all entries
+        result = []
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                result.append((stat.st_mtime, stat.st_size, path))
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        # remove least recently used entries until the size limit holds,
+        # the walk also picks up the writes of other processes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._size = 0
+
+_cache = [None]
+
+# use the cache in directory (None switches the cache off)
+def configure(directory, max_bytes=MAX_BYTES):
+    _cache[0] = None if directory is None else DiskCache(directory, max_bytes)
+    return _cache[0]
+
+def get_cache():
+    return _cache[0]
+
+if os.environ.get('DCGS_CACHE_DIR'):
+    configure(os.environ['DCGS_CACHE_DIR'], int(os.environ.get('DCGS_CACHE_SIZE', MAX_BYTES)))
+
+# decorator: results of the function are cached under
+# namespace and keyfunc(*args, **kwargs) if a cache is configured
+def cached(namespace, keyfunc):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            cache = _cache[0]
+            if cache is None:
+                return function(*args, **kwargs)
+            key = cache.key(namespace, keyfunc(*args, **kwargs))
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = function(*args, **kwargs)
+            cache.put(key, value)
+            return value
+        return wrapper
+    return decorator
+
+# normalized text of the Boolean logic (text or BooleanNetwork)
+def network_key(booleanlogic):
+    from dcgs.booleanlogic_preprocessing import parse_booleanlogic
+    return parse_booleanlogic(booleanlogic).to_text()
+
+# the graph with nodes and edges in insertion order, the order of the
+# FVS results depends on it
+def graph_key(DG):
+    return [[str(n) for n in DG.nodes()], [[str(u), str(v)] for u, v in DG.edges()]]
@@ -10,7 +10,9 @@ import matplotlib.pyplot as plt
 import time
 
 import dcgs.fvs as fvs# code from https://github.com/rionbr/CANA
+from dcgs import resultCache
 
+@resultCache.cached('scc2fvs_combine', lambda DG, thres=20: [resultCache.graph_key(DG), thres])
 def scc2fvs_combine(DG, thres=20):
     DG2 = DG.copy()
     ih = 0
@@ -38,6 +40,7 @@ def scc2fvs_combine(DG, thres=20):
                 DG2.remove_node(n)
         ih += 1
     return(dic_hirachy, dic_fvs, sorted(mfvs))
+@resultCache.cached('scc2fvs_bruteforce', resultCache.graph_key)
 def scc2fvs_bruteforce(DG):
     DG2 = DG.copy()
     ih = 0
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized synchronous simulation of Boolean networks.
+
+The Boolean logic is compiled into NumPy functions that evaluate a node's
+update rule for a whole array of states at once. A state is an integer whose
+bits are the node states in the order of the sorted node names, the first node
+being the most significant bit, so that format(state, '0nb') is the string
+representation of PyBoolNet. The synchronous state transition graph of all 2^n
+states is a single successor array, its attractors are the cycles of this
+functional graph. Pinning nodes to constant states only overrides their bits
+in the successor array, so perturbations need no recompilation.
+"""
+import numpy as np
+
+from dcgs import canalFunction
+
+# number of states evaluated together
+CHUNK_SIZE = 2**20
+# the successor array of all states has 2^MAX_NODES entries
+MAX_NODES = 30
+
+def _compile_vector(expr, bit):
+    kind = expr[0]
+    if kind == 'const':
+        value = expr[1]
+        return lambda states: np.full(len(states), value, dtype=bool)
+    if kind == 'var':
+        shift = bit[expr[1]]
+        return lambda states: ((states >> shift) & 1).astype(bool)
+    if kind == 'not':
+        f = _compile_vector(expr[1], bit)
+        return lambda states: ~f(states)
+    fs = tuple(_compile_vector(arg, bit) for arg in expr[1])
+    if kind == 'and':
+        def _and(states):
+            result = fs[0](states)
+            for f in fs[1:]:
+                result = result & f(states)
+            return result
+        return _and
+    def _or(states):
+        result = fs[0](states)
+        for f in fs[1:]:
+            result = result | f(states)
+        return result
+    return _or
+
+class SyncDynamics:
+    # synchronous dynamics of the Boolean logic text (or a compiled CanalLogic)
+    def __init__(self, booleanlogic):
+        if not isinstance(booleanlogic, canalFunction.CanalLogic):
+            booleanlogic = canalFunction.compile_logic(booleanlogic)
+        logic = booleanlogic
+        undefined = [logic.nodes[i] for i, e in enumerate(logic.exprs) if e is None]
+        if undefined:
+            raise ValueError('nodes without update rule: %s' % ', '.join(undefined))
+        self.nodes = sorted(logic.nodes)
+        self.size = len(self.nodes)
+        if self.size > MAX_NODES:
+            raise ValueError('%i nodes exceed the maximum of %i for the explicit state space' % (self.size, MAX_NODES))
+        # bit of each node in the integer state
+        self.bit = dict((node, self.size-1-k) for k, node in enumerate(self.nodes))
+        bit = dict((logic.index[node], self.bit[node]) for node in self.nodes)
+        self.funcs = dict((node, _compile_vector(logic.exprs[logic.index[node]], bit)) for node in self.nodes)
+        self.dtype = np.uint32 if self.size <= 32 else np.uint64
+
+    def state2int(self, state):
+        # str or dict (node: 0/1 or 'True'/'False') representation to int
+        if isinstance(state, str):
+            return int(state, 2)
+        return sum(1 << self.bit[node] for node in self.nodes if state[node] in (1, '1', 'True', True))
+
+    def int2str(self, state):
+        return format(int(state), '0%ib' % self.size)
+
+    def successors(self, states=None):
+        # synchronous successors of states (default: all 2^n states) as int array
+        if states is None:
+            states = np.arange(2**self.size, dtype=self.dtype)
+        states = np.asarray(states, dtype=self.dtype)
+        result = np.zeros(len(states), dtype=self.dtype)
+        for lo in range(0, len(states), CHUNK_SIZE):
+            chunk = states[lo:lo+CHUNK_SIZE]
+            succ = np.zeros(len(chunk), dtype=self.dtype)
+            for node in self.nodes:
+                succ |= self.funcs[node](chunk).astype(self.dtype) << self.dtype(self.bit[node])
+            result[lo:lo+CHUNK_SIZE] = succ
+        return result
+
+    def pin_masks(self, pins):
+        # bit mask of the pinned nodes and the bits of their pinned states
+        mask = 0
+        value = 0
+        for node, s in pins.items():
+            mask |= 1 << self.bit[node]
+            if s in (1, '1', 'True', True):
+                value |= 1 << self.bit[node]
+        return self.dtype(mask), self.dtype(value)
+
+    def pinned_successors(self, successors, pins):
+        # successors of the dynamics in which the nodes in pins (node: state)
+        # have constant update rules. Only the columns (bits) of the pinned
+        # nodes in the base successors are overridden.
+        mask, value = self.pin_masks(pins)
+        return (successors & ~mask) | value
+
+# attractors of the functional graph given by the successor array of all states,
+# the states on cycles are found by pointer doubling
+def attractor_states(successors):
+    jump = successors
+    length = 1
+    # after the loop every state is mapped length >= len(successors) steps ahead,
+    # more than any transient, i.e. onto a cycle
+    while length < len(successors):
+        jump = jump[jump]
+        length *= 2
+    cyclestates = np.unique(jump)
+    steady = cyclestates[successors[cyclestates] == cyclestates]
+    cyclic = []
+    visited = set(steady.tolist())
+    for state in cyclestates.tolist():
+        if state in visited:
+            continue
+        cycle = [state]
+        visited.add(state)
+        nxt = int(successors[state])
+        while nxt != state:
+            cycle.append(nxt)
+            visited.add(nxt)
+            nxt = int(successors[nxt])
+        cyclic.append(cycle)
+    return steady.tolist(), cyclic
+
+# steady states (list of str) and cyclic attractors (list of sets of str) of
+# the synchronous dynamics, the same representation as
+# PyBoolNet.Attractors.compute_attractors_tarjan
+def compute_attractors(dynamics, successors=None):
+    if successors is None:
+        successors = dynamics.successors()
+    steady, cyclic = attractor_states(successors)
+    steady = [dynamics.int2str(x) for x in steady]
+    cyclic = [set(dynamics.int2str(x) for x in cycle) for cycle in cyclic]
+    return steady, cyclic